@@ -0,0 +1,140 @@
+import psutil
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+
+# Seconds to wait after SIGTERM before escalating to SIGKILL, and after SIGKILL
+# before giving up on a process
+TERMINATE_TIMEOUT = 3.0
+KILL_TIMEOUT = 1.0
+
+
+def _signal_all(pids, send, result, names, key=None):
+    # One pass over the selection: resolve each PID and apply `send` to it.
+    # Processes that vanished or cannot be signalled are recorded directly.
+    signalled = []
+    for pid in pids:
+        try:
+            process = psutil.Process(pid)
+            names.setdefault(pid, process.name())
+            send(process)
+            signalled.append(process)
+            if key is not None:
+                result[key].append((pid, names[pid]))
+        except psutil.NoSuchProcess:
+            result["gone"].append((pid, names.get(pid, "")))
+        except psutil.AccessDenied:
+            result["denied"].append((pid, names.get(pid, "")))
+    return signalled
+
+
+def _new_result():
+    return {"terminated": [], "killed": [], "suspended": [], "resumed": [],
+            "reprioritized": [], "gone": [], "denied": [], "failed": []}
+
+
+def terminate_processes(pids, timeout=TERMINATE_TIMEOUT, kill_timeout=KILL_TIMEOUT):
+    # SIGTERM -> wait -> SIGKILL escalation with a single wait_procs per stage
+    # over the whole set. Blocks for up to timeout + kill_timeout, so it must
+    # run off the GUI thread.
+    result = _new_result()
+    names = {}
+    signalled = _signal_all(pids, psutil.Process.terminate, result, names)
+    gone, alive = psutil.wait_procs(signalled, timeout=timeout)
+    result["terminated"] += [(process.pid, names[process.pid]) for process in gone]
+    if alive:
+        escalated = []
+        for process in alive:
+            try:
+                process.kill()
+                escalated.append(process)
+            except psutil.NoSuchProcess:
+                result["terminated"].append((process.pid, names[process.pid]))
+            except psutil.AccessDenied:
+                result["denied"].append((process.pid, names[process.pid]))
+        gone, alive = psutil.wait_procs(escalated, timeout=kill_timeout)
+        result["killed"] += [(process.pid, names[process.pid]) for process in gone]
+        result["failed"] += [(process.pid, names[process.pid]) for process in alive]
+    return result
+
+
+def kill_processes(pids, timeout=KILL_TIMEOUT):
+    result = _new_result()
+    names = {}
+    signalled = _signal_all(pids, psutil.Process.kill, result, names)
+    gone, alive = psutil.wait_procs(signalled, timeout=timeout)
+    result["killed"] += [(process.pid, names[process.pid]) for process in gone]
+    result["failed"] += [(process.pid, names[process.pid]) for process in alive]
+    return result
+
+
+def suspend_processes(pids):
+    result = _new_result()
+    _signal_all(pids, psutil.Process.suspend, result, {}, "suspended")
+    return result
+
+
+def resume_processes(pids):
+    result = _new_result()
+    _signal_all(pids, psutil.Process.resume, result, {}, "resumed")
+    return result
+
+
+def renice_processes(pids, nice):
+    result = _new_result()
+    _signal_all(pids, lambda process: process.nice(nice), result, {}, "reprioritized")
+    return result
+
+
+def ionice_processes(pids, ioclass, value=None):
+    result = _new_result()
+    _signal_all(pids, lambda process: process.ionice(ioclass, value), result, {}, "reprioritized")
+    return result
+
+
+# Bulk actions offered by the dashboard
+BULK_ACTIONS = {
+    "Terminate": terminate_processes,
+    "Kill": kill_processes,
+    "Suspend": suspend_processes,
+    "Resume": resume_processes,
+}
+
+
+def format_summary(result):
+    if "error" in result:
+        return f"Action failed: {result['error']}"
+    parts = []
+    for key, label in [("terminated", "terminated"), ("killed", "killed"),
+                       ("suspended", "suspended"), ("resumed", "resumed"),
+                       ("reprioritized", "reprioritized"),
+                       ("gone", "already exited"), ("denied", "access denied"),
+                       ("failed", "still running")]:
+        entries = result.get(key, [])
+        if not entries:
+            continue
+        if len(entries) == 1:
+            pid, name = entries[0]
+            parts.append(f"{name or 'process'} (PID: {pid}) {label}")
+        else:
+            parts.append(f"{len(entries)} processes {label}")
+    return "; ".join(parts) or "Nothing to do"
+
+
+class ActionSignals(QObject):
+    finished = pyqtSignal(object)
+
+
+class ProcessActionWorker(QRunnable):
+    # Runs a blocking process action on the global thread pool and reports the
+    # result back to the GUI thread through a queued signal
+    def __init__(self, action, *args):
+        super().__init__()
+        self.action = action
+        self.args = args
+        self.signals = ActionSignals()
+
+    def run(self):
+        try:
+            result = self.action(*self.args)
+        except Exception as e:
+            result = {"error": str(e)}
+        self.signals.finished.emit(result)
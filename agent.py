@@ -0,0 +1,336 @@
+import os
+import selectors
+import socket
+import time
+
+import psutil
+
+from protocol import (SnapshotDecoder, decode_frame, encode_delta, encode_info,
+                      encode_keyframe)
+from snapshot import LocalSampler
+
+
+def parse_address(address):
+    # "unix:/path/to.sock" or "host:port" / ":port"
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address[len("unix:"):]
+    host, _, port = address.rpartition(":")
+    return socket.AF_INET, (host or "127.0.0.1", int(port))
+
+
+class ViewerConnection:
+    def __init__(self, sock, peer, max_bytes_per_sec):
+        self.sock = sock
+        self.peer = peer
+        self.pending = bytearray()
+        self.needs_keyframe = True
+        self.max_bytes_per_sec = max_bytes_per_sec
+        self.tokens = max_bytes_per_sec
+        self.last_refill = time.monotonic()
+        self.connected_at = time.monotonic()
+        self.bytes_sent = 0
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        self.cpu_time = 0.0
+
+    def refill(self, now):
+        self.tokens = min(self.max_bytes_per_sec,
+                          self.tokens + (now - self.last_refill) * self.max_bytes_per_sec)
+        self.last_refill = now
+
+    def flush(self):
+        # Returns False once the viewer has gone away
+        while self.pending:
+            try:
+                sent = self.sock.send(self.pending)
+            except (BlockingIOError, InterruptedError):
+                return True
+            except OSError:
+                return False
+            if sent == 0:
+                return False
+            del self.pending[:sent]
+            self.bytes_sent += sent
+        return True
+
+    def stats(self):
+        elapsed = max(time.monotonic() - self.connected_at, 1e-6)
+        return {
+            "peer": self.peer,
+            "bytes_sent": self.bytes_sent,
+            "bytes_per_sec": self.bytes_sent / elapsed,
+            "frames_sent": self.frames_sent,
+            "frames_dropped": self.frames_dropped,
+            "cpu_ms_per_sec": self.cpu_time * 1000 / elapsed,
+        }
+
+
+class SnapshotAgent:
+    # Samples the host once per interval and fans the same encoded frame out to
+    # every connected viewer, so collection and encoding cost do not grow with
+    # the number of viewers. Each viewer is held to a byte-rate budget and a
+    # bounded send backlog; a viewer that falls behind has its backlog dropped
+    # and is resynchronised with a keyframe instead of being allowed to stall
+    # the agent.
+    def __init__(self, address, interval=1.0, keyframe_every=30, max_viewers=8,
+                 max_bytes_per_sec=512 * 1024, max_backlog=1024 * 1024, stats_interval=0,
+                 exporter=None, sampler=None):
+        # address may be None to run without a snapshot socket, e.g. when
+        # only the metrics exporter is wanted
+        self.family, self.address = parse_address(address) if address else (None, None)
+        self.exporter = exporter
+        self.sampler = sampler or LocalSampler()
+        self.interval = interval
+        self.keyframe_every = keyframe_every
+        self.max_viewers = max_viewers
+        self.max_bytes_per_sec = max_bytes_per_sec
+        self.max_backlog = max_backlog
+        self.stats_interval = stats_interval
+        self.viewers = {}
+        self.selector = selectors.DefaultSelector()
+        self.info_frame = encode_info(self.sampler.system_info())
+        self.previous = None
+        self.seq = 0
+        self.since_keyframe = 0
+        self.collect_time = 0.0
+        self.encode_time = 0.0
+        self.ticks = 0
+        self.running = False
+        self.server = None
+
+    def listen(self):
+        if self.address is None:
+            return
+        if self.family == socket.AF_UNIX and os.path.exists(self.address):
+            os.unlink(self.address)
+        self.server = socket.socket(self.family, socket.SOCK_STREAM)
+        if self.family != socket.AF_UNIX:
+            self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server.bind(self.address)
+        self.server.listen(self.max_viewers)
+        self.server.setblocking(False)
+        self.selector.register(self.server, selectors.EVENT_READ)
+
+    def serve_forever(self):
+        if self.server is None:
+            self.listen()
+        if self.exporter is not None:
+            self.exporter.start()
+        self.running = True
+        next_tick = time.monotonic()
+        next_stats = next_tick + self.stats_interval
+        try:
+            while self.running:
+                now = time.monotonic()
+                if now >= next_tick:
+                    self.tick()
+                    next_tick = max(next_tick + self.interval, now)
+                if self.stats_interval and now >= next_stats:
+                    self.print_stats()
+                    next_stats = now + self.stats_interval
+                self.poll(max(next_tick - time.monotonic(), 0))
+        finally:
+            self.close()
+
+    def stop(self):
+        self.running = False
+
+    def poll(self, timeout):
+        if self.server is None:
+            time.sleep(timeout)
+            return
+        for key, events in self.selector.select(timeout):
+            if key.fileobj is self.server:
+                self.accept()
+                continue
+            viewer = key.data
+            if events & selectors.EVENT_READ:
+                # Viewers never send anything; readable means closed
+                try:
+                    data = viewer.sock.recv(4096)
+                except (BlockingIOError, InterruptedError):
+                    data = b"-"
+                except OSError:
+                    data = b""
+                if not data:
+                    self.drop(viewer)
+                    continue
+            if events & selectors.EVENT_WRITE:
+                self.send(viewer)
+
+    def accept(self):
+        try:
+            sock, peer = self.server.accept()
+        except (BlockingIOError, InterruptedError):
+            return
+        if len(self.viewers) >= self.max_viewers:
+            print(f"[agent] rejecting {peer}: viewer limit {self.max_viewers} reached")
+            sock.close()
+            return
+        sock.setblocking(False)
+        viewer = ViewerConnection(sock, str(peer or "unix"), self.max_bytes_per_sec)
+        viewer.pending += self.info_frame
+        self.viewers[sock] = viewer
+        self.selector.register(sock, selectors.EVENT_READ, viewer)
+        self.send(viewer)
+
+    def drop(self, viewer):
+        self.viewers.pop(viewer.sock, None)
+        try:
+            self.selector.unregister(viewer.sock)
+        except (KeyError, ValueError):
+            pass
+        viewer.sock.close()
+
+    def send(self, viewer):
+        start = time.thread_time()
+        alive = viewer.flush()
+        viewer.cpu_time += time.thread_time() - start
+        if not alive:
+            self.drop(viewer)
+            return
+        events = selectors.EVENT_READ | (selectors.EVENT_WRITE if viewer.pending else 0)
+        self.selector.modify(viewer.sock, events, viewer)
+
+    def tick(self):
+        start = time.thread_time()
+        snapshot = self.sampler.poll()
+        self.collect_time += time.thread_time() - start
+        self.ticks += 1
+        self.seq += 1
+        if self.exporter is not None:
+            self.exporter.update(snapshot)
+        if self.server is None:
+            return
+
+        start = time.thread_time()
+        delta = None
+        if self.previous is not None and self.since_keyframe < self.keyframe_every:
+            delta = encode_delta(self.previous, snapshot, self.seq)
+            self.since_keyframe += 1
+        keyframe = None
+        if delta is None or any(v.needs_keyframe for v in self.viewers.values()):
+            keyframe = encode_keyframe(snapshot, self.seq)
+        if delta is None:
+            self.since_keyframe = 0
+        self.encode_time += time.thread_time() - start
+        self.previous = snapshot
+
+        now = time.monotonic()
+        for viewer in list(self.viewers.values()):
+            viewer.refill(now)
+            frame = keyframe if viewer.needs_keyframe or delta is None else delta
+            # Out of budget or backed up: skip this frame and resync later.
+            # Tokens may go negative so keyframes larger than the per-second
+            # budget are still delivered, just less often.
+            if viewer.tokens <= 0 or len(viewer.pending) + len(frame) > self.max_backlog:
+                viewer.needs_keyframe = True
+                viewer.frames_dropped += 1
+                continue
+            viewer.pending += frame
+            viewer.tokens -= len(frame)
+            viewer.frames_sent += 1
+            viewer.needs_keyframe = False
+            self.send(viewer)
+
+    def stats(self):
+        ticks = max(self.ticks, 1)
+        return {
+            "ticks": self.ticks,
+            "collect_ms": self.collect_time * 1000 / ticks,
+            "encode_ms": self.encode_time * 1000 / ticks,
+            "viewers": [viewer.stats() for viewer in self.viewers.values()],
+        }
+
+    def print_stats(self):
+        stats = self.stats()
+        print(f"[agent] ticks={stats['ticks']} collect={stats['collect_ms']:.1f}ms "
+              f"encode={stats['encode_ms']:.2f}ms viewers={len(stats['viewers'])} "
+              f"rss={psutil.Process().memory_info().rss / (1024**2):.1f}MB")
+        for viewer in stats["viewers"]:
+            print(f"[agent]   {viewer['peer']}: {viewer['bytes_per_sec'] / 1024:.1f} KiB/s "
+                  f"sent={viewer['frames_sent']} dropped={viewer['frames_dropped']} "
+                  f"cpu={viewer['cpu_ms_per_sec']:.2f}ms/s")
+
+    def close(self):
+        if self.exporter is not None:
+            self.exporter.stop()
+        self.sampler.close()
+        for viewer in list(self.viewers.values()):
+            self.drop(viewer)
+        if self.server is not None:
+            self.selector.unregister(self.server)
+            self.server.close()
+            if self.family == socket.AF_UNIX and os.path.exists(self.address):
+                os.unlink(self.address)
+            self.server = None
+
+
+class AgentClient:
+    # Snapshot source that reads from a remote agent instead of sampling locally
+    remote = True
+
+    def __init__(self, address, timeout=5.0):
+        family, target = parse_address(address)
+        self.address = address
+        self.sock = socket.socket(family, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(target)
+        self.buffer = bytearray()
+        self.decoder = SnapshotDecoder()
+        self.connected = True
+
+        # The agent always leads with its system information. An agent at its
+        # viewer limit closes the socket instead.
+        deadline = time.monotonic() + timeout
+        try:
+            while self.decoder.system_info is None:
+                if not self.connected:
+                    raise ConnectionError(f"{address} closed the connection (viewer limit reached?)")
+                if time.monotonic() > deadline:
+                    raise ConnectionError(f"no handshake from {address} within {timeout:g}s")
+                self._receive(blocking=True)
+        except TimeoutError:
+            self.sock.close()
+            raise ConnectionError(f"no handshake from {address} within {timeout:g}s")
+        except ConnectionError:
+            self.sock.close()
+            raise
+        self.sock.setblocking(False)
+
+    def _receive(self, blocking=False):
+        latest = None
+        while True:
+            try:
+                data = self.sock.recv(256 * 1024)
+            except (BlockingIOError, InterruptedError):
+                break
+            if not data:
+                self.connected = False
+                break
+            self.buffer += data
+            offset = 0
+            while True:
+                frame = decode_frame(self.buffer, offset)
+                if frame is None:
+                    break
+                frame_type, seq, timestamp, payload, offset = frame
+                snapshot = self.decoder.feed(frame_type, seq, timestamp, payload)
+                if snapshot is not None:
+                    latest = snapshot
+            del self.buffer[:offset]
+            if blocking:
+                break
+        return latest
+
+    def poll(self):
+        if not self.connected:
+            return None
+        return self._receive()
+
+    def system_info(self):
+        return self.decoder.system_info
+
+    def close(self):
+        self.connected = False
+        self.sock.close()
@@ -0,0 +1,93 @@
+import numpy as np
+
+# Exponentially weighted baselines: a sample is anomalous when it sits more
+# than THRESHOLD standard deviations from its own series' moving mean. The
+# floors keep near-constant series (an idle daemon at 0.0%) from flagging on
+# every tiny wobble.
+ALPHA = 0.05
+THRESHOLD = 4.0
+WARMUP = 10
+CPU_FLOOR = 2.0
+MEM_FLOOR = 0.5
+
+
+def ewma_step(mean, var, values, alpha, floor):
+    # One vectorized update for any number of series. Returns the z-scores of
+    # `values` against the state *before* the update, plus the new state.
+    # Deviations smaller than `floor` percentage points never score above 1.
+    diff = values - mean
+    z = diff / np.sqrt(var + floor * floor)
+    increment = alpha * diff
+    return z, mean + increment, (1 - alpha) * (var + diff * increment)
+
+
+class AnomalyDetector:
+    # Per-process EWMA mean/variance of CPU and memory, kept as PID-sorted
+    # arrays: constant memory per tracked PID, one vectorized pass per snapshot.
+    # Exited PIDs drop out of the state on the next update.
+    def __init__(self, alpha=ALPHA, threshold=THRESHOLD, warmup=WARMUP):
+        self.alpha = alpha
+        self.threshold = threshold
+        self.warmup = warmup
+        self.reset()
+
+    def reset(self):
+        self.pids = np.empty(0, dtype=np.int64)
+        self.state = np.empty((4, 0), dtype=np.float64)  # cpu mean/var, mem mean/var
+        self.samples = np.empty(0, dtype=np.int64)
+        self.system_state = None
+        self.system_samples = 0
+        # Results of the last update, aligned with that snapshot's rows
+        self.cpu_z = np.empty(0, dtype=np.float64)
+        self.mem_z = np.empty(0, dtype=np.float64)
+        self.flags = np.empty(0, dtype=bool)
+        self.baseline = np.empty((2, 0), dtype=np.float64)
+        self.system_z = (0.0, 0.0)
+        self.system_flags = (False, False)
+
+    def update(self, snapshot):
+        cpu = snapshot.cpu.astype(np.float64)
+        mem = snapshot.mem.astype(np.float64)
+
+        # Carry state over for PIDs seen before; new PIDs start at their value
+        state = np.empty((4, len(cpu)), dtype=np.float64)
+        state[0], state[1], state[2], state[3] = cpu, 0.0, mem, 0.0
+        samples = np.zeros(len(cpu), dtype=np.int64)
+        if len(self.pids) and len(cpu):
+            pos = np.minimum(np.searchsorted(self.pids, snapshot.pids), len(self.pids) - 1)
+            known = self.pids[pos] == snapshot.pids
+            state[:, known] = self.state[:, pos[known]]
+            samples[known] = self.samples[pos[known]]
+
+        self.baseline = state[[0, 2]].copy()
+        cpu_z, state[0], state[1] = ewma_step(state[0], state[1], cpu, self.alpha, CPU_FLOOR)
+        mem_z, state[2], state[3] = ewma_step(state[2], state[3], mem, self.alpha, MEM_FLOOR)
+        ready = samples >= self.warmup
+        self.cpu_z = np.where(ready, cpu_z, 0.0)
+        self.mem_z = np.where(ready, mem_z, 0.0)
+        self.flags = (np.abs(self.cpu_z) > self.threshold) | (np.abs(self.mem_z) > self.threshold)
+        self.pids = snapshot.pids.copy()
+        self.state = state
+        self.samples = samples + 1
+
+        # System totals use the same update on a pair of series
+        totals = np.array([snapshot.cpu_percent, snapshot.mem_percent], dtype=np.float64)
+        if self.system_state is None:
+            self.system_state = (totals, np.zeros(2))
+        z, mean, var = ewma_step(*self.system_state, totals, self.alpha,
+                                 np.array([CPU_FLOOR, MEM_FLOOR]))
+        self.system_state = (mean, var)
+        if self.system_samples >= self.warmup:
+            self.system_z = (float(z[0]), float(z[1]))
+            self.system_flags = (abs(z[0]) > self.threshold, abs(z[1]) > self.threshold)
+        self.system_samples += 1
+        return self.flags
+
+    def describe(self, i):
+        # Tooltip text for row i of the last snapshot
+        parts = []
+        if abs(self.cpu_z[i]) > self.threshold:
+            parts.append(f"CPU {self.cpu_z[i]:+.1f}σ from its baseline of {self.baseline[0, i]:.1f}%")
+        if abs(self.mem_z[i]) > self.threshold:
+            parts.append(f"memory {self.mem_z[i]:+.1f}σ from its baseline of {self.baseline[1, i]:.1f}%")
+        return "; ".join(parts)
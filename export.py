@@ -0,0 +1,139 @@
+import abc
+import csv
+import os
+
+import numpy as np
+
+from snapshot import STATUSES
+
+COLUMNS = ["timestamp", "pid", "name", "username", "cpu_percent", "memory_percent", "status",
+           "system_cpu_percent", "system_memory_percent"]
+
+STATUS_NAMES = np.array(STATUSES, dtype=object)
+
+
+class SnapshotExporter(abc.ABC):
+    # Streams snapshots to disk in bounded batches: rows are buffered as
+    # column arrays and flushed every `batch_rows`, so memory stays constant
+    # however long the export runs
+    def __init__(self, path, batch_rows=65536):
+        self.path = path
+        self.batch_rows = batch_rows
+        self.pending = []
+        self.pending_rows = 0
+        self.rows_written = 0
+        self.snapshots_written = 0
+
+    def write(self, snapshot):
+        # Rows stay buffered across polls, so borrowed columns are copied
+        snapshot = snapshot.keep()
+        n = len(snapshot)
+        self.pending.append((
+            np.full(n, snapshot.timestamp), snapshot.pids, snapshot.names, snapshot.users,
+            snapshot.cpu, snapshot.mem, STATUS_NAMES[snapshot.statuses],
+            np.full(n, snapshot.cpu_percent, dtype=np.float32),
+            np.full(n, snapshot.mem_percent, dtype=np.float32),
+        ))
+        self.pending_rows += n
+        self.snapshots_written += 1
+        if self.pending_rows >= self.batch_rows:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        columns = [np.concatenate(parts) for parts in zip(*self.pending)]
+        self.pending = []
+        self.pending_rows = 0
+        self.write_batch(columns)
+        self.rows_written += len(columns[0])
+
+    @abc.abstractmethod
+    def write_batch(self, columns):
+        pass
+
+    def close(self):
+        self.flush()
+
+
+class CsvExporter(SnapshotExporter):
+    def __init__(self, path, batch_rows=16384):
+        super().__init__(path, batch_rows)
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(COLUMNS)
+
+    def write_batch(self, columns):
+        timestamps, pids, names, users, cpu, mem, statuses, system_cpu, system_mem = columns
+        self.writer.writerows(zip(
+            np.round(timestamps, 3).tolist(), pids.tolist(), names, users,
+            np.round(cpu.astype(np.float64), 1).tolist(), np.round(mem.astype(np.float64), 2).tolist(),
+            statuses, np.round(system_cpu.astype(np.float64), 1).tolist(),
+            np.round(system_mem.astype(np.float64), 1).tolist()
+        ))
+
+    def close(self):
+        super().close()
+        self.file.close()
+
+
+class ArrowExporter(SnapshotExporter):
+    # Parquet (one row group per batch) or Arrow IPC, depending on `fmt`
+    def __init__(self, path, fmt="parquet", batch_rows=131072):
+        super().__init__(path, batch_rows)
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise RuntimeError("Parquet/Arrow export requires pyarrow (pip install pyarrow)")
+        self.pa = pa
+        self.schema = pa.schema([
+            ("timestamp", pa.timestamp("ms", tz="UTC")),
+            ("pid", pa.int64()),
+            ("name", pa.string()),
+            ("username", pa.string()),
+            ("cpu_percent", pa.float32()),
+            ("memory_percent", pa.float32()),
+            ("status", pa.dictionary(pa.int8(), pa.string())),
+            ("system_cpu_percent", pa.float32()),
+            ("system_memory_percent", pa.float32()),
+        ])
+        if fmt == "parquet":
+            import pyarrow.parquet as pq
+            self.writer = pq.ParquetWriter(path, self.schema, compression="zstd")
+        else:
+            import pyarrow.ipc as ipc
+            self.writer = ipc.new_file(path, self.schema)
+
+    def write_batch(self, columns):
+        pa = self.pa
+        timestamps, pids, names, users, cpu, mem, statuses, system_cpu, system_mem = columns
+        batch = pa.record_batch([
+            pa.array((timestamps * 1000).astype(np.int64), pa.int64()).cast(self.schema.field("timestamp").type),
+            pa.array(pids, pa.int64()),
+            pa.array(names, pa.string()),
+            pa.array(users, pa.string()),
+            pa.array(cpu, pa.float32()),
+            pa.array(mem, pa.float32()),
+            pa.array(statuses, pa.string()).dictionary_encode().cast(self.schema.field("status").type),
+            pa.array(system_cpu, pa.float32()),
+            pa.array(system_mem, pa.float32()),
+        ], schema=self.schema)
+        if hasattr(self.writer, "write_batch"):
+            self.writer.write_batch(batch)
+        else:
+            self.writer.write_table(pa.Table.from_batches([batch]))
+
+    def close(self):
+        super().close()
+        self.writer.close()
+
+
+def open_exporter(path, fmt=None):
+    fmt = fmt or os.path.splitext(path)[1].lstrip(".").lower()
+    if fmt == "csv":
+        return CsvExporter(path)
+    if fmt in ("parquet", "pq"):
+        return ArrowExporter(path, "parquet")
+    if fmt in ("arrow", "feather", "ipc"):
+        return ArrowExporter(path, "arrow")
+    raise ValueError(f"Unknown export format: {fmt or path}")
@@ -0,0 +1,295 @@
+import asyncio
+import heapq
+import os
+import random
+import socket
+import threading
+import time
+
+import numpy as np
+
+from agent import parse_address
+from protocol import (HEADER, MAGIC, MAX_PAYLOAD, ProtocolError, SnapshotDecoder, encode_delta,
+                      encode_info, encode_keyframe)
+from snapshot import SyntheticSampler
+
+# Per-host reconnect backoff bounds in seconds
+MIN_BACKOFF = 0.5
+MAX_BACKOFF = 30.0
+
+
+async def close_writer(writer):
+    # Close a stream and wait for the transport to go away; errors from a
+    # connection that is already broken do not matter at this point
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+
+
+class HostState:
+    def __init__(self, address):
+        self.address = address
+        self.status = "connecting"
+        self.error = ""
+        self.snapshot = None
+        self.system_info = None
+        self.top_rows = []
+        self.updated_at = 0.0
+        self.reconnects = 0
+        self.frames = 0
+        self.bytes = 0
+
+
+class FleetAggregator:
+    # Keeps one persistent connection per agent on a private asyncio loop.
+    # Every host only retains its latest decoded snapshot and a precomputed
+    # top-N, so a slow consumer never queues frames: the newest sample simply
+    # replaces the previous one, and a host that cannot keep up is throttled by
+    # its socket buffer and resynchronised by the agent with a keyframe.
+    def __init__(self, addresses, top_n=50, max_connecting=32):
+        self.hosts = [HostState(address) for address in addresses]
+        self.top_n = top_n
+        self.max_connecting = max_connecting
+        self.lock = threading.Lock()
+        self.loop = None
+        self.thread = None
+        self.tasks = []
+
+    def start(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run, name="fleet", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        # Bound concurrent connection attempts so a fleet-wide outage does not
+        # turn into a reconnect storm
+        self.connect_slots = asyncio.Semaphore(self.max_connecting)
+        self.tasks = [self.loop.create_task(self._follow(host)) for host in self.hosts]
+        self.loop.run_forever()
+        self.loop.close()
+
+    async def _shutdown(self):
+        # Cancelled tasks close their own connections on the way out
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+
+    def stop(self):
+        if self.loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop).result(timeout=5)
+        except Exception as e:
+            print(f"[fleet] shutdown: {type(e).__name__}: {e}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=5)
+
+    async def _open(self, address):
+        family, target = parse_address(address)
+        if family == socket.AF_UNIX:
+            return await asyncio.open_unix_connection(target, limit=MAX_PAYLOAD)
+        return await asyncio.open_connection(target[0], target[1], limit=MAX_PAYLOAD)
+
+    async def _follow(self, host):
+        backoff = MIN_BACKOFF
+        while True:
+            writer = None
+            try:
+                async with self.connect_slots:
+                    reader, writer = await asyncio.wait_for(self._open(host.address), timeout=5)
+                host.status = "up"
+                host.error = ""
+                backoff = MIN_BACKOFF
+                await self._read_frames(host, reader)
+                host.error = "connection closed"
+            except asyncio.CancelledError:
+                raise
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError,
+                    ProtocolError) as e:
+                host.error = str(e) or type(e).__name__
+            except Exception as e:
+                # A corrupt or truncated payload can fail anywhere in decoding;
+                # treat it like a broken connection rather than losing the host
+                host.error = f"{type(e).__name__}: {e}"
+                print(f"[fleet] {host.address}: {host.error}")
+            finally:
+                if writer is not None:
+                    await close_writer(writer)
+            host.status = "down"
+            with self.lock:
+                host.top_rows = []
+            host.reconnects += 1
+            await asyncio.sleep(backoff * random.uniform(0.8, 1.2))
+            backoff = min(backoff * 2, MAX_BACKOFF)
+
+    async def _read_frames(self, host, reader):
+        decoder = SnapshotDecoder()
+        while True:
+            header = await reader.readexactly(HEADER.size)
+            magic, frame_type, seq, timestamp, length = HEADER.unpack(header)
+            if magic != MAGIC or length > MAX_PAYLOAD:
+                raise ProtocolError("Corrupt frame header")
+            payload = await reader.readexactly(length)
+            snapshot = decoder.feed(frame_type, seq, timestamp, payload)
+            host.frames = decoder.frames
+            host.bytes = decoder.bytes
+            if decoder.system_info is not None:
+                host.system_info = decoder.system_info
+            if snapshot is not None:
+                top_rows = [
+                    (float(snapshot.cpu[i]), float(snapshot.mem[i]), int(snapshot.pids[i]),
+                     snapshot.names[i], snapshot.users[i])
+                    for i in snapshot.top(self.top_n)
+                ]
+                with self.lock:
+                    host.snapshot = snapshot
+                    host.top_rows = top_rows
+                    host.updated_at = time.time()
+
+    def overview(self):
+        # One row per host: (address, status, cpu %, mem %, processes, busiest, age, error)
+        now = time.time()
+        rows = []
+        with self.lock:
+            for host in self.hosts:
+                snapshot = host.snapshot
+                if snapshot is None:
+                    rows.append((host.address, host.status, None, None, 0, "", None, host.error))
+                    continue
+                busiest = f"{host.top_rows[0][3]} ({host.top_rows[0][0]:.1f}%)" if host.top_rows else ""
+                rows.append((host.address, host.status, snapshot.cpu_percent, snapshot.mem_percent,
+                             len(snapshot), busiest, now - host.updated_at, host.error))
+        return rows
+
+    def global_top(self, n):
+        # Merge the per-host top lists: O(hosts * n) regardless of fleet size
+        with self.lock:
+            candidates = [(row, host.address) for host in self.hosts for row in host.top_rows]
+        return [(address,) + row for row, address in
+                heapq.nlargest(n, candidates, key=lambda item: item[0][0])]
+
+    def totals(self):
+        with self.lock:
+            live = [host.snapshot for host in self.hosts if host.status == "up" and host.snapshot]
+            return {
+                "hosts": len(self.hosts),
+                "up": len(live),
+                "processes": sum(len(snapshot) for snapshot in live),
+                "cpu": float(np.mean([s.cpu_percent for s in live])) if live else 0.0,
+                "mem": float(np.mean([s.mem_percent for s in live])) if live else 0.0,
+            }
+
+
+class SimulatedFleet:
+    # Runs `count` fake agents speaking the real protocol on local sockets,
+    # each backed by a SyntheticSampler, on its own asyncio loop
+    def __init__(self, count, interval=1.0, processes=300, socket_dir=None):
+        self.count = count
+        self.interval = interval
+        self.processes = processes
+        self.socket_dir = socket_dir or f"/tmp/process-monitor-fleet-{os.getpid()}"
+        self.addresses = []
+        self.loop = None
+        self.thread = None
+        self.ready = threading.Event()
+        self.bound = 0
+        self.tasks = []
+        self.servers = []
+        self.handlers = {}  # connection task -> its writer
+
+    def start(self):
+        os.makedirs(self.socket_dir, exist_ok=True)
+        self.addresses = [f"unix:{self.socket_dir}/agent-{i}.sock" for i in range(self.count)]
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run, name="simulated-fleet", daemon=True)
+        self.thread.start()
+        self.ready.wait(timeout=30)
+        return self.addresses
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.tasks = [self.loop.create_task(self._serve(i, address[len("unix:"):]))
+                      for i, address in enumerate(self.addresses)]
+        self.loop.run_forever()
+        self.loop.close()
+
+    async def _serve(self, index, path):
+        sampler = SyntheticSampler(self.processes, seed=index, hostname=f"sim-{index:03d}")
+        viewers = {}
+        info_frame = encode_info(sampler.system_info())
+
+        async def handle(reader, writer):
+            task = asyncio.current_task()
+            self.handlers[task] = writer
+            viewers[writer] = True
+            writer.write(info_frame)
+            try:
+                await reader.read()
+            except OSError:
+                # Viewer reset the connection with frames still unread
+                pass
+            finally:
+                viewers.pop(writer, None)
+                self.handlers.pop(task, None)
+                await close_writer(writer)
+
+        if os.path.exists(path):
+            os.unlink(path)
+        self.servers.append(await asyncio.start_unix_server(handle, path))
+        self.bound += 1
+        if self.bound == self.count:
+            self.ready.set()
+
+        previous = None
+        seq = 0
+        # Stagger hosts so the fleet does not tick in lockstep
+        await asyncio.sleep(random.uniform(0, self.interval))
+        while True:
+            snapshot = sampler.poll()
+            seq += 1
+            delta = encode_delta(previous, snapshot, seq) if previous is not None else None
+            keyframe = None
+            for writer, needs_keyframe in list(viewers.items()):
+                if writer.transport.get_write_buffer_size() > 1024 * 1024:
+                    viewers[writer] = True
+                    continue
+                if needs_keyframe or delta is None:
+                    keyframe = keyframe or encode_keyframe(snapshot, seq)
+                    writer.write(keyframe)
+                else:
+                    writer.write(delta)
+                viewers[writer] = False
+            previous = snapshot
+            await asyncio.sleep(self.interval)
+
+    async def _shutdown(self):
+        for server in self.servers:
+            server.close()
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        # Connection handlers are not cancelled (asyncio logs cancelled
+        # client_connected_cb tasks as errors); closing the socket ends their
+        # read and they close up themselves
+        handlers = dict(self.handlers)
+        for writer in handlers.values():
+            writer.close()
+        await asyncio.gather(*handlers, return_exceptions=True)
+        for server in self.servers:
+            await server.wait_closed()
+
+    def stop(self):
+        if self.loop is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop).result(timeout=5)
+            except Exception as e:
+                print(f"[fleet] simulation shutdown: {type(e).__name__}: {e}")
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join(timeout=5)
+        for address in self.addresses:
+            path = address[len("unix:"):]
+            if os.path.exists(path):
+                os.unlink(path)
@@ -0,0 +1,169 @@
+import os
+import time
+
+import numpy as np
+import psutil
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+
+
+def group_totals(codes, snapshot, group_count):
+    # Vectorized per-group reduction: count, summed CPU and summed memory
+    counts = np.bincount(codes, minlength=group_count)
+    cpu = np.bincount(codes, weights=snapshot.cpu, minlength=group_count)
+    mem = np.bincount(codes, weights=snapshot.mem, minlength=group_count)
+    return counts, cpu, mem
+
+
+def read_cgroup_path(pid):
+    # Prefer the unified (v2) hierarchy; on v1 hosts use the memory controller,
+    # falling back to whatever hierarchy is listed first
+    try:
+        with open(f"/proc/{pid}/cgroup") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+    fallback = None
+    for line in lines:
+        hierarchy, controllers, path = line.split(":", 2)
+        if hierarchy == "0" and controllers == "":
+            return path
+        if "memory" in controllers.split(","):
+            fallback = path
+        elif fallback is None:
+            fallback = path
+    return fallback
+
+
+def read_exe_path(pid):
+    try:
+        return psutil.Process(pid).exe() or None
+    except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess, OSError):
+        return None
+
+
+class PidKeyResolver:
+    # Maps PIDs to group codes for keys that are not part of the snapshot
+    # (cgroup path, executable). The key is read once per process lifetime;
+    # later lookups are a vectorized searchsorted over the cached (PID-sorted)
+    # arrays and only new PIDs touch the filesystem.
+    def __init__(self, read_key):
+        self.read_key = read_key
+        self.paths = []
+        self.codes_by_path = {}
+        self.pids = np.empty(0, dtype=np.int64)
+        self.codes = np.empty(0, dtype=np.int64)
+        self.reads = 0
+
+    def code_for(self, path):
+        code = self.codes_by_path.get(path)
+        if code is None:
+            code = len(self.paths)
+            self.codes_by_path[path] = code
+            self.paths.append(path)
+        return code
+
+    def resolve(self, pids):
+        # pids: sorted int64 array from a snapshot; returns a code per PID
+        if len(self.pids):
+            pos = np.minimum(np.searchsorted(self.pids, pids), len(self.pids) - 1)
+            known = self.pids[pos] == pids
+        else:
+            pos = np.zeros(len(pids), dtype=np.int64)
+            known = np.zeros(len(pids), dtype=bool)
+
+        codes = np.where(known, self.codes[pos] if len(self.codes) else 0, -1)
+        missing = np.flatnonzero(~known)
+        if len(missing):
+            new_codes = np.empty(len(missing), dtype=np.int64)
+            for i, pid in enumerate(pids[missing].tolist()):
+                path = self.read_key(pid)
+                self.reads += 1
+                new_codes[i] = self.code_for(path if path is not None else "?")
+            codes[missing] = new_codes
+
+        # Keep only live PIDs so the cache is bounded by the process count
+        self.pids = pids.copy()
+        self.codes = codes.astype(np.int64)
+        self._compact()
+        return self.codes
+
+    def _compact(self):
+        # Drop keys no live PID maps to, renumbering the rest, once they make
+        # up more than half of the table
+        used = np.bincount(self.codes, minlength=len(self.paths)) > 0
+        if 2 * int(used.sum()) >= len(self.paths):
+            return
+        remap = np.cumsum(used) - 1
+        self.paths = [path for path, keep in zip(self.paths, used.tolist()) if keep]
+        self.codes_by_path = {path: code for code, path in enumerate(self.paths)}
+        self.codes = remap[self.codes]
+
+
+def factorize(values):
+    # Group codes for a column already in the snapshot (name, user)
+    labels, codes = np.unique(values, return_inverse=True)
+    return codes, labels.tolist()
+
+
+class CgroupStats:
+    # The cgroup's own accounting, read only for the groups being displayed.
+    # usage() is meant to be called once per tick; `latest` keeps its last
+    # result so the tree can be redrawn between ticks without resampling.
+    def __init__(self, root=CGROUP_ROOT):
+        self.root = root
+        self.unified = os.path.exists(os.path.join(root, "cgroup.controllers"))
+        self.last_usage = {}
+        self.latest = {}
+
+    def _read(self, *parts):
+        try:
+            with open(os.path.join(self.root, *parts)) as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def usage(self, path):
+        # Returns (cpu percent since the last call or None, memory bytes or None)
+        relative = path.lstrip("/")
+        if self.unified:
+            stat = self._read(relative, "cpu.stat")
+            usage_usec = None
+            if stat:
+                for line in stat.splitlines():
+                    key, _, value = line.partition(" ")
+                    if key == "usage_usec":
+                        usage_usec = int(value)
+                        break
+            memory = self._read(relative, "memory.current")
+        else:
+            usage = self._read("cpuacct", relative, "cpuacct.usage")
+            usage_usec = int(usage) // 1000 if usage else None
+            memory = self._read("memory", relative, "memory.usage_in_bytes")
+
+        cpu_percent = None
+        now = time.monotonic()
+        if usage_usec is not None:
+            previous = self.last_usage.get(path)
+            if previous is not None and now > previous[1]:
+                cpu_percent = (usage_usec - previous[0]) / ((now - previous[1]) * 1e6) * 100
+            self.last_usage[path] = (usage_usec, now)
+        memory_bytes = int(memory) if memory and memory.strip().isdigit() else None
+        self.latest[path] = (cpu_percent, memory_bytes)
+        return cpu_percent, memory_bytes
+
+    def cached(self, path):
+        return self.latest.get(path, (None, None))
+
+    def prune(self, paths):
+        # Forget cgroups no process belongs to any more
+        paths = set(paths)
+        for table in (self.last_usage, self.latest):
+            for path in [path for path in table if path not in paths]:
+                del table[path]
+
+
+def cgroup_label(path):
+    if path in ("/", "?", ""):
+        return path or "/"
+    return path.rstrip("/").rsplit("/", 1)[-1]
@@ -0,0 +1,120 @@
+import os
+import threading
+
+import psutil
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+
+# Rows are streamed to the GUI in batches of BATCH_SIZE so the first results
+# show up immediately even for processes with 100k+ descriptors
+BATCH_SIZE = 1000
+
+KINDS = ("files", "connections", "maps")
+
+
+def _batched(rows, cancel):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            if cancel.is_set():
+                return
+            yield batch
+            batch = []
+    if batch and not cancel.is_set():
+        yield batch
+
+
+def _format_address(address):
+    if not address:
+        return ""
+    if isinstance(address, str):
+        return address
+    return f"{address.ip}:{address.port}"
+
+
+def iter_open_files(pid, cancel):
+    # (fd, target) for every descriptor, including sockets, pipes and
+    # anonymous inodes; /proc/<pid>/fd is read lazily, one entry at a time
+    if psutil.LINUX:
+        def rows():
+            with os.scandir(f"/proc/{pid}/fd") as entries:
+                for entry in entries:
+                    try:
+                        yield int(entry.name), os.readlink(entry.path)
+                    except OSError:
+                        continue
+        try:
+            yield from _batched(rows(), cancel)
+        except FileNotFoundError:
+            raise psutil.NoSuchProcess(pid)
+        except PermissionError:
+            raise psutil.AccessDenied(pid)
+        return
+    files = psutil.Process(pid).open_files()
+    yield from _batched(((f.fd, f.path) for f in files), cancel)
+
+
+def iter_connections(pid, cancel):
+    process = psutil.Process(pid)
+    read = getattr(process, "net_connections", None) or process.connections
+    connections = read(kind="all")
+    yield from _batched(((str(c.fd), c.type.name if hasattr(c.type, "name") else str(c.type),
+                          _format_address(c.laddr), _format_address(c.raddr), c.status)
+                         for c in connections), cancel)
+
+
+def iter_memory_maps(pid, cancel):
+    # (address range, permissions, offset, path), straight from /proc/<pid>/maps
+    if psutil.LINUX:
+        def rows():
+            with open(f"/proc/{pid}/maps") as f:
+                for line in f:
+                    fields = line.split(None, 5)
+                    path = fields[5].rstrip("\n") if len(fields) > 5 else ""
+                    yield fields[0], fields[1], fields[2], path
+        try:
+            yield from _batched(rows(), cancel)
+        except FileNotFoundError:
+            raise psutil.NoSuchProcess(pid)
+        except PermissionError:
+            raise psutil.AccessDenied(pid)
+        return
+    maps = psutil.Process(pid).memory_maps(grouped=False)
+    yield from _batched(((m.addr, m.perms, "", m.path) for m in maps), cancel)
+
+
+READERS = {"files": iter_open_files, "connections": iter_connections, "maps": iter_memory_maps}
+
+
+class InspectorSignals(QObject):
+    batch = pyqtSignal(int, str, object)
+    finished = pyqtSignal(int, str, str)
+
+
+class InspectorWorker(QRunnable):
+    # Streams one process's files, connections and maps to the GUI. Each load
+    # carries a generation number so batches from a cancelled load that are
+    # already queued can be told apart and dropped.
+    def __init__(self, pid, generation):
+        super().__init__()
+        self.pid = pid
+        self.generation = generation
+        self.cancel = threading.Event()
+        self.signals = InspectorSignals()
+
+    def run(self):
+        for kind in KINDS:
+            if self.cancel.is_set():
+                return
+            error = ""
+            try:
+                for batch in READERS[kind](self.pid, self.cancel):
+                    self.signals.batch.emit(self.generation, kind, batch)
+            except psutil.NoSuchProcess:
+                error = "process no longer exists"
+            except psutil.AccessDenied:
+                error = "access denied"
+            except Exception as e:
+                error = str(e)
+            if not self.cancel.is_set():
+                self.signals.finished.emit(self.generation, kind, error)
@@ -0,0 +1,186 @@
+import cProfile
+import io
+import os
+import pstats
+import tempfile
+import time
+import tracemalloc
+from collections import deque
+
+import numpy as np
+import psutil
+
+# Phases of one dashboard tick, in the order they run. "export" only shows up
+# while exporting; "format" is the lazy cell formatting done when the view
+# paints, which happens after the tick itself (see charge()).
+PHASES = ("collect", "export", "diff", "select", "render", "format")
+
+DEFAULT_PROFILE_DIR = os.path.join(tempfile.gettempdir(), "process-monitor-profiles")
+
+
+class TickInstrumentation:
+    # Rolling per-phase timings of the refresh path plus the monitor's own CPU
+    # and RSS. When disabled every hook returns after a single attribute check,
+    # so leaving the calls in the hot path costs next to nothing.
+    def __init__(self, window=600, log_interval=0):
+        self.enabled = log_interval > 0
+        self.log_interval = log_interval
+        self.samples = {phase: deque(maxlen=window) for phase in PHASES + ("total",)}
+        self.cpu = deque(maxlen=window)
+        self.rss = deque(maxlen=window)
+        self.process = psutil.Process(os.getpid())
+        self.current = {}
+        self.deferred = {}
+        self.active = False
+        self.start = 0.0
+        self.last = 0.0
+        self.last_log = time.monotonic()
+        self.ticks = 0
+        # Seconds from process start to first paint, first data, ...
+        self.milestones = {}
+
+    def set_enabled(self, enabled):
+        self.enabled = enabled or self.log_interval > 0
+        if self.enabled:
+            # Prime the CPU counter so the first reading is meaningful
+            self.process.cpu_percent(None)
+
+    def begin(self):
+        if not self.enabled:
+            return
+        self.current = {}
+        self.active = True
+        self.start = self.last = time.perf_counter()
+
+    def mark(self, phase):
+        # Charges the time since the previous mark to `phase`
+        if not self.active:
+            return
+        now = time.perf_counter()
+        self.current[phase] = self.current.get(phase, 0.0) + now - self.last
+        self.last = now
+
+    def charge(self, phase, elapsed):
+        # Adds work done outside a tick, such as painting what the last tick
+        # changed, to the next tick that completes
+        if self.enabled:
+            self.deferred[phase] = self.deferred.get(phase, 0.0) + elapsed
+
+    def end(self):
+        if not self.active:
+            return
+        self.active = False
+        if not self.current:
+            # Nothing new to show this tick (e.g. no snapshot from a remote source)
+            return
+        now = time.perf_counter()
+        for phase, elapsed in self.deferred.items():
+            self.current[phase] = self.current.get(phase, 0.0) + elapsed
+        deferred = sum(self.deferred.values())
+        self.deferred = {}
+        for phase, elapsed in self.current.items():
+            self.samples.setdefault(phase, deque(maxlen=self.samples["total"].maxlen)).append(elapsed)
+        self.samples["total"].append(now - self.start + deferred)
+        self.cpu.append(self.process.cpu_percent(None))
+        self.rss.append(self.process.memory_info().rss)
+        self.ticks += 1
+
+        if self.log_interval and time.monotonic() - self.last_log >= self.log_interval:
+            self.last_log = time.monotonic()
+            print("[instrumentation] " + " | ".join(self.report_lines()))
+
+    def percentiles(self, name, qs=(50, 90, 99)):
+        values = self.samples.get(name)
+        if not values:
+            return None
+        return np.percentile(np.fromiter(values, dtype=np.float64), qs)
+
+    def report_lines(self):
+        lines = []
+        for name in PHASES + tuple(p for p in self.samples if p not in PHASES):
+            result = self.percentiles(name)
+            if result is None:
+                continue
+            p50, p90, p99 = result * 1000
+            lines.append(f"{name:<8} p50 {p50:6.2f}  p90 {p90:6.2f}  p99 {p99:6.2f} ms")
+        if self.cpu:
+            cpu = np.fromiter(self.cpu, dtype=np.float64)
+            lines.append(f"self cpu p50 {np.percentile(cpu, 50):5.1f}%  p99 {np.percentile(cpu, 99):5.1f}%")
+            lines.append(f"self rss {self.rss[-1] / (1024**2):.1f} MB  (max {max(self.rss) / (1024**2):.1f} MB)")
+        lines.append(f"ticks    {self.ticks}")
+        for name, seconds in self.milestones.items():
+            lines.append(f"{name:<12} {seconds * 1000:7.0f} ms")
+        return lines
+
+
+class TickProfiler:
+    # On-demand diagnostics for a running dashboard. `request_profile()` runs
+    # cProfile over the next `ticks` refreshes and writes a .prof dump plus a
+    # text summary; `tracemalloc_checkpoint()` starts tracing on first use and
+    # writes the allocation diff against the previous checkpoint after that.
+    # Requests only set a flag, so they are safe to call from a signal handler.
+    def __init__(self, output_dir=DEFAULT_PROFILE_DIR, ticks=20):
+        self.output_dir = output_dir
+        self.ticks = ticks
+        self.pending = False
+        self.profile = None
+        self.remaining = 0
+        self.baseline = None
+
+    def request_profile(self):
+        self.pending = True
+
+    def _path(self, prefix, suffix):
+        os.makedirs(self.output_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        return os.path.join(self.output_dir, f"{prefix}-{stamp}-{os.getpid()}{suffix}")
+
+    def begin(self):
+        if self.pending and self.profile is None:
+            self.pending = False
+            self.profile = cProfile.Profile()
+            self.remaining = self.ticks
+        if self.profile is not None:
+            self.profile.enable()
+
+    def end(self, refreshed=True):
+        # Returns the dump path once the requested number of ticks is
+        # profiled. Ticks that did not refresh (throttled, or no new snapshot
+        # from the source) are not counted.
+        if self.profile is None:
+            return None
+        self.profile.disable()
+        if not refreshed:
+            return None
+        self.remaining -= 1
+        if self.remaining > 0:
+            return None
+        profile, self.profile = self.profile, None
+        path = self._path("profile", ".prof")
+        profile.dump_stats(path)
+        summary = io.StringIO()
+        stats = pstats.Stats(profile, stream=summary)
+        stats.sort_stats("cumulative").print_stats(40)
+        with open(path[:-len(".prof")] + ".txt", "w") as f:
+            f.write(summary.getvalue())
+        return path
+
+    def tracemalloc_checkpoint(self, limit=40):
+        # Returns (message, path or None)
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+            self.baseline = tracemalloc.take_snapshot()
+            return "tracemalloc started; trigger again to write a diff", None
+        current = tracemalloc.take_snapshot()
+        baseline, self.baseline = self.baseline, current
+        if baseline is None:
+            return "tracemalloc baseline taken", None
+        path = self._path("tracemalloc", ".txt")
+        diff = current.compare_to(baseline, "lineno")
+        with open(path, "w") as f:
+            size, peak = tracemalloc.get_traced_memory()
+            f.write(f"traced {size / 1024:.0f} KiB, peak {peak / 1024:.0f} KiB\n\n")
+            for stat in diff[:limit]:
+                f.write(f"{stat}\n")
+        current.dump(path[:-len(".txt")] + ".snapshot")
+        return f"tracemalloc diff written to {path}", path
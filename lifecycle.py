@@ -0,0 +1,239 @@
+import abc
+import os
+import socket
+import struct
+import threading
+import time
+from collections import deque
+
+import psutil
+
+# Process lifecycle events, captured between dashboard ticks so processes that
+# live for less than a refresh interval are still seen. On Linux with
+# CAP_NET_ADMIN the kernel's proc connector pushes every fork/exec/exit; without
+# it the PID set is diffed at SCAN_INTERVAL, which catches anything that lives
+# longer than one scan.
+RING_SIZE = 10000
+SCAN_INTERVAL = 0.05
+
+NETLINK_CONNECTOR = 11
+CN_IDX_PROC = 1
+CN_VAL_PROC = 1
+PROC_CN_MCAST_LISTEN = 1
+PROC_CN_MCAST_IGNORE = 2
+PROC_EVENT_FORK = 0x00000001
+PROC_EVENT_EXEC = 0x00000002
+PROC_EVENT_EXIT = 0x80000000
+
+NLMSG_HEADER = struct.Struct("=IHHII")
+CN_MSG = struct.Struct("=IIIIHH")
+PROC_EVENT = struct.Struct("=IIQ")
+FORK_EVENT = struct.Struct("=IIII")
+EXEC_EVENT = struct.Struct("=II")
+EXIT_EVENT = struct.Struct("=IIII")
+NLMSG_DONE = 3
+
+
+def read_process(pid):
+    # Returns (name, ppid), or None if the process is already gone
+    if psutil.LINUX:
+        try:
+            with open(f"/proc/{pid}/stat", "rb") as f:
+                stat = f.read().decode("utf-8", "replace")
+        except OSError:
+            return None
+        start, end = stat.find("("), stat.rfind(")")
+        fields = stat[end + 2:].split()
+        return stat[start + 1:end], int(fields[1])
+    try:
+        process = psutil.Process(pid)
+        return process.name(), process.ppid()
+    except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+        return None
+
+
+class LifecycleWatcher(abc.ABC):
+    # Base class: a daemon thread records (timestamp, kind, pid, ppid, name,
+    # exit_code) tuples into a bounded ring. kind is "fork" for a new process,
+    # "exec" when an existing one runs a new program, or "exit".
+    method = ""
+
+    def __init__(self, ring_size=RING_SIZE):
+        self.events = deque(maxlen=ring_size)
+        self.lock = threading.Lock()
+        self.known = {}  # pid -> (name, ppid), for naming exit events
+        self.counts = {"fork": 0, "exec": 0, "exit": 0}
+        self.running = False
+        self.thread = None
+
+    def record(self, timestamp, kind, pid, ppid, name, exit_code=None):
+        with self.lock:
+            self.events.append((timestamp, kind, pid, ppid, name, exit_code))
+            self.counts[kind] += 1
+
+    def recent(self, count):
+        # Newest first
+        with self.lock:
+            start = max(len(self.events) - count, 0)
+            events = [self.events[i] for i in range(len(self.events) - 1, start - 1, -1)]
+        return events
+
+    def rates(self, windows=(1, 10, 60), now=None):
+        # Events per second of each kind over each trailing window, as
+        # {kind: [rate per window]}; spawns are the "fork" rates
+        now = time.time() if now is None else now
+        longest = max(windows)
+        counts = {kind: [0] * len(windows) for kind in self.counts}
+        with self.lock:
+            for timestamp, kind, *_ in reversed(self.events):
+                age = now - timestamp
+                if age > longest:
+                    break
+                for i, window in enumerate(windows):
+                    if age <= window:
+                        counts[kind][i] += 1
+        return {kind: [count / window for count, window in zip(values, windows)]
+                for kind, values in counts.items()}
+
+    def seed(self):
+        # Names of processes that already exist, so their exits can be labelled
+        for pid in psutil.pids():
+            info = read_process(pid)
+            if info is not None:
+                self.known[pid] = info
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name="lifecycle", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=2)
+
+    @abc.abstractmethod
+    def run(self):
+        pass
+
+
+class NetlinkWatcher(LifecycleWatcher):
+    # Linux proc connector: every fork, exec and exit, delivered by the kernel
+    method = "netlink"
+
+    def __init__(self, ring_size=RING_SIZE):
+        super().__init__(ring_size)
+        self.sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_CONNECTOR)
+        try:
+            self.sock.bind((os.getpid(), CN_IDX_PROC))
+            self._send_op(PROC_CN_MCAST_LISTEN)
+        except OSError:
+            self.sock.close()
+            raise
+        self.sock.settimeout(0.5)
+        # Proc connector timestamps are CLOCK_MONOTONIC nanoseconds
+        self.clock_offset = time.time() - time.monotonic()
+
+    def _send_op(self, op):
+        payload = CN_MSG.pack(CN_IDX_PROC, CN_VAL_PROC, 0, 0, 4, 0) + struct.pack("=I", op)
+        header = NLMSG_HEADER.pack(NLMSG_HEADER.size + len(payload), NLMSG_DONE, 0, 0, os.getpid())
+        self.sock.send(header + payload)
+
+    def run(self):
+        self.seed()
+        while self.running:
+            try:
+                data = self.sock.recv(65536)
+            except socket.timeout:
+                continue
+            except OSError:
+                # ENOBUFS: the kernel dropped events because we fell behind
+                continue
+            offset = 0
+            while offset + NLMSG_HEADER.size <= len(data):
+                length = NLMSG_HEADER.unpack_from(data, offset)[0]
+                if length < NLMSG_HEADER.size:
+                    break
+                self.handle(data, offset + NLMSG_HEADER.size + CN_MSG.size)
+                offset += (length + 3) & ~3
+
+    def handle(self, data, offset):
+        if offset + PROC_EVENT.size > len(data):
+            return
+        what, _, timestamp_ns = PROC_EVENT.unpack_from(data, offset)
+        offset += PROC_EVENT.size
+        timestamp = timestamp_ns / 1e9 + self.clock_offset
+        if what == PROC_EVENT_FORK:
+            parent_pid, parent_tgid, child_pid, child_tgid = FORK_EVENT.unpack_from(data, offset)
+            if child_pid == child_tgid:
+                # A new process rather than a thread; the name is inherited
+                # until exec
+                parent = self.known.get(parent_tgid)
+                info = self.known[child_tgid] = (parent[0] if parent else "?", parent_tgid)
+                self.record(timestamp, "fork", child_tgid, info[1], info[0])
+        elif what == PROC_EVENT_EXEC:
+            pid, tgid = EXEC_EVENT.unpack_from(data, offset)
+            info = read_process(tgid)
+            if info is None:
+                # Exited before we could look: fall back to what fork told us
+                info = ("?", self.known.get(tgid, ("?", 0))[1])
+            self.known[tgid] = info
+            self.record(timestamp, "exec", tgid, info[1], info[0])
+        elif what == PROC_EVENT_EXIT:
+            pid, tgid, exit_code, _ = EXIT_EVENT.unpack_from(data, offset)
+            if pid == tgid:
+                name, ppid = self.known.pop(tgid, ("?", 0))
+                self.record(timestamp, "exit", tgid, ppid, name, exit_code >> 8)
+
+    def stop(self):
+        super().stop()
+        try:
+            self._send_op(PROC_CN_MCAST_IGNORE)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+class ScanWatcher(LifecycleWatcher):
+    # Unprivileged fallback: diff the PID set every `interval` seconds. New
+    # PIDs are reported as fork events with their current name; an exec
+    # within a process cannot be seen this way.
+    method = "/proc scan"
+
+    def __init__(self, ring_size=RING_SIZE, interval=SCAN_INTERVAL):
+        super().__init__(ring_size)
+        self.interval = interval
+        if not psutil.LINUX:
+            self.method = "PID scan"
+
+    def list_pids(self):
+        if psutil.LINUX:
+            return {int(entry) for entry in os.listdir("/proc") if entry.isdigit()}
+        return set(psutil.pids())
+
+    def run(self):
+        previous = self.list_pids()
+        self.seed()
+        while self.running:
+            time.sleep(self.interval)
+            current = self.list_pids()
+            now = time.time()
+            for pid in current - previous:
+                # A PID that is already gone again still counts as a spawn
+                info = read_process(pid) or ("?", 0)
+                self.known[pid] = info
+                self.record(now, "fork", pid, info[1], info[0])
+            for pid in previous - current:
+                name, ppid = self.known.pop(pid, ("?", 0))
+                self.record(now, "exit", pid, ppid, name)
+            previous = current
+
+
+def open_lifecycle_watcher(ring_size=RING_SIZE):
+    # The proc connector needs CAP_NET_ADMIN; anything else gets the scanner
+    if psutil.LINUX:
+        try:
+            return NetlinkWatcher(ring_size)
+        except OSError:
+            pass
+    return ScanWatcher(ring_size)
@@ -0,0 +1,94 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import psutil
+
+# USS/PSS come from memory_full_info(), which walks every mapping of the
+# process (/proc/<pid>/smaps) and is orders of magnitude slower than the RSS
+# the table normally shows. It is therefore read only for the rows that are
+# on screen or selected, on a small dedicated pool, and cached for TTL seconds.
+TTL = 30.0
+WORKERS = 2
+MAX_PENDING = 8
+
+
+def read_memory_detail(pid):
+    # Returns (uss, pss, read time); both None when the process is gone or
+    # off limits. PSS is Linux-only.
+    try:
+        info = psutil.Process(pid).memory_full_info()
+        uss, pss = info.uss, getattr(info, "pss", None)
+    except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess, OSError):
+        uss = pss = None
+    return uss, pss, time.monotonic()
+
+
+def format_memory_detail(uss, pss, state):
+    if state == "missing":
+        return ""
+    if state == "updating" and uss is None:
+        return "updating..."
+    if uss is None:
+        return "-"
+    text = f"{uss / (1024**2):.1f} MB"
+    if pss is not None:
+        text += f" / {pss / (1024**2):.1f} MB"
+    if state == "updating":
+        text += " ⟳"
+    elif state == "stale":
+        text += " (stale)"
+    return text
+
+
+class MemoryDetailCache:
+    def __init__(self, ttl=TTL, workers=WORKERS, max_pending=MAX_PENDING):
+        self.ttl = ttl
+        self.max_pending = max_pending
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="memory-detail")
+        self.entries = {}
+        self.pending = {}
+
+    def collect(self):
+        for pid, future in list(self.pending.items()):
+            if future.done():
+                del self.pending[pid]
+                if not future.cancelled():
+                    self.entries[pid] = future.result()
+
+    def request(self, pids, now=None):
+        # `pids` is what is wanted right now, most important first. Queued
+        # reads for anything else are cancelled, and at most max_pending reads
+        # are outstanding, so scrolling never builds up a backlog.
+        now = time.monotonic() if now is None else now
+        self.collect()
+        wanted = set(pids)
+        for pid, future in list(self.pending.items()):
+            if pid not in wanted and future.cancel():
+                del self.pending[pid]
+        for pid in pids:
+            if len(self.pending) >= self.max_pending:
+                break
+            if pid in self.pending:
+                continue
+            entry = self.entries.get(pid)
+            if entry is not None and now - entry[2] < self.ttl:
+                continue
+            self.pending[pid] = self.executor.submit(read_memory_detail, pid)
+
+    def get(self, pid, now=None):
+        # Returns (uss, pss, state); state is "fresh", "stale", "updating" or "missing"
+        now = time.monotonic() if now is None else now
+        entry = self.entries.get(pid)
+        uss, pss = (entry[0], entry[1]) if entry is not None else (None, None)
+        if pid in self.pending:
+            return uss, pss, "updating"
+        if entry is None:
+            return None, None, "missing"
+        return uss, pss, "fresh" if now - entry[2] < self.ttl else "stale"
+
+    def prune(self, live_pids):
+        for pid in set(self.entries) - set(live_pids):
+            del self.entries[pid]
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,129 @@
+import gzip
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from agent import parse_address
+
+PROMETHEUS_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+OPENMETRICS_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def render_exposition(snapshot, top_n):
+    lines = []
+
+    def gauge(name, help_text, value):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name} {value}")
+
+    gauge("process_monitor_cpu_percent", "System-wide CPU utilisation in percent.",
+          snapshot.cpu_percent)
+    gauge("process_monitor_cpu_frequency_mhz", "Current CPU frequency in MHz.", snapshot.cpu_freq)
+    gauge("process_monitor_memory_used_bytes", "Memory in use in bytes.", snapshot.mem_used)
+    gauge("process_monitor_memory_total_bytes", "Total physical memory in bytes.",
+          snapshot.mem_total)
+    gauge("process_monitor_memory_percent", "Memory utilisation in percent.", snapshot.mem_percent)
+    gauge("process_monitor_processes", "Number of running processes.", len(snapshot))
+
+    # Per-process values are keyed by rank, not PID, so the two value gauges
+    # always have exactly N series each and PID churn adds none. The cost is
+    # identity: a rank series switches between processes as the top
+    # reshuffles, so rate() or alerting over it follows a position, not a
+    # process. Which process holds a rank goes on an info series labelled
+    # with name and user. That one still grows with every distinct
+    # (rank, name, user) combination seen, bounded by 2N times the number of
+    # distinct name/user pairs that ever reach the top, not by 2N.
+    rankings = [
+        ("cpu", "process_monitor_top_cpu_percent",
+         "CPU utilisation in percent of the process at each CPU rank.",
+         snapshot.top(top_n), snapshot.cpu),
+        ("memory", "process_monitor_top_memory_percent",
+         "Share of physical memory in percent of the process at each memory rank.",
+         np.argsort(-snapshot.mem, kind='stable')[:top_n], snapshot.mem),
+    ]
+    for _, name, help_text, order, column in rankings:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        for rank, i in enumerate(order, 1):
+            lines.append(f'{name}{{rank="{rank}"}} {float(column[i]):.2f}')
+
+    name = "process_monitor_top_process_info"
+    lines.append(f"# HELP {name} Name and user of the process at each rank.")
+    lines.append(f"# TYPE {name} gauge")
+    for ranking, _, _, order, _ in rankings:
+        for rank, i in enumerate(order, 1):
+            lines.append(f'{name}{{ranking="{ranking}",rank="{rank}",'
+                         f'name="{escape_label(snapshot.names[i])}",'
+                         f'user="{escape_label(snapshot.users[i])}"}} 1')
+
+    return "\n".join(lines) + "\n"
+
+
+class MetricsExporter:
+    # Serves the latest sample as Prometheus / OpenMetrics text. The exposition
+    # is rendered once per sample in update(); scrapes only pick up the cached
+    # bytes and never trigger collection or rendering themselves.
+    def __init__(self, address, top_n=20):
+        _, self.address = parse_address(address)
+        self.top_n = top_n
+        self.cache = None
+        self.renders = 0
+        self.scrapes = 0
+        self.server = None
+        self.thread = None
+
+    def update(self, snapshot):
+        body = render_exposition(snapshot, self.top_n).encode("utf-8")
+        openmetrics = body + b"# EOF\n"
+        # Build the whole cache entry before publishing it with one assignment
+        self.cache = {
+            (False, False): body,
+            (False, True): gzip.compress(body, compresslevel=5),
+            (True, False): openmetrics,
+            (True, True): gzip.compress(openmetrics, compresslevel=5),
+        }
+        self.renders += 1
+
+    def start(self):
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                cache = exporter.cache
+                if cache is None:
+                    self.send_error(503, "No sample collected yet")
+                    return
+                exporter.scrapes += 1
+                openmetrics = "application/openmetrics-text" in self.headers.get("Accept", "")
+                compressed = "gzip" in self.headers.get("Accept-Encoding", "")
+                body = cache[(openmetrics, compressed)]
+                self.send_response(200)
+                self.send_header("Content-Type", OPENMETRICS_TYPE if openmetrics else PROMETHEUS_TYPE)
+                if compressed:
+                    self.send_header("Content-Encoding", "gzip")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(self.address, Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, name="metrics", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
@@ -0,0 +1,130 @@
+import multiprocessing
+import time
+
+import numpy as np
+import psutil
+
+from protocol import decode_frame, decode_keyframe, encode_keyframe
+from snapshot import PROC_ATTRS, Snapshot, build_snapshot, cached_system_info, collect_snapshot
+
+
+# Sharded collection for very large hosts. The PID space is split by
+# `pid % workers` across long-lived worker processes; sticky shards mean each
+# worker keeps the psutil.Process objects (and therefore the CPU-time
+# baselines) of its own PIDs between samples. Workers send their rows back as
+# a protocol keyframe, one packed columnar bytes object per shard, so the
+# hand-off costs a memcpy rather than pickling a dict per process.
+
+def _collect_shard(processes, shard, workers, attrs):
+    live = set()
+    rows = []
+    for pid in psutil.pids():
+        if pid % workers != shard:
+            continue
+        live.add(pid)
+        process = processes.get(pid)
+        if process is None:
+            try:
+                process = processes[pid] = psutil.Process(pid)
+            except psutil.NoSuchProcess:
+                continue
+        try:
+            info = process.as_dict(attrs)
+        except psutil.NoSuchProcess:
+            continue
+        rows.append(info)
+    for pid in set(processes) - live:
+        del processes[pid]
+    return encode_keyframe(build_snapshot(0.0, 0.0, 0.0, 0, 0, 0.0, rows), shard)
+
+
+def _shard_worker(connection, shard, workers, attrs):
+    processes = {}
+    while True:
+        request = connection.recv()
+        if request is None:
+            break
+        connection.send_bytes(_collect_shard(processes, shard, workers, attrs))
+    connection.close()
+
+
+class ShardedSampler:
+    # Local snapshot source backed by `workers` collector processes
+    remote = False
+
+    def __init__(self, workers, attrs=PROC_ATTRS):
+        self.workers = workers
+        # Fork where it is safe: workers are started before the GUI or agent
+        # spins up any threads, and spawning would re-import the whole
+        # dashboard (Qt included) in every worker
+        context = multiprocessing.get_context("fork" if psutil.LINUX else "spawn")
+        self.connections = []
+        self.processes = []
+        for shard in range(workers):
+            parent, child = context.Pipe()
+            process = context.Process(target=_shard_worker, args=(child, shard, workers, attrs),
+                                      name=f"collector-{shard}", daemon=True)
+            process.start()
+            child.close()
+            self.connections.append(parent)
+            self.processes.append(process)
+
+    def poll(self):
+        cpu_percent = psutil.cpu_percent(interval=None)
+        cpu_freq = psutil.cpu_freq()
+        memory = psutil.virtual_memory()
+        # Fan out first so every shard collects concurrently, then gather
+        for connection in self.connections:
+            connection.send(True)
+        shards = [decode_keyframe(decode_frame(connection.recv_bytes())[3], 0.0)
+                  for connection in self.connections]
+        columns = [np.concatenate([getattr(shard, column) for shard in shards])
+                   for column in ("pids", "cpu", "mem", "statuses", "names", "users")]
+        snapshot = Snapshot(time.time(), float(cpu_percent),
+                            float(cpu_freq.current if cpu_freq else 0.0), int(memory.used),
+                            int(memory.total), float(memory.percent), *columns)
+        return snapshot.take(np.argsort(snapshot.pids, kind='stable'))
+
+    def system_info(self):
+        return cached_system_info()
+
+    def close(self):
+        for connection in self.connections:
+            try:
+                connection.send(None)
+                connection.close()
+            except OSError:
+                pass
+        for process in self.processes:
+            process.join(timeout=2)
+            if process.is_alive():
+                process.terminate()
+        self.connections = []
+        self.processes = []
+
+
+def benchmark(worker_counts, samples=5):
+    # Wall time per snapshot for the single-process sweep and for each worker
+    # count. The first sample of every mode only primes CPU baselines and is
+    # not timed.
+    def measure(poll):
+        poll()
+        timings = []
+        for _ in range(samples):
+            start = time.perf_counter()
+            rows = len(poll())
+            timings.append(time.perf_counter() - start)
+        return rows, np.array(timings) * 1000
+
+    rows, baseline = measure(collect_snapshot)
+    print(f"{psutil.cpu_count()} CPUs, {rows} processes, {samples} samples per mode")
+    print(f"{'mode':<12} {'mean ms':>9} {'p95 ms':>9} {'speedup':>8}")
+    print(f"{'sequential':<12} {baseline.mean():>9.1f} {np.percentile(baseline, 95):>9.1f} {1.0:>8.2f}")
+    for workers in worker_counts:
+        sampler = ShardedSampler(workers)
+        try:
+            _, timings = measure(sampler.poll)
+        finally:
+            sampler.close()
+        print(f"{f'{workers} workers':<12} {timings.mean():>9.1f} {np.percentile(timings, 95):>9.1f} "
+              f"{baseline.mean() / timings.mean():>8.2f}")
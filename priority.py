@@ -0,0 +1,107 @@
+import time
+
+import psutil
+
+# Nice values and I/O priorities rarely change, so they are read on a slow
+# tier: once when a process is first shown and then at most every
+# REFRESH_INTERVAL seconds, never on every tick.
+REFRESH_INTERVAL = 10.0
+
+HAS_IONICE = hasattr(psutil.Process, "ionice")
+
+# Choices offered in the table's context menu
+NICE_CHOICES = [("High (-10)", -10), ("Above Normal (-5)", -5), ("Normal (0)", 0),
+                ("Below Normal (5)", 5), ("Low (10)", 10), ("Lowest (19)", 19)]
+if psutil.WINDOWS:
+    NICE_CHOICES = [
+        ("High", psutil.HIGH_PRIORITY_CLASS),
+        ("Above Normal", psutil.ABOVE_NORMAL_PRIORITY_CLASS),
+        ("Normal", psutil.NORMAL_PRIORITY_CLASS),
+        ("Below Normal", psutil.BELOW_NORMAL_PRIORITY_CLASS),
+        ("Idle", psutil.IDLE_PRIORITY_CLASS),
+    ]
+
+if psutil.LINUX:
+    IONICE_CHOICES = [("Best Effort, High (0)", (psutil.IOPRIO_CLASS_BE, 0)),
+                      ("Best Effort, Normal (4)", (psutil.IOPRIO_CLASS_BE, 4)),
+                      ("Best Effort, Low (7)", (psutil.IOPRIO_CLASS_BE, 7)),
+                      ("Idle", (psutil.IOPRIO_CLASS_IDLE, None))]
+elif psutil.WINDOWS:
+    IONICE_CHOICES = [("High", (psutil.IOPRIO_HIGH, None)),
+                      ("Normal", (psutil.IOPRIO_NORMAL, None)),
+                      ("Low", (psutil.IOPRIO_LOW, None)),
+                      ("Very Low", (psutil.IOPRIO_VERYLOW, None))]
+else:
+    IONICE_CHOICES = []
+
+
+def format_nice(nice):
+    if nice is None:
+        return "-"
+    if psutil.WINDOWS:
+        for label, value in NICE_CHOICES:
+            if value == nice:
+                return label
+        return str(nice)
+    if nice < 0:
+        return f"{nice} (High)"
+    if nice > 0:
+        return f"{nice} (Low)"
+    return "0 (Normal)"
+
+
+def format_ionice(ionice):
+    if ionice is None:
+        return "-"
+    if psutil.LINUX:
+        ioclass, value = ionice
+        if ioclass == psutil.IOPRIO_CLASS_IDLE:
+            return "idle"
+        if ioclass == psutil.IOPRIO_CLASS_RT:
+            return f"realtime/{value}"
+        if ioclass == psutil.IOPRIO_CLASS_BE:
+            return f"best-effort/{value}"
+        # IOPRIO_CLASS_NONE: derived from the nice value by the kernel
+        return "default"
+    for label, (value, _) in IONICE_CHOICES:
+        if value == ionice:
+            return label
+    return str(ionice)
+
+
+class PriorityCache:
+    def __init__(self, refresh_interval=REFRESH_INTERVAL):
+        self.refresh_interval = refresh_interval
+        self.entries = {}
+
+    def refresh(self, pids, now=None):
+        # Reads values only for PIDs that are new or older than the refresh
+        # interval; every other lookup is served from the cache
+        now = time.monotonic() if now is None else now
+        for pid in pids:
+            entry = self.entries.get(pid)
+            if entry is not None and now - entry[2] < self.refresh_interval:
+                continue
+            nice = ionice = None
+            try:
+                process = psutil.Process(pid)
+                nice = process.nice()
+                if HAS_IONICE:
+                    ionice = tuple(process.ionice()) if psutil.LINUX else process.ionice()
+            except (psutil.NoSuchProcess, psutil.AccessDenied, OSError):
+                pass
+            self.entries[pid] = (nice, ionice, now)
+
+    def get(self, pid):
+        entry = self.entries.get(pid)
+        if entry is None:
+            return None, None
+        return entry[0], entry[1]
+
+    def invalidate(self, pids):
+        for pid in pids:
+            self.entries.pop(pid, None)
+
+    def prune(self, live_pids):
+        for pid in set(self.entries) - set(live_pids):
+            del self.entries[pid]
@@ -0,0 +1,222 @@
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+import numpy as np
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, QRectF, Qt
+from PyQt6.QtGui import QColor, QFont
+from PyQt6.QtWidgets import QStyledItemDelegate
+
+from memory_detail import format_memory_detail
+from priority import format_ionice, format_nice
+from snapshot import OPTIONAL_COLUMNS
+
+# Process table columns as (key, header, width). Columns in HIDEABLE_COLUMNS
+# and the optional ones can be toggled from the Columns menu; optional ones
+# are hidden, and therefore not collected, until they are picked.
+TABLE_COLUMNS = [
+    ("pid", "PID", 100), ("name", "Name", 250), ("user", "User", 200), ("cpu", "CPU %", 120),
+    ("mem", "Memory %", 120), ("memory_detail", "USS / PSS", 190), ("nice", "Priority", 120),
+    ("ionice", "I/O Priority", 130),
+] + [
+    (key, header, 400 if key == "cmdline" else 130)
+    for key, (header, _, _, _) in OPTIONAL_COLUMNS.items()
+] + [("actions", "Actions", 140)]
+COLUMN_INDEX = {key: i for i, (key, _, _) in enumerate(TABLE_COLUMNS)}
+HIDEABLE_COLUMNS = ["user", "memory_detail", "nice", "ionice"]
+
+# Columns whose values are only read for the rows on screen, so no order
+# over every process exists for them
+UNSORTABLE_COLUMNS = {"memory_detail", "nice", "ionice", "actions"}
+
+# With Steady Order on, a row is only moved when its sort key changed by
+# more than this much since it was last placed
+SORT_HYSTERESIS = {"cpu": 1.0, "mem": 0.1}
+
+# Background of CPU/memory cells whose value is anomalous for that process
+ANOMALY_COLOR = QColor(247, 118, 142, 90)
+
+# Formatted cell strings are kept across ticks, keyed by (pid, column), and
+# reused while the value behind them is unchanged. Only cells the view has
+# painted ever get an entry, so this bounds memory to a few viewports.
+CACHE_SIZE = 8192
+
+
+def format_column(key, value):
+    # Cell text for an OPTIONAL_COLUMNS value
+    if key == "cmdline":
+        return value
+    if key == "started":
+        if not value:
+            return ""
+        started = datetime.fromtimestamp(value)
+        return started.strftime("%H:%M:%S" if datetime.now() - started < timedelta(days=1) else "%b %d %H:%M")
+    if key in ("io_read", "io_write"):
+        return f"{value / (1024**2):.1f} MB"
+    return str(int(value))
+
+
+class ProcessTableModel(QAbstractTableModel):
+    # Every process of the current snapshot, in display order. Nothing is
+    # formatted up front: data() formats a cell when the view asks for it,
+    # and views only ask for the cells inside their viewport. That time is
+    # charged to the "format" phase while instrumentation is on.
+    def __init__(self, priorities, memory_detail, anomalies, instrumentation, parent=None):
+        super().__init__(parent)
+        self.priorities = priorities
+        self.memory_detail = memory_detail
+        self.anomalies = anomalies
+        self.instrumentation = instrumentation
+        self.snapshot = None
+        self.order = np.empty(0, dtype=np.intp)
+        self.pids = np.empty(0, dtype=np.int64)
+        self.cache = OrderedDict()
+        self.cache_size = CACHE_SIZE
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.order)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(TABLE_COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return TABLE_COLUMNS[section][1]
+        return None
+
+    def set_snapshot(self, snapshot, order):
+        # `order` holds snapshot row indices in display order. Only the row
+        # count change is announced; the repaint itself is limited to what
+        # is on screen.
+        old, new = len(self.order), len(order)
+        if new > old:
+            self.beginInsertRows(QModelIndex(), old, new - 1)
+        elif new < old:
+            self.beginRemoveRows(QModelIndex(), new, old - 1)
+        self.snapshot = snapshot
+        self.order = order
+        self.pids = snapshot.pids[order]
+        if new > old:
+            self.endInsertRows()
+        elif new < old:
+            self.endRemoveRows()
+        if new:
+            self.dataChanged.emit(self.index(0, 0), self.index(new - 1, len(TABLE_COLUMNS) - 1))
+
+    def refresh(self):
+        # Repaint after cached values (priorities, USS/PSS) changed
+        if len(self.order):
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self.order) - 1, len(TABLE_COLUMNS) - 1))
+
+    def value(self, row, key):
+        i = self.order[row]
+        snapshot = self.snapshot
+        if key == "pid":
+            return int(snapshot.pids[i])
+        if key == "name":
+            return snapshot.names[i]
+        if key == "user":
+            return snapshot.users[i]
+        if key == "cpu":
+            return float(snapshot.cpu[i])
+        if key == "mem":
+            return float(snapshot.mem[i])
+        pid = int(snapshot.pids[i])
+        if key == "memory_detail":
+            return self.memory_detail.get(pid)
+        if key == "nice":
+            return self.priorities.get(pid)[0]
+        if key == "ionice":
+            return self.priorities.get(pid)[1]
+        column = snapshot.extra.get(key)
+        return None if column is None else column[i]
+
+    def text(self, row, col):
+        key = TABLE_COLUMNS[col][0]
+        if key == "actions":
+            return "KILL"
+        value = self.value(row, key)
+        if key in ("name", "user"):
+            return value
+        cache_key = (int(self.pids[row]), col)
+        entry = self.cache.get(cache_key)
+        if entry is not None and entry[0] == value:
+            self.cache.move_to_end(cache_key)
+            return entry[1]
+        if key == "pid":
+            text = str(value)
+        elif key in ("cpu", "mem"):
+            text = f"{value:.1f}%"
+        elif key == "memory_detail":
+            text = format_memory_detail(*value)
+        elif key == "nice":
+            text = format_nice(value)
+        elif key == "ionice":
+            text = format_ionice(value)
+        else:
+            text = "" if value is None else format_column(key, value)
+        self.cache[cache_key] = (value, text)
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return text
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.order):
+            return None
+        row, col = index.row(), index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            if not self.instrumentation.enabled:
+                return self.text(row, col)
+            start = time.perf_counter()
+            text = self.text(row, col)
+            self.instrumentation.charge("format", time.perf_counter() - start)
+            return text
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return Qt.AlignmentFlag.AlignCenter
+        i = self.order[row]
+        flagged = i < len(self.anomalies.flags) and self.anomalies.flags[i]
+        # Flag processes that left their own baseline
+        if role == Qt.ItemDataRole.BackgroundRole:
+            if flagged and col in (COLUMN_INDEX["cpu"], COLUMN_INDEX["mem"]):
+                return ANOMALY_COLOR
+        elif role == Qt.ItemDataRole.ToolTipRole:
+            if flagged:
+                return self.anomalies.describe(i)
+        return None
+
+    def info(self, pid):
+        # (name, user) of a listed process, empty strings once it is gone
+        snapshot = self.snapshot
+        if snapshot is None or not len(snapshot.pids):
+            return "", ""
+        i = min(np.searchsorted(snapshot.pids, pid), len(snapshot.pids) - 1)
+        if snapshot.pids[i] != pid:
+            return "", ""
+        return snapshot.names[i], snapshot.users[i]
+
+    def rows_of(self, pids):
+        return np.flatnonzero(np.isin(self.pids, list(pids)))
+
+
+class KillButtonDelegate(QStyledItemDelegate):
+    # Paints the Actions cell as a KILL button; clicks are handled by the
+    # view's clicked signal, so no widget is created per row
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.color = QColor("#ff4757")
+
+    def paint(self, painter, option, index):
+        rect = QRectF(option.rect)
+        button = QRectF(0, 0, 70, 28)
+        button.moveCenter(rect.center())
+        painter.save()
+        painter.setRenderHint(painter.RenderHint.Antialiasing)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(self.color)
+        painter.drawRoundedRect(button, 4, 4)
+        font = QFont(option.font)
+        font.setBold(True)
+        painter.setFont(font)
+        painter.setPen(QColor("#ffffff"))
+        painter.drawText(button, Qt.AlignmentFlag.AlignCenter, index.data())
+        painter.restore()
@@ -1,23 +1,510 @@
 import sys
+import signal
+import argparse
 import psutil
-import platform
-from datetime import datetime
+from datetime import datetime, timedelta
 import os
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                            QHBoxLayout, QPushButton, QLabel, QLineEdit, 
-                           QTableWidget, QTableWidgetItem, QHeaderView, 
-                           QMessageBox, QFrame, QComboBox)
-from PyQt6.QtCore import Qt, QTimer, QSize
-from PyQt6.QtGui import QColor, QFont
+                           QTableWidget, QTableWidgetItem, QTableView, QHeaderView,
+                           QMessageBox, QFrame, QComboBox, QFileDialog, QMenu,
+                           QTreeWidget, QTreeWidgetItem, QSlider, QDialog, QTabWidget)
+from PyQt6.QtCore import Qt, QTimer, QThreadPool, QItemSelection, QItemSelectionModel
+from PyQt6.QtGui import QColor, QFont, QKeySequence, QShortcut
 import pyqtgraph as pg
 import numpy as np
 from collections import deque
 import time
+from snapshot import LocalSampler, iter_snapshots, SYSTEM_INFO_KEYS, OPTIONAL_COLUMNS
+from export import open_exporter
+from actions import (ProcessActionWorker, terminate_processes, renice_processes,
+                     ionice_processes, format_summary, BULK_ACTIONS, TERMINATE_TIMEOUT)
+from grouping import (PidKeyResolver, CgroupStats, group_totals, factorize, cgroup_label,
+                      read_cgroup_path, read_exe_path)
+from priority import PriorityCache, NICE_CHOICES, IONICE_CHOICES
+from anomaly import AnomalyDetector
+from lifecycle import open_lifecycle_watcher
+from watch import WatchSampler
+from threads import ThreadSampler
+from memory_detail import MemoryDetailCache
+from inspector import InspectorWorker
+from process_model import (ProcessTableModel, KillButtonDelegate, TABLE_COLUMNS, COLUMN_INDEX,
+                           HIDEABLE_COLUMNS, SORT_HYSTERESIS, UNSORTABLE_COLUMNS)
+from sorting import SteadySorter
+from instrumentation import TickInstrumentation, TickProfiler, DEFAULT_PROFILE_DIR
+
+# Dark theme styles
+DARK_STYLE = """
+    QMainWindow {
+        background-color: #1a1b26;
+    }
+    QLabel {
+        color: #a9b1d6;
+        font-size: 14px;
+    }
+    #title {
+        font-size: 24px;
+        color: #7aa2f7;
+        font-weight: bold;
+        padding: 10px;
+        background-color: #24283b;
+        border-radius: 8px;
+    }
+    #themeButton {
+        background-color: #24283b;
+        color: #a9b1d6;
+        border: 2px solid #414868;
+        border-radius: 20px;
+        font-size: 16px;
+    }
+    #themeButton:hover {
+        background-color: #2a2b36;
+        border-color: #7aa2f7;
+    }
+    QPushButton[toolButton="true"] {
+        background-color: #24283b;
+        color: #a9b1d6;
+        border: 1px solid #414868;
+        border-radius: 16px;
+        padding: 4px 14px;
+        font-size: 13px;
+        font-weight: bold;
+        min-width: 0;
+        min-height: 0;
+        margin: 0;
+    }
+    QPushButton[toolButton="true"]:hover {
+        background-color: #2a2b36;
+        border-color: #7aa2f7;
+    }
+    QPushButton[toolButton="true"]:checked {
+        background-color: #364A82;
+        color: white;
+        border-color: #7aa2f7;
+    }
+    #searchBox {
+        background-color: #24283b;
+        color: #a9b1d6;
+        border: 1px solid #414868;
+        border-radius: 20px;
+        padding: 8px 15px;
+        font-size: 14px;
+    }
+    #searchBox:focus {
+        border: 2px solid #7aa2f7;
+    }
+    QMessageBox {
+        background-color: #1a1b26;
+    }
+    QMessageBox QLabel {
+        color: #a9b1d6;
+        font-size: 14px;
+        padding: 10px;
+    }
+    QMessageBox QPushButton {
+        background-color: #7aa2f7;
+        color: white;
+        border: none;
+        border-radius: 15px;
+        padding: 8px 20px;
+        font-size: 13px;
+        font-weight: bold;
+        min-width: 100px;
+    }
+    QMessageBox QPushButton:hover {
+        background-color: #6a92e7;
+    }
+    QMessageBox QPushButton:pressed {
+        background-color: #5a82d7;
+    }
+    QTableView {
+        background-color: #24283b;
+        color: #a9b1d6;
+        border: none;
+        gridline-color: #414868;
+        selection-background-color: #364A82;
+        font-size: 13px;
+    }
+    QTreeWidget {
+        background-color: #24283b;
+        alternate-background-color: #2a2b36;
+        color: #a9b1d6;
+        border: none;
+        selection-background-color: #364A82;
+        font-size: 13px;
+    }
+    QComboBox {
+        background-color: #24283b;
+        color: #a9b1d6;
+        border: 1px solid #414868;
+        border-radius: 4px;
+        padding: 4px 8px;
+        font-size: 13px;
+    }
+    QHeaderView::section {
+        background-color: #1a1b26;
+        color: #7aa2f7;
+        border: none;
+        border-right: 1px solid #414868;
+        padding: 12px 8px;
+        font-size: 14px;
+        font-weight: bold;
+    }
+    QHeaderView::section:hover {
+        background-color: #2a2b36;
+    }
+    QTableView::item {
+        padding: 8px;
+        border-bottom: 1px solid #414868;
+    }
+    QTableView::item:hover {
+        background-color: #2a2b36;
+    }
+    QTableView::item:selected {
+        background-color: #364A82;
+        color: white;
+    }
+    QPushButton {
+        background-color: #ff4757;
+        color: white;
+        border: none;
+        border-radius: 4px;
+        padding: 6px 12px;
+        font-size: 13px;
+        font-weight: bold;
+        min-width: 80px;
+        min-height: 30px;
+        margin: 4px;
+    }
+    QPushButton:hover {
+        background-color: #ff6b81;
+        border: 2px solid #ffffff;
+    }
+    QPushButton:pressed {
+        background-color: #ff4757;
+    }
+    QPushButton[warning="true"] {
+        background-color: #ff4757;
+        color: #ffffff !important;
+        font-weight: 800;
+        font-size: 13px;
+        border: none;
+        min-width: 70px;
+        min-height: 28px;
+        letter-spacing: 0.5px;
+        text-align: center;
+        padding: 2px 8px;
+        text-transform: uppercase;
+        border-radius: 4px;
+    }
+    QPushButton[warning="true"]:hover {
+        background-color: #ff6b81;
+        border: 1px solid #ffffff;
+    }
+    QPushButton[warning="true"]:pressed {
+        background-color: #ff4757;
+    }
+    QFrame {
+        background-color: #24283b;
+        border-radius: 8px;
+        border: 1px solid #414868;
+    }
+    QFrame:hover {
+        border: 1px solid #7aa2f7;
+    }
+    QScrollBar:vertical {
+        border: none;
+        background: #1a1b26;
+        width: 10px;
+        margin: 0;
+    }
+    QScrollBar::handle:vertical {
+        background: #414868;
+        border-radius: 5px;
+        min-height: 20px;
+    }
+    QScrollBar::handle:vertical:hover {
+        background: #7aa2f7;
+    }
+    QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {
+        height: 0;
+    }
+    QWidget[buttonContainer="true"] {
+        background-color: transparent;
+        padding: 4px;
+        margin: 2px;
+    }
+    QStatusBar {
+        background-color: #1a1b26;
+        color: #a9b1d6;
+        font-size: 13px;
+    }
+    QMenu {
+        background-color: #24283b;
+        color: #a9b1d6;
+        border: 1px solid #414868;
+    }
+    QMenu::item:selected {
+        background-color: #364A82;
+        color: white;
+    }
+    #systemInfoTitle {
+        font-size: 18px;
+        color: #7aa2f7;
+        font-weight: bold;
+        margin-bottom: 10px;
+    }
+    #infoFrame {
+        background-color: #2a2b36;
+        border-radius: 4px;
+        padding: 10px;
+        margin: 5px 0;
+        border: 1px solid #414868;
+    }
+    #infoKey {
+        color: #7aa2f7;
+        font-weight: bold;
+        font-size: 14px;
+    }
+    #infoValue {
+        color: #a9b1d6;
+        font-size: 13px;
+    }
+"""
+
+# Light theme styles
+LIGHT_STYLE = """
+    QMainWindow {
+        background-color: #f0f2f5;
+    }
+    QLabel {
+        color: #2c3e50;
+        font-size: 14px;
+    }
+    #title {
+        font-size: 24px;
+        color: #2c3e50;
+        font-weight: bold;
+        padding: 10px;
+        background-color: white;
+        border-radius: 8px;
+    }
+    #themeButton {
+        background-color: white;
+        color: #2c3e50;
+        border: 2px solid #e1e4e8;
+        border-radius: 16px;
+        font-size: 14px;
+    }
+    #themeButton:hover {
+        background-color: #f6f8fa;
+        border-color: #2c3e50;
+    }
+    QPushButton[toolButton="true"] {
+        background-color: white;
+        color: #2c3e50;
+        border: 1px solid #e1e4e8;
+        border-radius: 16px;
+        padding: 4px 14px;
+        font-size: 13px;
+        font-weight: bold;
+        min-width: 0;
+        min-height: 0;
+        margin: 0;
+    }
+    QPushButton[toolButton="true"]:hover {
+        background-color: #f6f8fa;
+        border-color: #2c3e50;
+    }
+    QPushButton[toolButton="true"]:checked {
+        background-color: #f1f8ff;
+        border-color: #2c3e50;
+    }
+    #searchBox {
+        background-color: white;
+        color: #2c3e50;
+        border: 1px solid #e1e4e8;
+        border-radius: 20px;
+        padding: 8px 15px;
+        font-size: 14px;
+    }
+    #searchBox:focus {
+        border: 2px solid #2c3e50;
+    }
+    QTableView {
+        background-color: white;
+        color: #2c3e50;
+        border: none;
+        gridline-color: #e1e4e8;
+    }
+    QTreeWidget {
+        background-color: white;
+        alternate-background-color: #f6f8fa;
+        color: #2c3e50;
+        border: none;
+        font-size: 13px;
+    }
+    QComboBox {
+        background-color: white;
+        color: #2c3e50;
+        border: 1px solid #e1e4e8;
+        border-radius: 4px;
+        padding: 4px 8px;
+        font-size: 13px;
+    }
+    QHeaderView::section {
+        background-color: #f6f8fa;
+        color: #2c3e50;
+        border: none;
+        border-right: 1px solid #e1e4e8;
+        padding: 12px 8px;
+        font-weight: bold;
+    }
+    QTableView::item {
+        padding: 8px;
+        border-bottom: 1px solid #e1e4e8;
+    }
+    QTableView::item:selected {
+        background-color: #f1f8ff;
+        color: #2c3e50;
+    }
+    QPushButton[warning="true"] {
+        background-color: #dc3545;
+        color: white !important;
+        font-weight: 800;
+        font-size: 13px;
+        border: none;
+        min-width: 70px;
+        min-height: 28px;
+    }
+    QPushButton[warning="true"]:hover {
+        background-color: #c82333;
+        border: 2px solid #dc3545;
+    }
+    QMessageBox {
+        background-color: white;
+    }
+    QMessageBox QLabel {
+        color: #2c3e50;
+        font-size: 14px;
+        padding: 10px;
+    }
+    QMessageBox QPushButton {
+        background-color: #007bff;
+        color: white;
+        border: none;
+        border-radius: 15px;
+        padding: 8px 20px;
+        font-size: 13px;
+        font-weight: bold;
+        min-width: 100px;
+    }
+    QMessageBox QPushButton:hover {
+        background-color: #0056b3;
+    }
+    QFrame {
+        background-color: white;
+        border-radius: 8px;
+        border: 1px solid #e1e4e8;
+    }
+    QFrame:hover {
+        border: 1px solid #2c3e50;
+    }
+    QScrollBar:vertical {
+        border: none;
+        background: #f6f8fa;
+        width: 10px;
+        margin: 0;
+    }
+    QScrollBar::handle:vertical {
+        background: #c1c9d2;
+        border-radius: 5px;
+        min-height: 20px;
+    }
+    QScrollBar::handle:vertical:hover {
+        background: #a1aab4;
+    }
+    QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {
+        height: 0;
+    }
+    QWidget[buttonContainer="true"] {
+        background-color: transparent;
+        padding: 4px;
+        margin: 2px;
+    }
+    QStatusBar {
+        background-color: #f6f8fa;
+        color: #2c3e50;
+        font-size: 13px;
+    }
+    QMenu {
+        background-color: white;
+        color: #2c3e50;
+        border: 1px solid #e1e4e8;
+    }
+    QMenu::item:selected {
+        background-color: #f1f8ff;
+    }
+    #systemInfoTitle {
+        font-size: 18px;
+        color: #2c3e50;
+        font-weight: bold;
+        margin-bottom: 10px;
+    }
+    #infoFrame {
+        background-color: white;
+        border-radius: 4px;
+        padding: 10px;
+        margin: 5px 0;
+        border: 1px solid #e1e4e8;
+    }
+    #infoKey {
+        color: #2c3e50;
+        font-weight: bold;
+        font-size: 14px;
+    }
+    #infoValue {
+        color: #2c3e50;
+        font-size: 13px;
+    }
+"""
+
+# Group-by modes offered above the process list
+GROUP_MODES = {
+    "No Grouping": None,
+    "Group by Name": "name",
+    "Group by User": "user",
+    "Group by Executable": "exe",
+    "Group by Cgroup": "cgroup",
+}
+
+# Most recent lifecycle events listed in the events pane
+EVENT_ROWS = 200
+
+# Thread drill-down: refresh period (ms) and number of rows drawn
+THREAD_REFRESH = 1000
+THREAD_ROWS = 500
+
+# Inspector rows drawn per tab; everything is still counted
+INSPECTOR_ROWS = 20000
+
+# Curve colors for watched processes
+WATCH_COLORS = ['#7aa2f7', '#f7768e', '#9ece6a', '#e0af68', '#bb9af7', '#7dcfff', '#ff9e64', '#c0caf5']
 
 class ModernProcessMonitor(QMainWindow):
-    def __init__(self):
+    def __init__(self, source=None, instrumentation_log=0, profile_dir=DEFAULT_PROFILE_DIR,
+                 profile_ticks=20):
         super().__init__()
         self.setWindowTitle("Process Monitoring System")
+        
+        # Startup milestones are measured from process start, as the user sees them
+        self.started_at = psutil.Process().create_time()
+        self.first_paint_reported = False
+        
+        # Where snapshots come from: the local host or a remote agent
+        self.source = source or LocalSampler()
+        self.instrumentation = TickInstrumentation(log_interval=instrumentation_log)
+        self.profiler = TickProfiler(profile_dir, profile_ticks)
         self.setGeometry(100, 100, 1400, 900)
         
         # Theme state
@@ -60,8 +547,64 @@ class ModernProcessMonitor(QMainWindow):
         self.theme_button.clicked.connect(self.toggle_theme)
         top_bar.addWidget(self.theme_button)
         
+        # Stream snapshots to CSV/Parquet while toggled on
+        self.exporter = None
+        self.export_button = QPushButton("Export")
+        self.export_button.setProperty("toolButton", True)
+        self.export_button.setCheckable(True)
+        self.export_button.setFixedHeight(32)
+        self.export_button.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.export_button.clicked.connect(self.toggle_export)
+        top_bar.addWidget(self.export_button)
+        
+        # Process lifecycle feed; the watcher starts the first time it is shown
+        self.lifecycle = None
+        self.lifecycle_seen = -1
+        self.events_button = QPushButton("Events")
+        self.events_button.setProperty("toolButton", True)
+        self.events_button.setCheckable(True)
+        self.events_button.setFixedHeight(32)
+        self.events_button.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.events_button.toggled.connect(self.toggle_events)
+        top_bar.addWidget(self.events_button)
+        
+        # Open files / connections / maps of the selected process
+        self.inspector_button = QPushButton("Inspect")
+        self.inspector_button.setProperty("toolButton", True)
+        self.inspector_button.setCheckable(True)
+        self.inspector_button.setFixedHeight(32)
+        self.inspector_button.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.inspector_button.toggled.connect(self.toggle_inspector)
+        top_bar.addWidget(self.inspector_button)
+        
         layout.addLayout(top_bar)
         
+        # Replay mode: a timeline over the recording replaces live refreshes
+        self.recording = getattr(self.source, "recording", None)
+        if self.recording is not None:
+            timeline = QHBoxLayout()
+            self.play_button = QPushButton("Play")
+            self.play_button.setProperty("toolButton", True)
+            self.play_button.setCheckable(True)
+            self.play_button.setFixedHeight(32)
+            self.play_button.setCursor(Qt.CursorShape.PointingHandCursor)
+            self.play_button.toggled.connect(self.toggle_playback)
+            timeline.addWidget(self.play_button)
+            self.timeline_slider = QSlider(Qt.Orientation.Horizontal)
+            self.timeline_slider.setRange(0, len(self.recording) - 1)
+            self.timeline_slider.setValue(self.source.start_index)
+            self.timeline_slider.valueChanged.connect(self.seek_replay)
+            timeline.addWidget(self.timeline_slider, stretch=1)
+            self.timeline_label = QLabel("")
+            timeline.addWidget(self.timeline_label)
+            layout.addLayout(timeline)
+            
+            # Play back at the recorded pace
+            steps = np.diff(self.recording.timestamps)
+            self.play_timer = QTimer()
+            self.play_timer.setInterval(int(min(max(np.median(steps) * 1000 if len(steps) else 1000, 50), 2000)))
+            self.play_timer.timeout.connect(self.advance_replay)
+        
         # Main content area
         content_layout = QHBoxLayout()
         
@@ -126,31 +669,238 @@ class ModernProcessMonitor(QMainWindow):
         list_panel = QFrame()
         list_layout = QVBoxLayout(list_panel)
         list_layout.setContentsMargins(15, 15, 15, 15)
+        list_header = QHBoxLayout()
         list_title = QLabel("Running Processes")
         list_title.setStyleSheet("font-size: 18px; color: #7aa2f7; font-weight: bold;")
-        list_layout.addWidget(list_title)
+        list_header.addWidget(list_title)
+        list_header.addStretch()
         
-        self.process_table = QTableWidget()
-        self.process_table.setColumnCount(7)
-        self.process_table.setHorizontalHeaderLabels([
-            "PID", "Name", "User", "CPU %", "Memory %", "Priority", "Actions"
-        ])
+        # Switch between the flat process list and an aggregated group view
+        self.group_combo = QComboBox()
+        self.group_combo.addItems(list(GROUP_MODES))
+        self.group_combo.currentIndexChanged.connect(self.change_grouping)
+        list_header.addWidget(self.group_combo)
+        
+        # Bulk actions on the selected rows
+        self.selection_label = QLabel("")
+        list_header.addWidget(self.selection_label)
+        self.bulk_buttons = []
+        for label in BULK_ACTIONS:
+            button = QPushButton(label)
+            button.setProperty("toolButton", True)
+            button.setFixedHeight(32)
+            button.setEnabled(False)
+            button.setCursor(Qt.CursorShape.PointingHandCursor)
+            button.clicked.connect(lambda checked, action=label: self.run_bulk_action(action))
+            list_header.addWidget(button)
+            self.bulk_buttons.append(button)
+        
+        # Column chooser; optional columns are only offered when the source
+        # can collect them
+        self.visible_columns = {key for key, _, _ in TABLE_COLUMNS if key not in OPTIONAL_COLUMNS}
+        self.columns_button = QPushButton("Columns")
+        self.columns_button.setProperty("toolButton", True)
+        self.columns_button.setFixedHeight(32)
+        self.columns_button.setCursor(Qt.CursorShape.PointingHandCursor)
+        columns_menu = QMenu(self)
+        for key, header, _ in TABLE_COLUMNS:
+            if key not in HIDEABLE_COLUMNS and key not in OPTIONAL_COLUMNS:
+                continue
+            if key == next(iter(OPTIONAL_COLUMNS), None):
+                columns_menu.addSeparator()
+            action = columns_menu.addAction(header)
+            action.setCheckable(True)
+            action.setChecked(key in self.visible_columns)
+            if key in OPTIONAL_COLUMNS and not hasattr(self.source, "set_columns"):
+                action.setEnabled(False)
+                action.setToolTip("Only available when sampling the local host in-process")
+            action.toggled.connect(lambda checked, key=key: self.toggle_column(key, checked))
+        columns_menu.setToolTipsVisible(True)
+        self.columns_button.setMenu(columns_menu)
+        list_header.addWidget(self.columns_button)
+        
+        # Rows only change places when their sort key moves by more than the
+        # column's hysteresis, so near-ties do not swap on every refresh
+        self.steady_button = QPushButton("Steady Order")
+        self.steady_button.setProperty("toolButton", True)
+        self.steady_button.setCheckable(True)
+        self.steady_button.setChecked(True)
+        self.steady_button.setFixedHeight(32)
+        self.steady_button.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.steady_button.toggled.connect(self.toggle_steady_order)
+        list_header.addWidget(self.steady_button)
+        list_layout.addLayout(list_header)
+        
+        # Renice / ionice from the row context menu
+        self.priorities = PriorityCache()
+        self.memory_detail = MemoryDetailCache()
+        self.anomalies = AnomalyDetector()
+        self.last_priority_prune = 0
+        
+        # The table lists every process; the model formats cells only when
+        # the view paints them
+        self.process_model = ProcessTableModel(self.priorities, self.memory_detail, self.anomalies,
+                                               self.instrumentation, self)
+        self.process_table = QTableView()
+        self.process_table.setModel(self.process_model)
+        self.kill_delegate = KillButtonDelegate(self.process_table)
+        self.process_table.setItemDelegateForColumn(COLUMN_INDEX["actions"], self.kill_delegate)
+        self.process_table.clicked.connect(self.on_table_clicked)
+        self.sort_key = "cpu"
+        self.sorter = SteadySorter(descending=True, hysteresis=SORT_HYSTERESIS["cpu"])
+        self.process_table.verticalScrollBar().valueChanged.connect(self.on_table_scrolled)
         
         # Configure table appearance
         self.process_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
         self.process_table.horizontalHeader().setStretchLastSection(True)
+        self.process_table.horizontalHeader().setSectionsClickable(True)
+        self.process_table.horizontalHeader().setSortIndicatorShown(True)
+        self.process_table.horizontalHeader().setSortIndicator(COLUMN_INDEX["cpu"], Qt.SortOrder.DescendingOrder)
+        self.process_table.horizontalHeader().sortIndicatorChanged.connect(self.change_sort)
         self.process_table.verticalHeader().setVisible(False)
+        self.process_table.verticalHeader().setDefaultSectionSize(65)
         self.process_table.setShowGrid(False)
         self.process_table.setAlternatingRowColors(True)
+        self.process_table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
+        self.process_table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.process_table.setSelectionMode(QTableView.SelectionMode.ExtendedSelection)
+        
+        # Selection is tracked by PID so it survives rows moving between refreshes
+        self.selected_pids = set()
+        self.row_pids = np.empty(0, dtype=np.int64)
+        self.restoring_selection = False
+        self.filter_text = ""
+        self.filter_state = None
+        # What the source was last asked to collect (LocalSampler's default)
+        self.collected_columns = ["user"]
+        self.process_table.selectionModel().selectionChanged.connect(self.on_selection_changed)
+        self.process_table.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.process_table.customContextMenuRequested.connect(self.show_process_menu)
         
         # Set column widths
-        column_widths = [100, 250, 200, 120, 120, 120, 140]  # Increased widths
-        for i, width in enumerate(column_widths):
+        for i, (key, _, width) in enumerate(TABLE_COLUMNS):
             self.process_table.setColumnWidth(i, width)
+            self.process_table.setColumnHidden(i, key not in self.visible_columns)
         
         list_layout.addWidget(self.process_table)
+        
+        self.group_tree = QTreeWidget()
+        self.group_tree.setColumnCount(6)
+        self.group_tree.setHeaderLabels([
+            "Group", "Processes / User", "CPU %", "Memory %", "Cgroup CPU %", "Cgroup Memory"
+        ])
+        self.group_tree.setAlternatingRowColors(True)
+        self.group_tree.setColumnWidth(0, 360)
+        self.group_tree.setColumnWidth(1, 140)
+        self.group_tree.itemExpanded.connect(self.on_group_toggled)
+        self.group_tree.itemCollapsed.connect(self.on_group_toggled)
+        self.group_tree.hide()
+        list_layout.addWidget(self.group_tree)
+        self.snapshot = None
+        self.expanded_groups = set()
+        self.cgroups = PidKeyResolver(read_cgroup_path)
+        self.exes = PidKeyResolver(read_exe_path)
+        self.cgroup_stats = CgroupStats()
+        
         left_layout.addWidget(list_panel)
         
+        self.events_panel = QFrame()
+        events_layout = QVBoxLayout(self.events_panel)
+        events_layout.setContentsMargins(15, 15, 15, 15)
+        events_header = QHBoxLayout()
+        events_title = QLabel("Process Events")
+        events_title.setStyleSheet("font-size: 18px; color: #7aa2f7; font-weight: bold;")
+        events_header.addWidget(events_title)
+        events_header.addStretch()
+        self.events_rate_label = QLabel("")
+        events_header.addWidget(self.events_rate_label)
+        events_layout.addLayout(events_header)
+        self.events_table = QTableWidget()
+        self.events_table.setColumnCount(6)
+        self.events_table.setHorizontalHeaderLabels(["Time", "Event", "PID", "Parent", "Name", "Exit Code"])
+        self.events_table.horizontalHeader().setStretchLastSection(True)
+        self.events_table.verticalHeader().setVisible(False)
+        self.events_table.setShowGrid(False)
+        self.events_table.setAlternatingRowColors(True)
+        self.events_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.events_table.setColumnWidth(0, 120)
+        self.events_table.setColumnWidth(4, 250)
+        events_layout.addWidget(self.events_table)
+        self.events_panel.setFixedHeight(260)
+        self.events_panel.hide()
+        left_layout.addWidget(self.events_panel)
+        
+        self.inspector_panel = QFrame()
+        inspector_layout = QVBoxLayout(self.inspector_panel)
+        inspector_layout.setContentsMargins(15, 15, 15, 15)
+        inspector_header = QHBoxLayout()
+        self.inspector_title = QLabel("Inspector")
+        self.inspector_title.setStyleSheet("font-size: 18px; color: #7aa2f7; font-weight: bold;")
+        inspector_header.addWidget(self.inspector_title)
+        inspector_header.addStretch()
+        self.inspector_status = QLabel("")
+        inspector_header.addWidget(self.inspector_status)
+        inspector_layout.addLayout(inspector_header)
+        self.inspector_tabs = QTabWidget()
+        self.inspector_tables = {}
+        for kind, label, headers in [
+            ("files", "Open Files", ["FD", "Target"]),
+            ("connections", "Connections", ["FD", "Type", "Local", "Remote", "Status"]),
+            ("maps", "Memory Maps", ["Address", "Perms", "Offset", "Path"]),
+        ]:
+            table = QTableWidget()
+            table.setColumnCount(len(headers))
+            table.setHorizontalHeaderLabels(headers)
+            table.horizontalHeader().setStretchLastSection(True)
+            table.verticalHeader().setVisible(False)
+            table.setShowGrid(False)
+            table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+            self.inspector_tabs.addTab(table, label)
+            self.inspector_tables[kind] = table
+        inspector_layout.addWidget(self.inspector_tabs)
+        self.inspector_panel.setFixedHeight(320)
+        self.inspector_panel.hide()
+        left_layout.addWidget(self.inspector_panel)
+        self.inspector_worker = None
+        self.inspector_pid = None
+        self.inspector_generation = 0
+        self.inspector_counts = {}
+        self.inspector_done = {}
+        self.inspector_fd_types = {}
+        
+        # High-resolution graph for pinned PIDs, fed by its own sampler thread
+        self.watcher = WatchSampler()
+        self.watch_curves = {}
+        self.watch_panel = QFrame()
+        watch_layout = QVBoxLayout(self.watch_panel)
+        watch_layout.setContentsMargins(15, 15, 15, 15)
+        watch_header = QHBoxLayout()
+        watch_title = QLabel("Watched Processes")
+        watch_title.setStyleSheet("font-size: 18px; color: #7aa2f7; font-weight: bold;")
+        watch_header.addWidget(watch_title)
+        watch_header.addStretch()
+        self.watch_label = QLabel("")
+        watch_header.addWidget(self.watch_label)
+        clear_button = QPushButton("Clear")
+        clear_button.setProperty("toolButton", True)
+        clear_button.setFixedHeight(28)
+        clear_button.setCursor(Qt.CursorShape.PointingHandCursor)
+        clear_button.clicked.connect(self.clear_watches)
+        watch_header.addWidget(clear_button)
+        watch_layout.addLayout(watch_header)
+        self.watch_plot = pg.PlotWidget()
+        self.watch_plot.setBackground('#24283b')
+        self.watch_plot.showGrid(x=True, y=True, alpha=0.2)
+        self.watch_plot.setLabel('left', 'CPU %', color='#a9b1d6')
+        self.watch_plot.setLabel('bottom', 'Seconds', color='#a9b1d6')
+        self.watch_plot.addLegend(offset=(10, 10))
+        watch_layout.addWidget(self.watch_plot)
+        self.watch_panel.setFixedHeight(260)
+        self.watch_panel.hide()
+        left_layout.addWidget(self.watch_panel)
+        self.watch_timer = QTimer()
+        self.watch_timer.timeout.connect(self.update_watch_plot)
+        
         content_layout.addWidget(left_panel, stretch=7)
         
         # Right side - System Information
@@ -163,62 +913,189 @@ class ModernProcessMonitor(QMainWindow):
         info_title.setObjectName("systemInfoTitle")
         right_layout.addWidget(info_title)
         
-        self.system_info = self.get_system_info()
-        for key, value in self.system_info.items():
+        # Placeholders until the static host details arrive from a worker
+        self.system_info = {}
+        self.info_values = {}
+        for key in SYSTEM_INFO_KEYS:
             info_frame = QFrame()
             info_frame.setObjectName("infoFrame")
             info_layout = QVBoxLayout(info_frame)
             key_label = QLabel(key)
             key_label.setObjectName("infoKey")
-            value_label = QLabel(value)
+            value_label = QLabel("Loading...")
             value_label.setObjectName("infoValue")
+            value_label.setWordWrap(True)
             info_layout.addWidget(key_label)
             info_layout.addWidget(value_label)
             right_layout.addWidget(info_frame)
+            self.info_values[key] = value_label
+        
+        # Self-instrumentation: per-phase tick timings, toggled with F12
+        self.debug_button = QPushButton("Debug Timings")
+        self.debug_button.setProperty("toolButton", True)
+        self.debug_button.setCheckable(True)
+        self.debug_button.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.debug_button.toggled.connect(self.toggle_debug_panel)
+        right_layout.addWidget(self.debug_button)
+        self.debug_label = QLabel("Collecting...")
+        self.debug_label.setObjectName("debugPanel")
+        self.debug_label.setFont(QFont("monospace", 9))
+        self.debug_label.setWordWrap(True)
+        self.debug_label.hide()
+        right_layout.addWidget(self.debug_label)
+        self.last_debug_update = 0
+        QShortcut(QKeySequence("F12"), self, activated=self.debug_button.toggle)
+        QShortcut(QKeySequence("Ctrl+Shift+P"), self, activated=self.request_profile)
+        QShortcut(QKeySequence("Ctrl+Shift+M"), self, activated=self.tracemalloc_checkpoint)
         
         right_layout.addStretch()
         content_layout.addWidget(self.right_panel, stretch=2)
         
         layout.addLayout(content_layout)
         
-        # Setup update timer
+        # Setup update timer; it starts once the first snapshot is in
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_data)
-        self.timer.start(1000)
-        
-        self.update_data()
         
         # Apply initial theme
         self.apply_theme()
         
+        # Nothing slow runs before the window is shown: system info and the
+        # first snapshot are fetched on the thread pool
+        self.first_snapshot_pending = True
+        info_worker = ProcessActionWorker(self.get_system_info)
+        info_worker.signals.finished.connect(self.on_system_info)
+        QThreadPool.globalInstance().start(info_worker)
+        snapshot_worker = ProcessActionWorker(self.source.poll)
+        snapshot_worker.signals.finished.connect(self.on_first_snapshot)
+        QThreadPool.globalInstance().start(snapshot_worker)
+        if self.recording is not None:
+            QTimer.singleShot(0, lambda: self.seek_replay(self.timeline_slider.value()))
+        
     def get_system_info(self):
-        info = {
-            "OS": f"{platform.system()} {platform.version()}",
-            "Processor": platform.processor(),
-            "Cores": f"{psutil.cpu_count()} | Threads: {psutil.cpu_count(logical=True)}",
-            "Memory": f"{round(psutil.virtual_memory().total / (1024**3), 2)} GB"
-        }
-        return info
+        return self.source.system_info()
     
-    def update_data(self):
+    def startup_milestone(self, name):
+        self.instrumentation.milestones[name] = time.time() - self.started_at
+        milestones = self.instrumentation.milestones
+        if not self.first_paint_reported and all(
+                key in milestones for key in ("first paint", "system info", "first data")):
+            self.first_paint_reported = True
+            message = "Startup: " + ", ".join(
+                f"{key} {seconds * 1000:.0f} ms" for key, seconds in milestones.items())
+            print(message)
+            self.statusBar().showMessage(message, 10000)
+    
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if "first paint" not in self.instrumentation.milestones:
+            self.startup_milestone("first paint")
+    
+    def on_system_info(self, info):
+        if not isinstance(info, dict) or "error" in info:
+            info = {}
+        self.system_info = info
+        for key, label in self.info_values.items():
+            label.setText(info.get(key, "Unavailable"))
+        self.startup_milestone("system info")
+    
+    def on_first_snapshot(self, snapshot):
+        self.first_snapshot_pending = False
+        if isinstance(snapshot, dict):
+            print(f"Error updating data: {snapshot.get('error')}")
+            snapshot = None
+        if snapshot is not None:
+            self.update_data(snapshot)
+        self.timer.start(1000)
+    
+    def seek_replay(self, index):
+        # Rebuild the graphs from the recorded totals leading up to `index`;
+        # update_data then appends the point at `index` itself
+        position = self.recording.position
+        if position is None or index != position + 1:
+            # Baselines only make sense over consecutive samples
+            self.anomalies.reset()
+        snapshot = self.recording.snapshot_at(index)
+        start = max(0, index - self.cpu_data.maxlen + 1)
+        self.cpu_data.clear()
+        self.memory_data.clear()
+        self.timestamps.clear()
+        self.cpu_data.extend(np.round(self.recording.cpu[start:index], 1).tolist())
+        self.memory_data.extend(np.round(self.recording.mem[start:index], 1).tolist())
+        self.timestamps.extend(range(1, len(self.cpu_data) + 1))
+        self.update_data(snapshot)
+        when = datetime.fromtimestamp(snapshot.timestamp).strftime('%Y-%m-%d %H:%M:%S')
+        self.timeline_label.setText(f"{when}  ({index + 1}/{len(self.recording)})")
+    
+    def toggle_playback(self, checked):
+        self.play_button.setText("Pause" if checked else "Play")
+        if checked:
+            if self.timeline_slider.value() == self.timeline_slider.maximum():
+                self.timeline_slider.setValue(0)
+            self.play_timer.start()
+        else:
+            self.play_timer.stop()
+    
+    def advance_replay(self):
+        if self.timeline_slider.value() >= self.timeline_slider.maximum():
+            self.play_button.setChecked(False)
+            return
+        self.timeline_slider.setValue(self.timeline_slider.value() + 1)
+    
+    def update_data(self, snapshot=None):
+        refreshed = False
         try:
             current_time = time.time()
-            if current_time - self.last_update < self.update_interval / 1000:
+            if snapshot is None and current_time - self.last_update < self.update_interval / 1000:
                 return
+
+            self.profiler.begin()
+            self.instrumentation.begin()
+            if snapshot is None:
+                snapshot = self.source.poll()
+            if snapshot is None:
+                return
+            refreshed = True
             self.last_update = current_time
+            # Replaced as soon as the next one is polled: a shared memory
+            # source only keeps the newest snapshot intact
+            self.snapshot = snapshot
+            if "first data" not in self.instrumentation.milestones:
+                self.startup_milestone("first data")
+            
+            self.instrumentation.mark("collect")
+            if self.exporter is not None:
+                self.exporter.write(snapshot)
+                self.instrumentation.mark("export")
+            self.anomalies.update(snapshot)
+            if not self.source.remote and current_time - self.last_priority_prune > self.priorities.refresh_interval:
+                live = snapshot.pids.tolist()
+                self.priorities.prune(live)
+                self.memory_detail.prune(live)
+                self.last_priority_prune = current_time
+            self.instrumentation.mark("diff")
+
+            # Both mark "select" once the rows to show are known; everything
+            # drawn after that is charged to "render" below
+            if self.group_combo.currentIndex() > 0:
+                self.update_groups(snapshot)
+            else:
+                self.update_table(snapshot)
 
             # Update CPU data
-            cpu_percent = psutil.cpu_percent(interval=None)
-            cpu_freq = psutil.cpu_freq()
+            cpu_percent = round(snapshot.cpu_percent, 1)
             self.cpu_data.append(cpu_percent)
-            self.cpu_label.setText(f"Current: {cpu_percent}% | Freq: {cpu_freq.current:.0f} MHz")
+            cpu_unusual, mem_unusual = self.anomalies.system_flags
+            self.cpu_label.setText(f"Current: {cpu_percent}% | Freq: {snapshot.cpu_freq:.0f} MHz"
+                                   + (" | ⚠ unusual" if cpu_unusual else ""))
             
             # Update Memory data
-            memory = psutil.virtual_memory()
-            self.memory_data.append(memory.percent)
-            used_gb = memory.used / (1024**3)
-            total_gb = memory.total / (1024**3)
-            self.memory_label.setText(f"Used: {used_gb:.1f} GB | Total: {total_gb:.1f} GB | {memory.percent}%")
+            mem_percent = round(snapshot.mem_percent, 1)
+            self.memory_data.append(mem_percent)
+            used_gb = snapshot.mem_used / (1024**3)
+            total_gb = snapshot.mem_total / (1024**3)
+            self.memory_label.setText(f"Used: {used_gb:.1f} GB | Total: {total_gb:.1f} GB | {mem_percent}%"
+                                      + (" | ⚠ unusual" if mem_unusual else ""))
             
             # Update graphs
             self.timestamps.append(len(self.cpu_data))
@@ -244,65 +1121,136 @@ class ModernProcessMonitor(QMainWindow):
             
             self.cpu_curve.setData(list(self.timestamps), list(self.cpu_data))
             self.memory_curve.setData(list(self.timestamps), list(self.memory_data))
-            
-            # Update process table
-            processes = []
-            for proc in psutil.process_iter(['pid', 'name', 'username', 'cpu_percent', 'memory_percent', 'status']):
-                try:
-                    pinfo = proc.info
-                    processes.append(pinfo)
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    pass
-            
-            processes.sort(key=lambda x: x['cpu_percent'], reverse=True)
-            processes = processes[:50]  # Limit to top 50 processes
-            
-            # Update table in batches
-            self.process_table.setUpdatesEnabled(False)
-            self.process_table.setRowCount(len(processes))
-            
-            # Set row height for all rows
-            self.process_table.verticalHeader().setDefaultSectionSize(65)
-            
-            for i, proc in enumerate(processes):
-                # Create items only once
-                items = [
-                    QTableWidgetItem(str(proc['pid'])),
-                    QTableWidgetItem(proc['name']),
-                    QTableWidgetItem(proc['username']),
-                    QTableWidgetItem(f"{proc['cpu_percent']:.1f}%"),
-                    QTableWidgetItem(f"{proc.get('memory_percent', 0):.1f}%"),
-                    QTableWidgetItem("Low")
-                ]
-                
-                # Set items in batch
-                for col, item in enumerate(items):
-                    item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                    self.process_table.setItem(i, col, item)
-                
-                # Create and style the terminate button
-                button_container = QWidget()
-                button_container.setProperty("buttonContainer", True)
-                button_layout = QHBoxLayout(button_container)
-                button_layout.setContentsMargins(4, 4, 4, 4)
-                button_layout.setSpacing(0)
-                button_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
-                
-                kill_button = QPushButton("KILL")
-                kill_button.setProperty("warning", True)
-                kill_button.setFixedSize(70, 28)  # Reduced size
-                kill_button.setCursor(Qt.CursorShape.PointingHandCursor)
-                kill_button.clicked.connect(lambda checked, pid=proc['pid']: self.kill_process(pid))
-                
-                button_layout.addWidget(kill_button)
-                self.process_table.setCellWidget(i, 6, button_container)
-            
-            self.process_table.setUpdatesEnabled(True)
+            if self.events_panel.isVisible():
+                self.update_events()
+            self.instrumentation.mark("render")
                 
         except Exception as e:
             print(f"Error updating data: {str(e)}")
+        finally:
+            self.instrumentation.end()
+            path = self.profiler.end(refreshed)
+            if path:
+                self.statusBar().showMessage(f"Profile written to {path}", 10000)
+                print(f"Profile written to {path}")
+            if self.debug_label.isVisible():
+                self.update_debug_panel()
+    
+    def update_table(self, snapshot):
+        # Every process goes into the model, in the order of the steady
+        # sorter. Cells are formatted lazily when painted, so the cost of a
+        # refresh depends on the viewport, not on the number of processes.
+        order = self.sorter.update(snapshot.pids, self.sort_values(snapshot))
+        if self.filter_text:
+            order = order[self.filter_mask(snapshot)[order]]
+        self.instrumentation.mark("select")
+        self.process_model.set_snapshot(snapshot, order)
+        self.row_pids = self.process_model.pids
+        self.refresh_visible_details()
+        self.restore_selection()
+    
+    def sort_values(self, snapshot):
+        key = self.sort_key
+        if key == "pid":
+            return snapshot.pids
+        if key == "name":
+            return snapshot.names
+        if key == "user":
+            return snapshot.users
+        if key == "cpu":
+            return snapshot.cpu
+        if key == "mem":
+            return snapshot.mem
+        values = snapshot.extra.get(key)
+        # Column not collected for this sample (just switched on): PID order
+        return snapshot.pids if values is None else values
+    
+    def change_sort(self, column, order):
+        key = TABLE_COLUMNS[column][0]
+        header = self.process_table.horizontalHeader()
+        if key in UNSORTABLE_COLUMNS:
+            # These values are only read for rows on screen, so there is no
+            # order over every process to sort by
+            header.blockSignals(True)
+            header.setSortIndicator(COLUMN_INDEX[self.sort_key],
+                                    Qt.SortOrder.DescendingOrder if self.sorter.descending
+                                    else Qt.SortOrder.AscendingOrder)
+            header.blockSignals(False)
+            self.statusBar().showMessage(f"Cannot sort by {TABLE_COLUMNS[column][1]}", 3000)
+            return
+        self.sort_key = key
+        self.sorter.descending = order == Qt.SortOrder.DescendingOrder
+        self.sorter.hysteresis = SORT_HYSTERESIS.get(key, 0.0) if self.steady_button.isChecked() else 0.0
+        self.sorter.reset()
+        if self.snapshot is not None and self.group_combo.currentIndex() == 0:
+            self.update_table(self.snapshot)
+    
+    def toggle_steady_order(self, checked):
+        self.sorter.hysteresis = SORT_HYSTERESIS.get(self.sort_key, 0.0) if checked else 0.0
+        self.sorter.reset()
+        if self.snapshot is not None and self.group_combo.currentIndex() == 0:
+            self.update_table(self.snapshot)
+    
+    def filter_mask(self, snapshot):
+        # Rows matching the filter text by name, user or PID. Like the sort
+        # order, the result is carried from tick to tick: rows whose PID,
+        # name and user are unchanged reuse their last match, so only new
+        # rows are tested one by one. Redraws of the same snapshot (sorting,
+        # column changes) reuse the whole mask.
+        text = self.filter_text
+        state = self.filter_state
+        if state is not None and state[0] is snapshot and state[1] == text:
+            return state[5]
+        mask = np.zeros(len(snapshot), dtype=bool)
+        todo = np.arange(len(snapshot))
+        if state is not None and state[1] == text and len(state[2]) and len(snapshot):
+            _, _, pids, names, users, matched = state
+            pos = np.minimum(np.searchsorted(pids, snapshot.pids), len(pids) - 1)
+            same = (pids[pos] == snapshot.pids) & (names[pos] == snapshot.names) & (users[pos] == snapshot.users)
+            mask[same] = matched[pos[same]]
+            todo = np.flatnonzero(~same)
+        mask[todo] = np.fromiter((text in name.lower() or text in user.lower() or text in str(pid)
+                                  for pid, name, user in zip(snapshot.pids[todo].tolist(),
+                                                             snapshot.names[todo], snapshot.users[todo])),
+                                 dtype=bool, count=len(todo))
+        # PIDs are copied: a borrowed snapshot does not outlive the next poll
+        self.filter_state = (snapshot, text, snapshot.pids.copy(), snapshot.names, snapshot.users, mask)
+        return mask
+    
+    def visible_table_pids(self):
+        first = max(self.process_table.rowAt(0), 0)
+        last = self.process_table.rowAt(self.process_table.viewport().height() - 1)
+        last = len(self.row_pids) - 1 if last < 0 else last
+        return self.row_pids[first:last + 1].tolist()
+    
+    def refresh_visible_details(self):
+        # Priorities (slow-tier cache) and USS/PSS are only read for the rows
+        # on screen and the selection, and only while their columns are shown
+        if self.source.remote:
+            return
+        shown = self.visible_columns
+        visible = self.visible_table_pids()
+        if "nice" in shown or "ionice" in shown:
+            self.priorities.refresh(visible)
+        if "memory_detail" in shown:
+            self.memory_detail.request(visible + sorted(self.selected_pids - set(visible)))
+    
+    def on_table_scrolled(self, value):
+        if self.process_model.snapshot is not None:
+            self.refresh_visible_details()
+            self.process_model.refresh()
+    
+    def on_table_clicked(self, index):
+        if index.column() == COLUMN_INDEX["actions"] and index.row() < len(self.row_pids):
+            self.kill_process(int(self.row_pids[index.row()]))
     
     def kill_process(self, pid):
+        if self.source.remote:
+            QMessageBox.information(
+                self, "Remote Host",
+                "Process actions are only available when monitoring the local host."
+            )
+            return
         try:
             process = psutil.Process(pid)
             
@@ -319,10 +1267,14 @@ class ModernProcessMonitor(QMainWindow):
                 return
             
             # Ask for confirmation
+            name = process.name()
             confirm_msg = QMessageBox(self)
             confirm_msg.setWindowTitle("Confirm Process Termination")
-            confirm_msg.setText(f"Terminate Process: {process.name()}")
-            confirm_msg.setInformativeText(f"PID: {pid}\nAre you sure you want to terminate this process?")
+            confirm_msg.setText(f"Terminate Process: {name}")
+            confirm_msg.setInformativeText(
+                f"PID: {pid}\nAre you sure you want to terminate this process?\n"
+                f"It will be force killed if it does not exit within {TERMINATE_TIMEOUT:.0f} seconds."
+            )
             confirm_msg.setIcon(QMessageBox.Icon.Question)
             confirm_msg.setStandardButtons(
                 QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
@@ -330,32 +1282,10 @@ class ModernProcessMonitor(QMainWindow):
             confirm_msg.setDefaultButton(QMessageBox.StandardButton.No)
             
             if confirm_msg.exec() == QMessageBox.StandardButton.Yes:
-                process.terminate()
-                try:
-                    process.wait(timeout=3)
-                    success_msg = QMessageBox(self)
-                    success_msg.setWindowTitle("Success")
-                    success_msg.setText("Process Terminated")
-                    success_msg.setInformativeText(
-                        f"Process {process.name()} (PID: {pid}) was terminated successfully."
-                    )
-                    success_msg.setIcon(QMessageBox.Icon.Information)
-                    success_msg.exec()
-                except psutil.TimeoutExpired:
-                    force_msg = QMessageBox(self)
-                    force_msg.setWindowTitle("Process Not Responding")
-                    force_msg.setText(f"Process {process.name()} is not responding")
-                    force_msg.setInformativeText("Do you want to force kill it?")
-                    force_msg.setIcon(QMessageBox.Icon.Warning)
-                    force_msg.setStandardButtons(
-                        QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
-                    )
-                    if force_msg.exec() == QMessageBox.StandardButton.Yes:
-                        process.kill()
-                        QMessageBox.information(
-                            self, "Success", 
-                            f"Process {process.name()} (PID: {pid}) was force killed."
-                        )
+                # The SIGTERM -> wait -> SIGKILL escalation runs on the thread
+                # pool; the table picks up the exit on its next refresh
+                self.statusBar().showMessage(f"Terminating {name} (PID: {pid})...")
+                self.start_action(terminate_processes, [pid])
                     
         except psutil.AccessDenied:
             error_msg = QMessageBox(self)
@@ -365,12 +1295,7 @@ class ModernProcessMonitor(QMainWindow):
             error_msg.setIcon(QMessageBox.Icon.Warning)
             error_msg.exec()
         except psutil.NoSuchProcess:
-            error_msg = QMessageBox(self)
-            error_msg.setWindowTitle("Process Not Found")
-            error_msg.setText("Process no longer exists")
-            error_msg.setInformativeText("The process may have already been terminated.")
-            error_msg.setIcon(QMessageBox.Icon.Warning)
-            error_msg.exec()
+            self.statusBar().showMessage(f"Process {pid} no longer exists", 5000)
         except Exception as e:
             error_msg = QMessageBox(self)
             error_msg.setWindowTitle("Error")
@@ -378,360 +1303,334 @@ class ModernProcessMonitor(QMainWindow):
             error_msg.setInformativeText(str(e))
             error_msg.setIcon(QMessageBox.Icon.Critical)
             error_msg.exec()
+    
+    def on_action_finished(self, result):
+        self.statusBar().showMessage(format_summary(result), 10000)
+        # Show changed priorities on the next refresh instead of after the slow tier
+        self.priorities.invalidate(pid for pid, _ in result.get("reprioritized", []))
+    
+    def show_process_menu(self, position):
+        row = self.process_table.rowAt(position.y())
+        if row < 0 or row >= len(self.row_pids) or self.source.remote:
+            return
+        if int(self.row_pids[row]) not in self.selected_pids:
+            self.process_table.selectRow(row)
+        pids = sorted(self.selected_pids)
         
-        # Update the process list after kill attempt
+        menu = QMenu(self)
+        if len(pids) == 1:
+            action = menu.addAction("Show Threads")
+            action.triggered.connect(lambda checked: self.show_threads(pids[0]))
+        watched = set(self.watcher.pids())
+        if all(pid in watched for pid in pids):
+            action = menu.addAction("Stop Watching")
+            action.triggered.connect(lambda checked: self.unwatch_processes(pids))
+        else:
+            action = menu.addAction(f"Watch at {self.watcher.interval * 1000:.0f} ms")
+            action.triggered.connect(lambda checked: self.watch_processes(pids))
+        nice_menu = menu.addMenu("Set Priority")
+        for label, nice in NICE_CHOICES:
+            action = nice_menu.addAction(label)
+            action.triggered.connect(
+                lambda checked, value=nice: self.start_action(renice_processes, pids, value)
+            )
+        if IONICE_CHOICES:
+            ionice_menu = menu.addMenu("Set I/O Priority")
+            for label, (ioclass, value) in IONICE_CHOICES:
+                action = ionice_menu.addAction(label)
+                action.triggered.connect(
+                    lambda checked, ioclass=ioclass, value=value:
+                        self.start_action(ionice_processes, pids, ioclass, value)
+                )
+        menu.exec(self.process_table.viewport().mapToGlobal(position))
+    
+    def show_threads(self, pid):
+        name = self.process_model.info(pid)[0]
+        dialog = ThreadDetailDialog(pid, name, self)
+        dialog.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        dialog.show()
+    
+    def watch_processes(self, pids):
+        refused = [pid for pid in pids if not self.watcher.watch(pid)]
+        if refused:
+            self.statusBar().showMessage(
+                f"Could not watch {len(refused)} process(es): gone, denied or more than "
+                f"{self.watcher.max_watched} watched", 5000)
+        if self.watcher.pids():
+            self.watch_panel.show()
+            self.watch_timer.start(200)
+            self.update_watch_plot()
+    
+    def unwatch_processes(self, pids):
+        for pid in pids:
+            self.watcher.unwatch(pid)
+            curve = self.watch_curves.pop(pid, None)
+            if curve is not None:
+                self.watch_plot.removeItem(curve)
+        if not self.watcher.pids():
+            self.watch_timer.stop()
+            self.watch_panel.hide()
+    
+    def clear_watches(self):
+        self.unwatch_processes(self.watcher.pids())
+    
+    def update_watch_plot(self):
+        # Redrawn at 5 Hz; the sampler itself runs at its own (faster) rate
+        now = time.time()
+        for pid, (name, exited, samples) in self.watcher.series().items():
+            curve = self.watch_curves.get(pid)
+            if curve is None:
+                color = WATCH_COLORS[len(self.watch_curves) % len(WATCH_COLORS)]
+                curve = self.watch_plot.plot(pen=pg.mkPen(color=color, width=2), name=f"{name} ({pid})")
+                self.watch_curves[pid] = curve
+            curve.setData(samples[:, 0] - now, samples[:, 1])
+        self.watch_label.setText(f"{len(self.watch_curves)} pinned | every "
+                                 f"{self.watcher.effective_interval * 1000:.0f} ms")
+    
+    def start_action(self, action, *args):
+        worker = ProcessActionWorker(action, *args)
+        worker.signals.finished.connect(self.on_action_finished)
+        QThreadPool.globalInstance().start(worker)
+    
+    def toggle_column(self, key, checked):
+        if checked:
+            self.visible_columns.add(key)
+        else:
+            self.visible_columns.discard(key)
+        self.process_table.setColumnHidden(COLUMN_INDEX[key], not checked)
+        if not checked and key == self.sort_key:
+            self.process_table.horizontalHeader().setSortIndicator(COLUMN_INDEX["cpu"], Qt.SortOrder.DescendingOrder)
+        self.sync_collected_columns()
+        if not self.first_snapshot_pending:
+            self.last_update = 0
+            self.update_data()
+
+    def sync_collected_columns(self):
+        # Collect exactly what is in use from the next sample on. Usernames
+        # are needed while shown, grouped by or filtered on. Returns True when
+        # that asks for something the current snapshot does not have.
+        if not hasattr(self.source, "set_columns"):
+            return False
+        columns = [column for column in OPTIONAL_COLUMNS if column in self.visible_columns]
+        if ("user" in self.visible_columns or self.filter_text
+                or GROUP_MODES[self.group_combo.currentText()] == "user"):
+            columns.append("user")
+        added = not set(columns) <= set(self.collected_columns)
+        self.collected_columns = columns
+        self.source.set_columns(columns)
+        return added
+
+    def change_grouping(self, index):
+        grouped = index > 0
+        self.process_table.setVisible(not grouped)
+        self.group_tree.setVisible(grouped)
+        for button in self.bulk_buttons:
+            button.setVisible(not grouped)
+        self.selection_label.setVisible(not grouped)
+        if grouped and GROUP_MODES[self.group_combo.currentText()] in ("cgroup", "exe") and self.source.remote:
+            self.statusBar().showMessage("This grouping is only available for the local host", 5000)
+            self.group_combo.setCurrentIndex(0)
+            return
+        self.expanded_groups.clear()
+        self.group_tree.clear()
+        self.sync_collected_columns()
+        # Redraw from the last snapshot rather than waiting for the next tick
+        if self.recording is not None:
+            self.seek_replay(self.timeline_slider.value())
+            return
+        self.last_update = 0
         self.update_data()
+        # The table still shows the snapshot from before grouping, which a
+        # shared memory source may have overwritten since
+        if not grouped and self.snapshot is not None and self.process_model.snapshot is not self.snapshot:
+            self.update_table(self.snapshot)
+    
+    def update_groups(self, snapshot, sample=True):
+        # `sample` is False when redrawing between ticks (expand/collapse):
+        # cgroup usage is then taken from the last tick instead of re-read
+        mode = GROUP_MODES[self.group_combo.currentText()]
+        if mode == "cgroup":
+            codes = self.cgroups.resolve(snapshot.pids)
+            labels = self.cgroups.paths
+        elif mode == "exe":
+            codes = self.exes.resolve(snapshot.pids)
+            labels = self.exes.paths
+        else:
+            codes, labels = factorize(snapshot.names if mode == "name" else snapshot.users)
+        counts, cpu, mem = group_totals(codes, snapshot, len(labels))
+        
+        # Busiest 50 non-empty groups, like the process list
+        present = np.flatnonzero(counts)
+        order = present[np.argsort(-cpu[present], kind='stable')][:50]
+        if mode == "cgroup" and sample:
+            self.cgroup_stats.prune(labels[code] for code in present.tolist())
+        self.instrumentation.mark("select")
+        
+        self.group_tree.setUpdatesEnabled(False)
+        self.group_tree.blockSignals(True)
+        while self.group_tree.topLevelItemCount() > len(order):
+            self.group_tree.takeTopLevelItem(self.group_tree.topLevelItemCount() - 1)
+        for row, code in enumerate(order):
+            key = labels[code]
+            group_cpu = group_memory = None
+            if mode == "cgroup" and key != "?":
+                if sample:
+                    group_cpu, group_memory = self.cgroup_stats.usage(key)
+                else:
+                    group_cpu, group_memory = self.cgroup_stats.cached(key)
+            values = [
+                cgroup_label(key) if mode == "cgroup" else key,
+                str(int(counts[code])),
+                f"{cpu[code]:.1f}%",
+                f"{mem[code]:.1f}%",
+                "-" if group_cpu is None else f"{group_cpu:.1f}%",
+                "-" if group_memory is None else f"{group_memory / (1024**2):.0f} MB",
+            ]
+            item = self.group_tree.topLevelItem(row)
+            if item is None:
+                item = QTreeWidgetItem(self.group_tree)
+                item.setChildIndicatorPolicy(QTreeWidgetItem.ChildIndicatorPolicy.ShowIndicator)
+            self.set_tree_row(item, values)
+            item.setToolTip(0, key)
+            item.setData(0, Qt.ItemDataRole.UserRole, key)
+            
+            # Member rows are only built for expanded groups
+            expanded = key in self.expanded_groups
+            if expanded:
+                members = np.flatnonzero(codes == code)
+                members = members[np.argsort(-snapshot.cpu[members], kind='stable')]
+                self.set_group_members(item, snapshot, members)
+            elif item.childCount():
+                item.takeChildren()
+            item.setExpanded(expanded)
+        self.group_tree.blockSignals(False)
+        self.group_tree.setUpdatesEnabled(True)
+    
+    def set_tree_row(self, item, values):
+        for col, value in enumerate(values):
+            if item.text(col) != value:
+                item.setText(col, value)
+            if col > 0:
+                item.setTextAlignment(col, Qt.AlignmentFlag.AlignCenter)
+    
+    def set_group_members(self, item, snapshot, members):
+        while item.childCount() > len(members):
+            item.removeChild(item.child(item.childCount() - 1))
+        for row, i in enumerate(members):
+            child = item.child(row)
+            if child is None:
+                child = QTreeWidgetItem(item)
+            self.set_tree_row(child, [
+                f"{int(snapshot.pids[i])}  {snapshot.names[i]}",
+                snapshot.users[i],
+                f"{snapshot.cpu[i]:.1f}%",
+                f"{snapshot.mem[i]:.1f}%",
+                "",
+                "",
+            ])
+    
+    def on_group_toggled(self, item):
+        key = item.data(0, Qt.ItemDataRole.UserRole)
+        if key is None:
+            return
+        if item.isExpanded():
+            self.expanded_groups.add(key)
+        else:
+            self.expanded_groups.discard(key)
+        if self.snapshot is not None:
+            self.update_groups(self.snapshot, sample=False)
+    
+    def on_selection_changed(self, selected=None, deselected=None):
+        if self.restoring_selection:
+            return
+        rows = [index.row() for index in self.process_table.selectionModel().selectedRows()]
+        self.selected_pids = {int(self.row_pids[row]) for row in rows if row < len(self.row_pids)}
+        self.update_selection_controls()
+    
+    def restore_selection(self):
+        # Reselect rows whose PID is still listed; exited processes drop out
+        self.restoring_selection = True
+        self.process_table.clearSelection()
+        if self.selected_pids:
+            rows = self.process_model.rows_of(self.selected_pids)
+            self.selected_pids = {int(pid) for pid in self.row_pids[rows]}
+            selection = QItemSelection()
+            for row in rows.tolist():
+                selection.select(self.process_model.index(row, 0),
+                                 self.process_model.index(row, len(TABLE_COLUMNS) - 1))
+            self.process_table.selectionModel().select(
+                selection, QItemSelectionModel.SelectionFlag.Select | QItemSelectionModel.SelectionFlag.Rows)
+        self.restoring_selection = False
+        self.update_selection_controls()
+    
+    def update_selection_controls(self):
+        if self.inspector_panel.isVisible():
+            self.inspect_selection()
+        count = len(self.selected_pids)
+        self.selection_label.setText(f"{count} selected" if count else "")
+        for button in self.bulk_buttons:
+            button.setEnabled(count > 0 and not self.source.remote)
     
+    def run_bulk_action(self, action):
+        if self.source.remote or not self.selected_pids:
+            return
+        
+        # Leave system processes alone, as for single-process termination
+        protected = {'SYSTEM', 'LOCAL SERVICE', 'NETWORK SERVICE'}
+        pids = sorted(pid for pid in self.selected_pids
+                      if pid > 4 and self.process_user(pid) not in protected)
+        skipped = len(self.selected_pids) - len(pids)
+        if not pids:
+            self.statusBar().showMessage("Cannot act on system processes", 5000)
+            return
+        
+        names = [f"{self.process_model.info(pid)[0]} ({pid})" for pid in pids[:10]]
+        if len(pids) > 10:
+            names.append(f"... and {len(pids) - 10} more")
+        confirm_msg = QMessageBox(self)
+        confirm_msg.setWindowTitle(f"Confirm {action}")
+        confirm_msg.setText(f"{action} {len(pids)} process{'es' if len(pids) != 1 else ''}?")
+        details = "\n".join(names)
+        if skipped:
+            details += f"\n\n{skipped} system process{'es' if skipped != 1 else ''} will be skipped."
+        confirm_msg.setInformativeText(details)
+        confirm_msg.setIcon(QMessageBox.Icon.Question)
+        confirm_msg.setStandardButtons(
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        confirm_msg.setDefaultButton(QMessageBox.StandardButton.No)
+        if confirm_msg.exec() != QMessageBox.StandardButton.Yes:
+            return
+        
+        self.statusBar().showMessage(f"{action}: signalling {len(pids)} processes...")
+        self.start_action(BULK_ACTIONS[action], pids)
+    
+    def process_user(self, pid):
+        # Owner of a listed process; read directly when usernames are not
+        # being collected
+        user = self.process_model.info(pid)[1]
+        if user or self.source.remote:
+            return user
+        try:
+            return psutil.Process(pid).username()
+        except psutil.Error:
+            return ""
+
     def filter_processes(self, text):
-        for i in range(self.process_table.rowCount()):
-            show = False
-            for j in range(self.process_table.columnCount() - 1):  # Exclude the Actions column
-                item = self.process_table.item(i, j)
-                if item and text.lower() in item.text().lower():
-                    show = True
-                    break
-            self.process_table.setRowHidden(i, not show)
+        self.filter_text = text.lower()
+        if self.sync_collected_columns() and not self.first_snapshot_pending and self.recording is None:
+            # Usernames were not being collected; match against a fresh sample
+            self.last_update = 0
+            self.update_data()
+            return
+        if self.snapshot is not None and self.group_combo.currentIndex() == 0:
+            self.update_table(self.snapshot)
 
     def apply_theme(self):
-        # Dark theme styles
-        dark_style = """
-            QMainWindow {
-                background-color: #1a1b26;
-            }
-            QLabel {
-                color: #a9b1d6;
-                font-size: 14px;
-            }
-            #title {
-                font-size: 24px;
-                color: #7aa2f7;
-                font-weight: bold;
-                padding: 10px;
-                background-color: #24283b;
-                border-radius: 8px;
-            }
-            #themeButton {
-                background-color: #24283b;
-                color: #a9b1d6;
-                border: 2px solid #414868;
-                border-radius: 20px;
-                font-size: 16px;
-            }
-            #themeButton:hover {
-                background-color: #2a2b36;
-                border-color: #7aa2f7;
-            }
-            #searchBox {
-                background-color: #24283b;
-                color: #a9b1d6;
-                border: 1px solid #414868;
-                border-radius: 20px;
-                padding: 8px 15px;
-                font-size: 14px;
-            }
-            #searchBox:focus {
-                border: 2px solid #7aa2f7;
-            }
-            QMessageBox {
-                background-color: #1a1b26;
-            }
-            QMessageBox QLabel {
-                color: #a9b1d6;
-                font-size: 14px;
-                padding: 10px;
-            }
-            QMessageBox QPushButton {
-                background-color: #7aa2f7;
-                color: white;
-                border: none;
-                border-radius: 15px;
-                padding: 8px 20px;
-                font-size: 13px;
-                font-weight: bold;
-                min-width: 100px;
-            }
-            QMessageBox QPushButton:hover {
-                background-color: #6a92e7;
-            }
-            QMessageBox QPushButton:pressed {
-                background-color: #5a82d7;
-            }
-            QTableWidget {
-                background-color: #24283b;
-                color: #a9b1d6;
-                border: none;
-                gridline-color: #414868;
-                selection-background-color: #364A82;
-                font-size: 13px;
-            }
-            QHeaderView::section {
-                background-color: #1a1b26;
-                color: #7aa2f7;
-                border: none;
-                border-right: 1px solid #414868;
-                padding: 12px 8px;
-                font-size: 14px;
-                font-weight: bold;
-            }
-            QHeaderView::section:hover {
-                background-color: #2a2b36;
-            }
-            QTableWidget::item {
-                padding: 8px;
-                border-bottom: 1px solid #414868;
-            }
-            QTableWidget::item:hover {
-                background-color: #2a2b36;
-            }
-            QTableWidget::item:selected {
-                background-color: #364A82;
-                color: white;
-            }
-            QPushButton {
-                background-color: #ff4757;
-                color: white;
-                border: none;
-                border-radius: 4px;
-                padding: 6px 12px;
-                font-size: 13px;
-                font-weight: bold;
-                min-width: 80px;
-                min-height: 30px;
-                margin: 4px;
-            }
-            QPushButton:hover {
-                background-color: #ff6b81;
-                border: 2px solid #ffffff;
-            }
-            QPushButton:pressed {
-                background-color: #ff4757;
-            }
-            QPushButton[warning="true"] {
-                background-color: #ff4757;
-                color: #ffffff !important;
-                font-weight: 800;
-                font-size: 13px;
-                border: none;
-                min-width: 70px;
-                min-height: 28px;
-                letter-spacing: 0.5px;
-                text-align: center;
-                padding: 2px 8px;
-                text-transform: uppercase;
-                border-radius: 4px;
-            }
-            QPushButton[warning="true"]:hover {
-                background-color: #ff6b81;
-                border: 1px solid #ffffff;
-            }
-            QPushButton[warning="true"]:pressed {
-                background-color: #ff4757;
-            }
-            QFrame {
-                background-color: #24283b;
-                border-radius: 8px;
-                border: 1px solid #414868;
-            }
-            QFrame:hover {
-                border: 1px solid #7aa2f7;
-            }
-            QScrollBar:vertical {
-                border: none;
-                background: #1a1b26;
-                width: 10px;
-                margin: 0;
-            }
-            QScrollBar::handle:vertical {
-                background: #414868;
-                border-radius: 5px;
-                min-height: 20px;
-            }
-            QScrollBar::handle:vertical:hover {
-                background: #7aa2f7;
-            }
-            QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {
-                height: 0;
-            }
-            QWidget[buttonContainer="true"] {
-                background-color: transparent;
-                padding: 4px;
-                margin: 2px;
-            }
-            #systemInfoTitle {
-                font-size: 18px;
-                color: #7aa2f7;
-                font-weight: bold;
-                margin-bottom: 10px;
-            }
-            #infoFrame {
-                background-color: #2a2b36;
-                border-radius: 4px;
-                padding: 10px;
-                margin: 5px 0;
-                border: 1px solid #414868;
-            }
-            #infoKey {
-                color: #7aa2f7;
-                font-weight: bold;
-                font-size: 14px;
-            }
-            #infoValue {
-                color: #a9b1d6;
-                font-size: 13px;
-            }
-        """
-
-        # Light theme styles
-        light_style = """
-            QMainWindow {
-                background-color: #f0f2f5;
-            }
-            QLabel {
-                color: #2c3e50;
-                font-size: 14px;
-            }
-            #title {
-                font-size: 24px;
-                color: #2c3e50;
-                font-weight: bold;
-                padding: 10px;
-                background-color: white;
-                border-radius: 8px;
-            }
-            #themeButton {
-                background-color: white;
-                color: #2c3e50;
-                border: 2px solid #e1e4e8;
-                border-radius: 16px;
-                font-size: 14px;
-            }
-            #themeButton:hover {
-                background-color: #f6f8fa;
-                border-color: #2c3e50;
-            }
-            #searchBox {
-                background-color: white;
-                color: #2c3e50;
-                border: 1px solid #e1e4e8;
-                border-radius: 20px;
-                padding: 8px 15px;
-                font-size: 14px;
-            }
-            #searchBox:focus {
-                border: 2px solid #2c3e50;
-            }
-            QTableWidget {
-                background-color: white;
-                color: #2c3e50;
-                border: none;
-                gridline-color: #e1e4e8;
-            }
-            QHeaderView::section {
-                background-color: #f6f8fa;
-                color: #2c3e50;
-                border: none;
-                border-right: 1px solid #e1e4e8;
-                padding: 12px 8px;
-                font-weight: bold;
-            }
-            QTableWidget::item {
-                padding: 8px;
-                border-bottom: 1px solid #e1e4e8;
-            }
-            QTableWidget::item:selected {
-                background-color: #f1f8ff;
-                color: #2c3e50;
-            }
-            QPushButton[warning="true"] {
-                background-color: #dc3545;
-                color: white !important;
-                font-weight: 800;
-                font-size: 13px;
-                border: none;
-                min-width: 70px;
-                min-height: 28px;
-            }
-            QPushButton[warning="true"]:hover {
-                background-color: #c82333;
-                border: 2px solid #dc3545;
-            }
-            QMessageBox {
-                background-color: white;
-            }
-            QMessageBox QLabel {
-                color: #2c3e50;
-                font-size: 14px;
-                padding: 10px;
-            }
-            QMessageBox QPushButton {
-                background-color: #007bff;
-                color: white;
-                border: none;
-                border-radius: 15px;
-                padding: 8px 20px;
-                font-size: 13px;
-                font-weight: bold;
-                min-width: 100px;
-            }
-            QMessageBox QPushButton:hover {
-                background-color: #0056b3;
-            }
-            QFrame {
-                background-color: white;
-                border-radius: 8px;
-                border: 1px solid #e1e4e8;
-            }
-            QFrame:hover {
-                border: 1px solid #2c3e50;
-            }
-            QScrollBar:vertical {
-                border: none;
-                background: #f6f8fa;
-                width: 10px;
-                margin: 0;
-            }
-            QScrollBar::handle:vertical {
-                background: #c1c9d2;
-                border-radius: 5px;
-                min-height: 20px;
-            }
-            QScrollBar::handle:vertical:hover {
-                background: #a1aab4;
-            }
-            QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {
-                height: 0;
-            }
-            QWidget[buttonContainer="true"] {
-                background-color: transparent;
-                padding: 4px;
-                margin: 2px;
-            }
-            #systemInfoTitle {
-                font-size: 18px;
-                color: #2c3e50;
-                font-weight: bold;
-                margin-bottom: 10px;
-            }
-            #infoFrame {
-                background-color: white;
-                border-radius: 4px;
-                padding: 10px;
-                margin: 5px 0;
-                border: 1px solid #e1e4e8;
-            }
-            #infoKey {
-                color: #2c3e50;
-                font-weight: bold;
-                font-size: 14px;
-            }
-            #infoValue {
-                color: #2c3e50;
-                font-size: 13px;
-            }
-        """
-
-        self.setStyleSheet(dark_style if self.is_dark_theme else light_style)
+        self.setStyleSheet(DARK_STYLE if self.is_dark_theme else LIGHT_STYLE)
         self.theme_button.setText("🌙" if self.is_dark_theme else "☀️")
+        self.kill_delegate.color = QColor('#ff4757' if self.is_dark_theme else '#dc3545')
+        self.process_table.viewport().update()
         
         # Update the system info frames style
         for i in range(self.right_panel.layout().count() - 1):  # -1 to exclude the stretch
@@ -795,10 +1694,653 @@ class ModernProcessMonitor(QMainWindow):
     def toggle_theme(self):
         self.is_dark_theme = not self.is_dark_theme
         self.apply_theme()
+    
+    def toggle_debug_panel(self, checked):
+        self.instrumentation.set_enabled(checked)
+        self.debug_label.setVisible(checked)
+        if checked:
+            self.update_debug_panel(force=True)
+    
+    def update_debug_panel(self, force=False):
+        # Percentiles are only computed here, at most once a second
+        now = time.monotonic()
+        if not force and now - self.last_debug_update < 1.0:
+            return
+        self.last_debug_update = now
+        self.debug_label.setText("\n".join(self.instrumentation.report_lines()))
+    
+    def request_profile(self):
+        self.profiler.request_profile()
+        self.statusBar().showMessage(f"Profiling the next {self.profiler.ticks} refreshes...")
+    
+    def tracemalloc_checkpoint(self):
+        message, path = self.profiler.tracemalloc_checkpoint()
+        self.statusBar().showMessage(message, 10000)
+        print(message)
+    
+    def install_signal_handlers(self):
+        # SIGUSR1 profiles the next refreshes, SIGUSR2 takes a tracemalloc
+        # checkpoint. Work is deferred to the event loop rather than done
+        # inside the handler.
+        if not hasattr(signal, "SIGUSR1"):
+            return
+        signal.signal(signal.SIGUSR1, lambda signum, frame: self.profiler.request_profile())
+        signal.signal(signal.SIGUSR2, lambda signum, frame: QTimer.singleShot(0, self.tracemalloc_checkpoint))
+    
+    def toggle_events(self, checked):
+        if checked and self.source.remote:
+            self.statusBar().showMessage("Process events are only available for the local host", 5000)
+            self.events_button.setChecked(False)
+            return
+        if checked and self.lifecycle is None:
+            self.lifecycle = open_lifecycle_watcher()
+            self.lifecycle.start()
+        self.events_panel.setVisible(checked)
+        if checked:
+            self.update_events()
+    
+    def update_events(self):
+        # Only redrawn when something happened since the last refresh
+        rates = self.lifecycle.rates()
+        spawns = rates["fork"]
+        self.events_rate_label.setText(
+            f"Spawns/s: {spawns[0]:.0f} (1s) · {spawns[1]:.1f} (10s) · {spawns[2]:.1f} (60s) | "
+            f"Execs/s: {rates['exec'][1]:.1f} (10s) | Exits/s: {rates['exit'][1]:.1f} (10s) | "
+            f"{self.lifecycle.method}")
+        seen = sum(self.lifecycle.counts.values())
+        if seen == self.lifecycle_seen:
+            return
+        self.lifecycle_seen = seen
+        events = self.lifecycle.recent(EVENT_ROWS)
+        self.events_table.setUpdatesEnabled(False)
+        self.events_table.setRowCount(len(events))
+        for row, (timestamp, kind, pid, ppid, name, exit_code) in enumerate(events):
+            values = [
+                datetime.fromtimestamp(timestamp).strftime('%H:%M:%S.%f')[:-3],
+                kind, str(pid), str(ppid), name, "" if exit_code is None else str(exit_code),
+            ]
+            for col, value in enumerate(values):
+                item = self.events_table.item(row, col)
+                if item is None:
+                    self.events_table.setItem(row, col, QTableWidgetItem(value))
+                elif item.text() != value:
+                    item.setText(value)
+        self.events_table.setUpdatesEnabled(True)
+    
+    def toggle_inspector(self, checked):
+        if checked and self.source.remote:
+            self.statusBar().showMessage("The inspector is only available for the local host", 5000)
+            self.inspector_button.setChecked(False)
+            return
+        self.inspector_panel.setVisible(checked)
+        if checked:
+            self.inspect_selection()
+        else:
+            self.cancel_inspection()
+            self.inspector_pid = None
+    
+    def cancel_inspection(self):
+        if self.inspector_worker is not None:
+            self.inspector_worker.cancel.set()
+            self.inspector_worker = None
+        # Anything still queued from the old load is ignored from now on
+        self.inspector_generation += 1
+    
+    def inspect_selection(self):
+        pid = next(iter(self.selected_pids)) if len(self.selected_pids) == 1 else None
+        if pid == self.inspector_pid:
+            return
+        self.cancel_inspection()
+        self.inspector_pid = pid
+        for table in self.inspector_tables.values():
+            table.setRowCount(0)
+        self.inspector_counts = {kind: 0 for kind in self.inspector_tables}
+        self.inspector_done = {kind: False for kind in self.inspector_tables}
+        self.inspector_fd_types = {}
+        if pid is None:
+            self.inspector_title.setText("Inspector")
+            self.inspector_status.setText("Select a single process")
+            return
+        name = self.process_model.info(pid)[0]
+        self.inspector_title.setText(f"Inspector - {name} (PID: {pid})")
+        self.inspector_status.setText("Loading...")
+        worker = InspectorWorker(pid, self.inspector_generation)
+        worker.signals.batch.connect(self.on_inspector_batch)
+        worker.signals.finished.connect(self.on_inspector_finished)
+        self.inspector_worker = worker
+        QThreadPool.globalInstance().start(worker)
+    
+    def on_inspector_batch(self, generation, kind, rows):
+        if generation != self.inspector_generation:
+            return
+        self.inspector_counts[kind] += len(rows)
+        if kind == "files":
+            # Descriptor kinds (socket, pipe, anon_inode, file) are what leaks show up in
+            for _, target in rows:
+                fd_type = target.split(":", 1)[0] if ":[" in target else "file"
+                self.inspector_fd_types[fd_type] = self.inspector_fd_types.get(fd_type, 0) + 1
+        table = self.inspector_tables[kind]
+        start = table.rowCount()
+        rows = rows[:max(INSPECTOR_ROWS - start, 0)]
+        if rows:
+            table.setUpdatesEnabled(False)
+            table.setRowCount(start + len(rows))
+            for offset, values in enumerate(rows):
+                for col, value in enumerate(values):
+                    table.setItem(start + offset, col, QTableWidgetItem(str(value)))
+            table.setUpdatesEnabled(True)
+        self.update_inspector_status()
+    
+    def on_inspector_finished(self, generation, kind, error):
+        if generation != self.inspector_generation:
+            return
+        self.inspector_done[kind] = error or True
+        if all(self.inspector_done.values()):
+            self.inspector_worker = None
+        self.update_inspector_status()
+    
+    def update_inspector_status(self):
+        parts = []
+        for kind, label in [("files", "fds"), ("connections", "connections"), ("maps", "maps")]:
+            done = self.inspector_done[kind]
+            count = self.inspector_counts[kind]
+            if isinstance(done, str):
+                parts.append(f"{label}: {done}")
+            else:
+                parts.append(f"{count:,} {label}" + ("" if done else "..."))
+        if self.inspector_fd_types:
+            kinds = sorted(self.inspector_fd_types.items(), key=lambda item: -item[1])
+            parts.append(", ".join(f"{count:,} {fd_type}" for fd_type, count in kinds[:4]))
+        if any(count > INSPECTOR_ROWS for count in self.inspector_counts.values()):
+            parts.append(f"listing the first {INSPECTOR_ROWS:,} of each")
+        self.inspector_status.setText(" | ".join(parts))
+    
+    def toggle_export(self):
+        if self.exporter is not None:
+            self.stop_export()
+            return
+        
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Snapshots", "snapshots.csv",
+            "CSV (*.csv);;Parquet (*.parquet);;Arrow (*.arrow)"
+        )
+        if not path:
+            self.export_button.setChecked(False)
+            return
+        try:
+            self.exporter = open_exporter(path)
+        except (RuntimeError, ValueError, OSError) as e:
+            self.export_button.setChecked(False)
+            QMessageBox.critical(self, "Export Failed", str(e))
+            return
+        self.export_button.setText("Stop Export")
+    
+    def stop_export(self):
+        exporter, self.exporter = self.exporter, None
+        self.export_button.setChecked(False)
+        self.export_button.setText("Export")
+        try:
+            exporter.close()
+        except Exception as e:
+            QMessageBox.critical(self, "Export Failed", str(e))
+            return
+        QMessageBox.information(
+            self, "Export Complete",
+            f"Wrote {exporter.rows_written} rows from {exporter.snapshots_written} snapshots to {exporter.path}"
+        )
+    
+    def closeEvent(self, event):
+        if self.exporter is not None:
+            self.exporter.close()
+        if self.lifecycle is not None:
+            self.lifecycle.stop()
+        self.watch_timer.stop()
+        self.watcher.stop()
+        self.memory_detail.close()
+        self.cancel_inspection()
+        self.source.close()
+        super().closeEvent(event)
+
+class ThreadDetailDialog(QDialog):
+    # Per-thread CPU for one process. Threads are read on the thread pool
+    # every THREAD_REFRESH ms, and only while the dialog is open; the table
+    # lists the busiest THREAD_ROWS so huge thread counts stay cheap to draw.
+    def __init__(self, pid, name, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(f"Threads - {name} (PID: {pid})")
+        self.resize(720, 560)
+        self.sampler = ThreadSampler(pid)
+        self.in_flight = False
+        
+        layout = QVBoxLayout(self)
+        self.summary_label = QLabel("Reading threads...")
+        layout.addWidget(self.summary_label)
+        self.table = QTableWidget()
+        self.table.setColumnCount(5)
+        self.table.setHorizontalHeaderLabels(["TID", "Name", "State", "CPU %", "CPU Time"])
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setShowGrid(False)
+        self.table.setAlternatingRowColors(True)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setColumnWidth(1, 240)
+        layout.addWidget(self.table)
+        
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(THREAD_REFRESH)
+        self.refresh()
+    
+    def refresh(self):
+        # Skip a beat rather than queue reads if the last one is still running
+        if self.in_flight:
+            return
+        self.in_flight = True
+        worker = ProcessActionWorker(self.sampler.sample)
+        worker.signals.finished.connect(self.on_sample)
+        QThreadPool.globalInstance().start(worker)
+    
+    def on_sample(self, result):
+        self.in_flight = False
+        if isinstance(result, dict):
+            self.timer.stop()
+            self.summary_label.setText(f"Process is no longer available: {result.get('error')}")
+            return
+        tids, names, states, cpu, cpu_seconds = result
+        order = np.argsort(-cpu, kind='stable')[:THREAD_ROWS]
+        self.summary_label.setText(
+            f"{len(tids)} threads | {cpu.sum():.1f}% CPU in total"
+            + (f" | showing the busiest {THREAD_ROWS}" if len(tids) > THREAD_ROWS else ""))
+        self.table.setUpdatesEnabled(False)
+        self.table.setRowCount(len(order))
+        for row, i in enumerate(order):
+            minutes, seconds = divmod(cpu_seconds[i], 60)
+            values = [str(tids[i]), names[i], states[i], f"{cpu[i]:.1f}%",
+                      f"{int(minutes)}:{seconds:05.2f}"]
+            for col, value in enumerate(values):
+                item = self.table.item(row, col)
+                if item is None:
+                    item = QTableWidgetItem()
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+                    self.table.setItem(row, col, item)
+                if item.text() != value:
+                    item.setText(value)
+        self.table.setUpdatesEnabled(True)
+    
+    def done(self, result):
+        # Stops collection as soon as the dialog goes away
+        self.timer.stop()
+        super().done(result)
+
+class FleetMonitor(QMainWindow):
+    def __init__(self, aggregator, top_n=50):
+        super().__init__()
+        self.setWindowTitle("Process Monitoring System - Fleet")
+        self.setGeometry(100, 100, 1400, 900)
+        
+        self.aggregator = aggregator
+        self.top_n = top_n
+        
+        main_widget = QWidget()
+        self.setCentralWidget(main_widget)
+        layout = QVBoxLayout(main_widget)
+        layout.setSpacing(20)
+        layout.setContentsMargins(20, 20, 20, 20)
+        
+        top_bar = QHBoxLayout()
+        title = QLabel("Fleet Overview")
+        title.setObjectName("title")
+        top_bar.addWidget(title)
+        top_bar.addStretch()
+        self.summary_label = QLabel("Connecting...")
+        top_bar.addWidget(self.summary_label)
+        layout.addLayout(top_bar)
+        
+        content_layout = QHBoxLayout()
+        
+        # Host x metric overview
+        hosts_panel = QFrame()
+        hosts_layout = QVBoxLayout(hosts_panel)
+        hosts_layout.setContentsMargins(15, 15, 15, 15)
+        hosts_title = QLabel("Hosts")
+        hosts_title.setObjectName("hostsTitle")
+        hosts_layout.addWidget(hosts_title)
+        self.host_table = QTableWidget()
+        self.host_table.setColumnCount(7)
+        self.host_table.setHorizontalHeaderLabels([
+            "Host", "Status", "CPU %", "Memory %", "Processes", "Busiest", "Age"
+        ])
+        hosts_layout.addWidget(self.host_table)
+        content_layout.addWidget(hosts_panel, stretch=1)
+        
+        # Global top-N across hosts
+        top_panel = QFrame()
+        top_layout = QVBoxLayout(top_panel)
+        top_layout.setContentsMargins(15, 15, 15, 15)
+        top_title = QLabel(f"Top {top_n} Processes Across Hosts")
+        top_title.setObjectName("topTitle")
+        top_layout.addWidget(top_title)
+        self.top_table = QTableWidget()
+        self.top_table.setColumnCount(6)
+        self.top_table.setHorizontalHeaderLabels([
+            "Host", "PID", "Name", "User", "CPU %", "Memory %"
+        ])
+        top_layout.addWidget(self.top_table)
+        content_layout.addWidget(top_panel, stretch=1)
+        
+        for table in [self.host_table, self.top_table]:
+            table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+            table.horizontalHeader().setStretchLastSection(True)
+            table.verticalHeader().setVisible(False)
+            table.setShowGrid(False)
+            table.setAlternatingRowColors(True)
+            table.setSortingEnabled(False)
+        
+        layout.addLayout(content_layout)
+        self.setStyleSheet(DARK_STYLE)
+        
+        self.timer = QTimer()
+        self.timer.timeout.connect(self.update_data)
+        self.timer.start(1000)
+    
+    def set_row(self, table, row, values):
+        # Reuse existing items so a refresh only rewrites text
+        for col, value in enumerate(values):
+            item = table.item(row, col)
+            if item is None:
+                item = QTableWidgetItem()
+                item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+                table.setItem(row, col, item)
+            if item.text() != value:
+                item.setText(value)
+    
+    def update_data(self):
+        try:
+            totals = self.aggregator.totals()
+            self.summary_label.setText(
+                f"Hosts up: {totals['up']}/{totals['hosts']} | Processes: {totals['processes']} | "
+                f"Avg CPU: {totals['cpu']:.1f}% | Avg Memory: {totals['mem']:.1f}%"
+            )
+            
+            overview = self.aggregator.overview()
+            self.host_table.setUpdatesEnabled(False)
+            self.host_table.setRowCount(len(overview))
+            for i, (address, status, cpu, mem, count, busiest, age, error) in enumerate(overview):
+                self.set_row(self.host_table, i, [
+                    address,
+                    status if not error else f"{status} ({error})",
+                    "-" if cpu is None else f"{cpu:.1f}%",
+                    "-" if mem is None else f"{mem:.1f}%",
+                    str(count),
+                    busiest,
+                    "-" if age is None else f"{age:.0f}s",
+                ])
+            self.host_table.setUpdatesEnabled(True)
+            
+            top = self.aggregator.global_top(self.top_n)
+            self.top_table.setUpdatesEnabled(False)
+            self.top_table.setRowCount(len(top))
+            for i, (address, cpu, mem, pid, name, user) in enumerate(top):
+                self.set_row(self.top_table, i, [
+                    address, str(pid), name, user, f"{cpu:.1f}%", f"{mem:.1f}%"
+                ])
+            self.top_table.setUpdatesEnabled(True)
+        except Exception as e:
+            print(f"Error updating fleet data: {str(e)}")
+    
+    def closeEvent(self, event):
+        self.timer.stop()
+        self.aggregator.stop()
+        super().closeEvent(event)
+
+def add_capture_arguments(parser):
+    parser.add_argument("--connect", metavar="ADDRESS", help="read from an agent instead of sampling locally")
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between samples")
+    parser.add_argument("--samples", type=int, default=0, help="stop after N samples (default: until Ctrl+C)")
+    add_workers_argument(parser)
+
+def add_workers_argument(parser):
+    parser.add_argument("--workers", type=int, default=0, metavar="N",
+                        help="collect locally with N worker processes, each owning a shard of the PID space")
+
+def open_source(address, workers=0, isolated=False):
+    if address:
+        from agent import AgentClient
+        return AgentClient(address)
+    if isolated:
+        from shared_snapshot import SharedMemorySource
+        return SharedMemorySource(workers=workers)
+    if workers > 1:
+        from parallel import ShardedSampler
+        return ShardedSampler(workers)
+    return LocalSampler()
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Real-time process monitoring dashboard")
+    parser.add_argument("--connect", metavar="ADDRESS",
+                        help="view snapshots from an agent (unix:/path or host:port) instead of sampling locally")
+    add_workers_argument(parser)
+    parser.add_argument("--isolated", action="store_true",
+                        help="collect in a separate process that hands snapshots over through shared memory")
+    parser.add_argument("--instrument-log", type=float, default=0, metavar="SECONDS",
+                        help="print refresh phase timings and the monitor's own CPU/RSS every N seconds")
+    parser.add_argument("--profile-dir", default=DEFAULT_PROFILE_DIR, metavar="DIR",
+                        help="where cProfile and tracemalloc dumps are written")
+    parser.add_argument("--profile-ticks", type=int, default=20, metavar="N",
+                        help="number of refreshes covered by each cProfile run")
+    subparsers = parser.add_subparsers(dest="command")
+
+    agent_parser = subparsers.add_parser("agent", help="run a headless collector that serves snapshots")
+    agent_parser.add_argument("--listen", default="127.0.0.1:7878", metavar="ADDRESS",
+                              help="unix:/path or host:port to listen on, or 'none' for metrics only")
+    agent_parser.add_argument("--interval", type=float, default=1.0, help="seconds between samples")
+    agent_parser.add_argument("--keyframe-every", type=int, default=30,
+                              help="send a full keyframe after this many deltas")
+    agent_parser.add_argument("--max-viewers", type=int, default=8)
+    agent_parser.add_argument("--max-kbps", type=int, default=512,
+                              help="per-viewer bandwidth budget in KiB/s")
+    agent_parser.add_argument("--stats-interval", type=float, default=0,
+                              help="print bandwidth and CPU statistics every N seconds")
+    agent_parser.add_argument("--metrics", metavar="HOST:PORT",
+                              help="serve Prometheus/OpenMetrics text on http://HOST:PORT/metrics")
+    agent_parser.add_argument("--metrics-top", type=int, default=20,
+                              help="export per-process series for the top N by CPU and by memory")
+    add_workers_argument(agent_parser)
+
+    record_parser = subparsers.add_parser("record", help="record snapshots to a replayable file")
+    record_parser.add_argument("output", help="recording file to write")
+    add_capture_arguments(record_parser)
+    record_parser.add_argument("--keyframe-every", type=int, default=60,
+                               help="write a full keyframe after this many deltas")
+
+    export_parser = subparsers.add_parser("export", help="stream snapshots to CSV, Parquet or Arrow")
+    export_parser.add_argument("output", help="output file (.csv, .parquet or .arrow)")
+    export_parser.add_argument("--input", metavar="RECORDING", help="export a recording instead of live data")
+    export_parser.add_argument("--format", choices=["csv", "parquet", "arrow"],
+                               help="output format (default: from the file extension)")
+    add_capture_arguments(export_parser)
+
+    fleet_parser = subparsers.add_parser("fleet", help="aggregate many agents into one overview")
+    fleet_parser.add_argument("agents", nargs="*", metavar="ADDRESS", help="agent addresses")
+    fleet_parser.add_argument("--agents-file", help="file with one agent address per line")
+    fleet_parser.add_argument("--simulate", type=int, default=0, metavar="N",
+                              help="start N simulated agents locally and connect to them")
+    fleet_parser.add_argument("--top", type=int, default=50, help="size of the global top-N list")
+
+    replay_parser = subparsers.add_parser("replay", help="browse a recording on a timeline")
+    replay_parser.add_argument("recording", help="recording file written by 'record'")
+    replay_parser.add_argument("--at", metavar="TIME",
+                               help="start at this time: 'YYYY-MM-DD HH:MM[:SS]' or 'HH:MM[:SS]' "
+                                    "(the first such time after the recording starts)")
+
+    bench_parser = subparsers.add_parser("bench-collect",
+                                         help="compare sequential and sharded collection times")
+    bench_parser.add_argument("--workers", default="1,2,4,8", metavar="N,N,...",
+                              help="worker counts to try")
+    bench_parser.add_argument("--samples", type=int, default=5, help="timed samples per mode")
+
+    soak_parser = subparsers.add_parser("soak", help="run the dashboard offscreen at full speed and check for leaks")
+    soak_parser.add_argument("--ticks", type=int, default=20000, help="number of refreshes to drive")
+    soak_parser.add_argument("--processes", type=int, default=300, help="size of the synthetic process table")
+    soak_parser.add_argument("--churn", type=float, default=0.05,
+                             help="fraction of synthetic processes replaced per tick")
+    soak_parser.add_argument("--sample-every", type=int, default=500, metavar="N",
+                             help="record RSS and object counts every N ticks")
+    soak_parser.add_argument("--warmup", type=float, default=0.1,
+                             help="fraction of the run ignored before measuring growth")
+    soak_parser.add_argument("--max-rss-growth", type=float, default=32.0, metavar="MB")
+    soak_parser.add_argument("--max-object-growth", type=int, default=20000, metavar="N")
+    soak_parser.add_argument("--max-widget-growth", type=int, default=200, metavar="N")
+    return parser.parse_args(argv)
+
+def run_agent(args):
+    from agent import SnapshotAgent
+    exporter = None
+    if args.metrics:
+        from metrics import MetricsExporter
+        exporter = MetricsExporter(args.metrics, top_n=args.metrics_top)
+        print(f"[agent] serving metrics on http://{args.metrics}/metrics")
+    listen = None if args.listen == "none" else args.listen
+    agent = SnapshotAgent(
+        listen, interval=args.interval, keyframe_every=args.keyframe_every,
+        max_viewers=args.max_viewers, max_bytes_per_sec=args.max_kbps * 1024,
+        stats_interval=args.stats_interval, exporter=exporter,
+        sampler=open_source(None, args.workers)
+    )
+    if listen:
+        print(f"[agent] listening on {listen}")
+    try:
+        agent.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+def run_record(args):
+    from recording import SnapshotRecorder
+    source = open_source(args.connect, args.workers)
+    recorder = SnapshotRecorder(args.output, source.system_info(), keyframe_every=args.keyframe_every)
+    try:
+        for snapshot in iter_snapshots(source, args.interval, args.samples):
+            recorder.write(snapshot)
+    except KeyboardInterrupt:
+        pass
+    except ConnectionError as e:
+        print(f"Recording stopped: {e}")
+    finally:
+        recorder.close()
+        source.close()
+    print(f"Recorded {recorder.seq} snapshots to {args.output}")
+
+def run_export(args):
+    exporter = open_exporter(args.output, args.format)
+    source = None
+    try:
+        if args.input:
+            from recording import read_recording
+            snapshots = read_recording(args.input)
+        else:
+            source = open_source(args.connect, args.workers)
+            snapshots = iter_snapshots(source, args.interval, args.samples)
+        for snapshot in snapshots:
+            exporter.write(snapshot)
+    except KeyboardInterrupt:
+        pass
+    except ConnectionError as e:
+        print(f"Export stopped: {e}")
+    finally:
+        exporter.close()
+        if source is not None:
+            source.close()
+    print(f"Exported {exporter.rows_written} rows from {exporter.snapshots_written} snapshots to {args.output}")
+
+def run_fleet(args):
+    from fleet import FleetAggregator, SimulatedFleet
+    addresses = list(args.agents)
+    if args.agents_file:
+        with open(args.agents_file) as f:
+            addresses += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    simulation = None
+    if args.simulate:
+        simulation = SimulatedFleet(args.simulate)
+        addresses += simulation.start()
+    if not addresses:
+        print("No agents given; pass addresses, --agents-file or --simulate N")
+        return 1
+    
+    aggregator = FleetAggregator(addresses, top_n=args.top)
+    aggregator.start()
+    app = QApplication(sys.argv[:1])
+    window = FleetMonitor(aggregator, top_n=args.top)
+    window.show()
+    result = app.exec()
+    aggregator.stop()
+    if simulation is not None:
+        simulation.stop()
+    return result
+
+def parse_replay_time(value, start):
+    # Absolute ISO times are taken as is; a bare time of day means its first
+    # occurrence at or after the start of the recording
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        pass
+    clock = datetime.strptime(value, "%H:%M:%S" if value.count(":") == 2 else "%H:%M").time()
+    begin = datetime.fromtimestamp(start)
+    when = datetime.combine(begin.date(), clock)
+    if when < begin.replace(microsecond=0):
+        when += timedelta(days=1)
+    return when.timestamp()
+
+def run_replay(args):
+    from recording import ReplaySource
+    source = ReplaySource(args.recording)
+    if args.at:
+        recording = source.recording
+        source.start_index = recording.index_at(parse_replay_time(args.at, recording.timestamps[0]))
+    app = QApplication(sys.argv[:1])
+    window = ModernProcessMonitor(source)
+    window.setWindowTitle(f"Process Monitoring System - {os.path.basename(args.recording)}")
+    window.show()
+    result = app.exec()
+    source.close()
+    return result
+
+def run_soak(args):
+    from soak import run_soak as soak
+    passed = soak(args.ticks, args.processes, args.churn, args.sample_every, args.warmup,
+                  args.max_rss_growth, args.max_object_growth, args.max_widget_growth)
+    return 0 if passed else 1
 
 def main():
-    app = QApplication(sys.argv)
-    window = ModernProcessMonitor()
+    args = parse_args(sys.argv[1:])
+    if args.command == "soak":
+        sys.exit(run_soak(args))
+    if args.command == "bench-collect":
+        from parallel import benchmark
+        benchmark([int(count) for count in args.workers.split(",")], args.samples)
+        return
+    if args.command == "replay":
+        sys.exit(run_replay(args))
+    if args.command == "agent":
+        run_agent(args)
+        return
+    if args.command == "fleet":
+        sys.exit(run_fleet(args))
+    if args.command == "record":
+        run_record(args)
+        return
+    if args.command == "export":
+        run_export(args)
+        return
+
+    source = open_source(args.connect, args.workers, args.isolated)
+
+    app = QApplication(sys.argv[:1])
+    window = ModernProcessMonitor(source, instrumentation_log=args.instrument_log,
+                                  profile_dir=args.profile_dir, profile_ticks=args.profile_ticks)
+    window.install_signal_handlers()
+    if args.connect:
+        window.setWindowTitle(f"Process Monitoring System - {args.connect}")
     window.show()
     sys.exit(app.exec())
 
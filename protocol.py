@@ -0,0 +1,220 @@
+import json
+import struct
+
+import numpy as np
+
+from snapshot import Snapshot, empty_columns
+
+# Wire format
+#
+# Every frame starts with a fixed header followed by `length` payload bytes:
+#   magic "PM" | type u8 | pad | seq u32 | timestamp f64 | length u32
+#
+# A KEYFRAME carries the system totals and every process row. A DELTA carries
+# the system totals, the PIDs that exited, numeric updates for rows whose CPU,
+# memory or state changed and full rows for new (or renamed) processes. An
+# INFO frame carries the static system information as JSON and is sent once
+# on connect. All numbers are little-endian.
+MAGIC = b"PM"
+HEADER = struct.Struct("<2sBxIdI")
+SYSTEM = struct.Struct("<ffQQf")
+COUNT = struct.Struct("<I")
+
+KEYFRAME = 1
+DELTA = 2
+INFO = 3
+
+MAX_PAYLOAD = 64 * 1024 * 1024
+
+
+class ProtocolError(Exception):
+    pass
+
+
+def encode_frame(frame_type, seq, timestamp, payload):
+    return HEADER.pack(MAGIC, frame_type, seq & 0xFFFFFFFF, timestamp, len(payload)) + payload
+
+
+def decode_frame(buffer, offset=0):
+    # Returns (type, seq, timestamp, payload, next_offset), or None when the
+    # buffer does not yet hold a complete frame
+    if len(buffer) - offset < HEADER.size:
+        return None
+    magic, frame_type, seq, timestamp, length = HEADER.unpack_from(buffer, offset)
+    if magic != MAGIC or length > MAX_PAYLOAD:
+        raise ProtocolError("Corrupt frame header")
+    start = offset + HEADER.size
+    end = start + length
+    if len(buffer) < end:
+        return None
+    return frame_type, seq, timestamp, bytes(buffer[start:end]), end
+
+
+def _encode_strings(values):
+    encoded = [value.encode("utf-8", "replace")[:0xFFFF] for value in values]
+    lengths = np.fromiter((len(value) for value in encoded), dtype="<u2", count=len(encoded))
+    return lengths.tobytes() + b"".join(encoded)
+
+
+def _decode_strings(payload, offset, count):
+    lengths = np.frombuffer(payload, dtype="<u2", count=count, offset=offset)
+    offset += lengths.nbytes
+    values = np.empty(count, dtype=object)
+    for i, length in enumerate(lengths.tolist()):
+        values[i] = payload[offset:offset + length].decode("utf-8", "replace")
+        offset += length
+    return values, offset
+
+
+def _read_array(payload, offset, dtype, count):
+    array = np.frombuffer(payload, dtype=dtype, count=count, offset=offset)
+    return array, offset + array.nbytes
+
+
+def _encode_system(snapshot):
+    return SYSTEM.pack(snapshot.cpu_percent, snapshot.cpu_freq, snapshot.mem_used,
+                       snapshot.mem_total, snapshot.mem_percent)
+
+
+def _encode_rows(snapshot, idx):
+    return b"".join([
+        COUNT.pack(len(idx)),
+        snapshot.pids[idx].astype("<i4").tobytes(),
+        snapshot.cpu[idx].astype("<f4").tobytes(),
+        snapshot.mem[idx].astype("<f4").tobytes(),
+        snapshot.statuses[idx].tobytes(),
+        _encode_strings(snapshot.names[idx]),
+        _encode_strings(snapshot.users[idx]),
+    ])
+
+
+def _decode_rows(payload, offset):
+    (count,) = COUNT.unpack_from(payload, offset)
+    offset += COUNT.size
+    pids, offset = _read_array(payload, offset, "<i4", count)
+    cpu, offset = _read_array(payload, offset, "<f4", count)
+    mem, offset = _read_array(payload, offset, "<f4", count)
+    statuses, offset = _read_array(payload, offset, np.uint8, count)
+    names, offset = _decode_strings(payload, offset, count)
+    users, offset = _decode_strings(payload, offset, count)
+    columns = (pids.astype(np.int64), cpu.astype(np.float32), mem.astype(np.float32),
+               statuses.copy(), names, users)
+    return columns, offset
+
+
+def encode_keyframe(snapshot, seq):
+    payload = _encode_system(snapshot) + _encode_rows(snapshot, np.arange(len(snapshot)))
+    return encode_frame(KEYFRAME, seq, snapshot.timestamp, payload)
+
+
+def encode_delta(previous, current, seq):
+    # Both snapshots are PID-sorted, so matching rows line up via intersect1d
+    _, prev_idx, cur_idx = np.intersect1d(previous.pids, current.pids,
+                                          assume_unique=True, return_indices=True)
+    removed = previous.pids[~np.isin(previous.pids, current.pids, assume_unique=True)]
+    added = ~np.isin(current.pids, previous.pids, assume_unique=True)
+
+    renamed = ((previous.names[prev_idx] != current.names[cur_idx]) |
+               (previous.users[prev_idx] != current.users[cur_idx]))
+    changed = ((previous.cpu[prev_idx] != current.cpu[cur_idx]) |
+               (previous.mem[prev_idx] != current.mem[cur_idx]) |
+               (previous.statuses[prev_idx] != current.statuses[cur_idx])) & ~renamed
+
+    upserts = np.flatnonzero(added)
+    if renamed.any():
+        upserts = np.sort(np.concatenate([upserts, cur_idx[renamed]]))
+    updates = cur_idx[changed]
+
+    payload = b"".join([
+        _encode_system(current),
+        COUNT.pack(len(removed)),
+        removed.astype("<i4").tobytes(),
+        COUNT.pack(len(updates)),
+        current.pids[updates].astype("<i4").tobytes(),
+        current.cpu[updates].astype("<f4").tobytes(),
+        current.mem[updates].astype("<f4").tobytes(),
+        current.statuses[updates].tobytes(),
+        _encode_rows(current, upserts),
+    ])
+    return encode_frame(DELTA, seq, current.timestamp, payload)
+
+
+def encode_info(info, seq=0, timestamp=0.0):
+    return encode_frame(INFO, seq, timestamp, json.dumps(info).encode("utf-8"))
+
+
+def decode_info(payload):
+    return json.loads(payload.decode("utf-8"))
+
+
+def _decode_system(payload, timestamp, columns):
+    cpu_percent, cpu_freq, mem_used, mem_total, mem_percent = SYSTEM.unpack_from(payload, 0)
+    return Snapshot(timestamp, cpu_percent, cpu_freq, mem_used, mem_total, mem_percent, *columns)
+
+
+def decode_keyframe(payload, timestamp):
+    columns, _ = _decode_rows(payload, SYSTEM.size)
+    return _decode_system(payload, timestamp, columns)
+
+
+def apply_delta(snapshot, payload, timestamp):
+    offset = SYSTEM.size
+    (count,) = COUNT.unpack_from(payload, offset)
+    removed, offset = _read_array(payload, offset + COUNT.size, "<i4", count)
+    (count,) = COUNT.unpack_from(payload, offset)
+    offset += COUNT.size
+    update_pids, offset = _read_array(payload, offset, "<i4", count)
+    update_cpu, offset = _read_array(payload, offset, "<f4", count)
+    update_mem, offset = _read_array(payload, offset, "<f4", count)
+    update_status, offset = _read_array(payload, offset, np.uint8, count)
+    upserts, _ = _decode_rows(payload, offset)
+
+    if snapshot is None:
+        snapshot = Snapshot(timestamp, 0.0, 0.0, 0, 0, 0.0, *empty_columns())
+
+    # Drop exited and re-sent rows, then patch the numeric columns in place
+    drop = np.concatenate([removed.astype(np.int64), upserts[0]])
+    keep = ~np.isin(snapshot.pids, drop)
+    base = snapshot.take(keep)
+    if len(update_pids) and len(base.pids):
+        pos = np.minimum(np.searchsorted(base.pids, update_pids), len(base.pids) - 1)
+        valid = base.pids[pos] == update_pids
+        base.cpu[pos[valid]] = update_cpu[valid]
+        base.mem[pos[valid]] = update_mem[valid]
+        base.statuses[pos[valid]] = update_status[valid]
+
+    columns = [np.concatenate([old, new]) for old, new in
+               zip((base.pids, base.cpu, base.mem, base.statuses, base.names, base.users), upserts)]
+    merged = _decode_system(payload, timestamp, columns)
+    if len(upserts[0]):
+        merged = merged.take(np.argsort(merged.pids, kind='stable'))
+    return merged
+
+
+class SnapshotDecoder:
+    # Rebuilds snapshots from a stream of frames, resynchronising on the
+    # next keyframe whenever a delta arrives out of sequence
+    def __init__(self):
+        self.snapshot = None
+        self.system_info = None
+        self.last_seq = None
+        self.frames = 0
+        self.bytes = 0
+
+    def feed(self, frame_type, seq, timestamp, payload):
+        # Returns the updated snapshot, or None when nothing new is visible
+        self.frames += 1
+        self.bytes += HEADER.size + len(payload)
+        if frame_type == INFO:
+            self.system_info = decode_info(payload)
+            return None
+        if frame_type == KEYFRAME:
+            self.snapshot = decode_keyframe(payload, timestamp)
+        elif frame_type == DELTA:
+            if self.snapshot is None or seq != (self.last_seq + 1) & 0xFFFFFFFF:
+                return None
+            self.snapshot = apply_delta(self.snapshot, payload, timestamp)
+        else:
+            return None
+        self.last_seq = seq
+        return self.snapshot
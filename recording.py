@@ -0,0 +1,158 @@
+import mmap
+import os
+
+import numpy as np
+
+from protocol import (SnapshotDecoder, ProtocolError, decode_frame, decode_info, decode_keyframe,
+                      apply_delta, encode_delta, encode_info, encode_keyframe, HEADER, SYSTEM,
+                      MAGIC, MAX_PAYLOAD, KEYFRAME, DELTA, INFO)
+
+# A recording is simply the agent's frame stream written to a file: an INFO
+# frame, then a keyframe followed by deltas, with a fresh keyframe every
+# `keyframe_every` samples.
+READ_CHUNK = 1024 * 1024
+
+
+class SnapshotRecorder:
+    def __init__(self, path, system_info=None, keyframe_every=60):
+        self.path = path
+        self.keyframe_every = keyframe_every
+        self.file = open(path, "wb", buffering=READ_CHUNK)
+        self.previous = None
+        self.seq = 0
+        self.since_keyframe = 0
+        if system_info is not None:
+            self.file.write(encode_info(system_info))
+
+    def write(self, snapshot):
+        self.seq += 1
+        if self.previous is None or self.since_keyframe >= self.keyframe_every:
+            frame = encode_keyframe(snapshot, self.seq)
+            self.since_keyframe = 0
+        else:
+            frame = encode_delta(self.previous, snapshot, self.seq)
+            self.since_keyframe += 1
+        self.file.write(frame)
+        self.previous = snapshot.keep()
+
+    def close(self):
+        self.file.close()
+
+
+def read_recording(path):
+    # Yields the snapshots of a recording in order, reading it in fixed-size
+    # chunks so memory use does not depend on the recording length
+    decoder = SnapshotDecoder()
+    buffer = bytearray()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(READ_CHUNK)
+            if not chunk:
+                break
+            buffer += chunk
+            offset = 0
+            while True:
+                frame = decode_frame(buffer, offset)
+                if frame is None:
+                    break
+                frame_type, seq, timestamp, payload, offset = frame
+                snapshot = decoder.feed(frame_type, seq, timestamp, payload)
+                if snapshot is not None:
+                    yield snapshot
+            del buffer[:offset]
+
+
+class RecordingIndex:
+    # Random access into a recording for replay. Opening it walks the frame
+    # headers of the memory-mapped file once (payloads are skipped) and keeps
+    # each snapshot's offset, timestamp and system totals. Seeking decodes the
+    # nearest keyframe at or before the target and applies the deltas after
+    # it, so the cost is bounded by the keyframe interval, not the file size.
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        size = os.fstat(self.file.fileno()).st_size
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self.system_info = None
+        offsets, timestamps, types, cpu, mem = [], [], [], [], []
+        offset = 0
+        while offset + HEADER.size <= len(self.data):
+            magic, frame_type, seq, timestamp, length = HEADER.unpack_from(self.data, offset)
+            if magic != MAGIC or length > MAX_PAYLOAD:
+                raise ProtocolError("Corrupt frame header")
+            start = offset + HEADER.size
+            end = start + length
+            if end > len(self.data):
+                # Truncated tail, e.g. the recorder was killed mid-write
+                break
+            if frame_type == INFO:
+                self.system_info = decode_info(bytes(self.data[start:end]))
+            elif frame_type == KEYFRAME or (frame_type == DELTA and offsets):
+                cpu_percent, _, _, _, mem_percent = SYSTEM.unpack_from(self.data, start)
+                offsets.append(offset)
+                timestamps.append(timestamp)
+                types.append(frame_type)
+                cpu.append(cpu_percent)
+                mem.append(mem_percent)
+            offset = end
+
+        self.offsets = np.array(offsets, dtype=np.int64)
+        self.timestamps = np.array(timestamps, dtype=np.float64)
+        self.cpu = np.array(cpu, dtype=np.float32)
+        self.mem = np.array(mem, dtype=np.float32)
+        self.keyframes = np.flatnonzero(np.array(types, dtype=np.uint8) == KEYFRAME)
+        self.position = None
+        self.snapshot = None
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def _payload(self, index):
+        offset = int(self.offsets[index])
+        length = HEADER.unpack_from(self.data, offset)[4]
+        start = offset + HEADER.size
+        return bytes(self.data[start:start + length])
+
+    def index_at(self, timestamp):
+        # Last snapshot taken at or before `timestamp`
+        return max(int(np.searchsorted(self.timestamps, timestamp, side="right")) - 1, 0)
+
+    def snapshot_at(self, index):
+        keyframe = int(self.keyframes[np.searchsorted(self.keyframes, index, side="right") - 1])
+        if self.position is not None and keyframe <= self.position <= index:
+            # Scrubbing forward within a keyframe interval continues from
+            # the current snapshot instead of starting over
+            position, snapshot = self.position, self.snapshot
+        else:
+            position = keyframe
+            snapshot = decode_keyframe(self._payload(keyframe), self.timestamps[keyframe])
+        for i in range(position + 1, index + 1):
+            snapshot = apply_delta(snapshot, self._payload(i), self.timestamps[i])
+        self.position, self.snapshot = index, snapshot
+        return snapshot
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.file.close()
+
+
+class ReplaySource:
+    # Snapshot source for the dashboard's replay mode. Nothing arrives on its
+    # own: the timeline drives `recording.snapshot_at()` directly.
+    remote = True
+
+    def __init__(self, path):
+        self.recording = RecordingIndex(path)
+        if not len(self.recording):
+            self.recording.close()
+            raise ValueError(f"No snapshots in recording: {path}")
+        self.start_index = 0
+
+    def poll(self):
+        return None
+
+    def system_info(self):
+        return self.recording.system_info or {}
+
+    def close(self):
+        self.recording.close()
@@ -0,0 +1,288 @@
+import multiprocessing
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+import psutil
+
+from snapshot import LocalSampler, Snapshot, cached_system_info
+
+# Collector-to-GUI hand-off through one shared memory segment, for running
+# collection in a separate process. The segment holds a few control words, two
+# snapshot buffers and an append-only string table:
+#
+#   control  int64[8]   magic, capacity, latest buffer, reader-held seq,
+#                       string count, string bytes used, string epoch
+#   buffer×2 int64[5]   seq, row count, mem used, mem total, string epoch
+#            float64[4] timestamp, cpu %, cpu MHz, mem %
+#            pids int64, cpu float32, mem float32, status uint8,
+#            name code uint32, user code uint32   (capacity rows each)
+#   strings  uint32 offsets, utf-8 blob
+#
+# Handshake: a buffer's seq is odd while it is being written and even once
+# complete. The writer always writes the buffer that is *not* the latest one
+# and skips a frame rather than touch the buffer whose seq the reader has
+# marked as held, so the reader can keep using NumPy views into a buffer
+# until it acquires the next frame. Names and users are dictionary codes into
+# the string table, which the reader decodes only when new strings appear.
+#
+# The handshake is plain loads and stores on shared memory with no fences, so
+# it relies on the stores of one process becoming visible to the other in
+# program order (x86 / TSO). On weakly ordered CPUs (ARM, POWER) the writer
+# can miss the reader's HELD store and rewrite a buffer being read. poll()
+# re-checks the buffer's seq and string epoch after decoding the name and user
+# columns and drops the frame if either moved, but the numeric views it hands
+# out are only protected by the handshake.
+MAGIC = 0x504D5348
+CAPACITY = 131072
+MAX_STRINGS = 65536
+STRING_BYTES = 4 * 1024 * 1024
+
+CTRL_MAGIC, CTRL_CAPACITY, CTRL_LATEST, CTRL_HELD, CTRL_STRINGS, CTRL_STRING_BYTES, CTRL_EPOCH = range(7)
+CTRL_WORDS = 8
+SEQ, COUNT, MEM_USED, MEM_TOTAL, EPOCH = range(5)
+INT_WORDS = 5
+TIMESTAMP, CPU_PERCENT, CPU_FREQ, MEM_PERCENT = range(4)
+
+COLUMNS = [("pids", np.int64), ("cpu", np.float32), ("mem", np.float32),
+           ("statuses", np.uint8), ("names", np.uint32), ("users", np.uint32)]
+
+
+def segment_size(capacity):
+    def aligned(nbytes):
+        return (nbytes + 7) & ~7
+    buffer = aligned(8 * INT_WORDS) + 32 + sum(aligned(np.dtype(dtype).itemsize * capacity)
+                                               for _, dtype in COLUMNS)
+    return (CTRL_WORDS * 8 + 2 * buffer + aligned(4 * (MAX_STRINGS + 1)) + STRING_BYTES)
+
+
+class SharedSnapshots:
+    # NumPy views over the shared segment; `create` allocates and initialises
+    # it, otherwise an existing segment is attached by name
+    def __init__(self, name=None, capacity=CAPACITY, create=False):
+        self.shm = shared_memory.SharedMemory(name=name, create=create,
+                                              size=segment_size(capacity) if create else 0)
+        self.name = self.shm.name
+        self.offset = 0
+        self.ctrl = self._view(np.int64, CTRL_WORDS)
+        if create:
+            self.ctrl[:] = 0
+            self.ctrl[CTRL_MAGIC] = MAGIC
+            self.ctrl[CTRL_CAPACITY] = capacity
+            self.ctrl[CTRL_LATEST] = -1
+        elif self.ctrl[CTRL_MAGIC] != MAGIC:
+            raise ValueError(f"Not a snapshot segment: {name}")
+        self.capacity = capacity = int(self.ctrl[CTRL_CAPACITY])
+        self.buffers = []
+        for _ in range(2):
+            buffer = {"ints": self._view(np.int64, INT_WORDS), "floats": self._view(np.float64, 4)}
+            for column, dtype in COLUMNS:
+                buffer[column] = self._view(dtype, capacity)
+            self.buffers.append(buffer)
+        self.string_offsets = self._view(np.uint32, MAX_STRINGS + 1)
+        self.string_blob = self._view(np.uint8, STRING_BYTES)
+
+    def _view(self, dtype, count):
+        array = np.ndarray((count,), dtype=dtype, buffer=self.shm.buf, offset=self.offset)
+        self.offset += (array.nbytes + 7) & ~7
+        return array
+
+    def close(self, unlink=False):
+        self.ctrl = self.buffers = self.string_offsets = self.string_blob = None
+        try:
+            self.shm.close()
+        except BufferError:
+            # Snapshots handed out as views are still alive; the mapping goes
+            # away with the process
+            pass
+        if unlink:
+            self.shm.unlink()
+
+
+class SharedSnapshotWriter:
+    def __init__(self, segment):
+        self.segment = segment
+        self.codes = {}
+        self.seq = 0
+        self.skipped = 0
+
+    def _reset_strings(self):
+        ctrl = self.segment.ctrl
+        self.codes = {}
+        ctrl[CTRL_EPOCH] += 1
+        ctrl[CTRL_STRINGS] = 0
+        ctrl[CTRL_STRING_BYTES] = 0
+
+    def _encode(self, values):
+        # Dictionary codes for a string column; new strings are appended to
+        # the shared table before the frame that uses them is published
+        ctrl = self.segment.ctrl
+        codes = np.empty(len(values), dtype=np.uint32)
+        for i, value in enumerate(values):
+            code = self.codes.get(value)
+            if code is None:
+                encoded = value.encode("utf-8", "replace")
+                count, used = int(ctrl[CTRL_STRINGS]), int(ctrl[CTRL_STRING_BYTES])
+                if count >= MAX_STRINGS or used + len(encoded) > STRING_BYTES:
+                    return None
+                self.segment.string_blob[used:used + len(encoded)] = np.frombuffer(encoded, dtype=np.uint8)
+                self.segment.string_offsets[count + 1] = used + len(encoded)
+                ctrl[CTRL_STRING_BYTES] = used + len(encoded)
+                ctrl[CTRL_STRINGS] = count + 1
+                code = self.codes[value] = count
+            codes[i] = code
+        return codes
+
+    def write(self, snapshot):
+        # Returns False when the frame was skipped because the reader still
+        # holds the only buffer that may be written
+        segment = self.segment
+        ctrl = segment.ctrl
+        latest = int(ctrl[CTRL_LATEST])
+        target = 0 if latest < 0 else 1 - latest
+        buffer = segment.buffers[target]
+        previous = int(buffer["ints"][SEQ])
+        if previous and ctrl[CTRL_HELD] == previous:
+            self.skipped += 1
+            return False
+
+        count = min(len(snapshot), segment.capacity)
+        names = self._encode(snapshot.names[:count])
+        users = self._encode(snapshot.users[:count]) if names is not None else None
+        if names is None or users is None:
+            # String table full (long-running host with many distinct names)
+            self._reset_strings()
+            names = self._encode(snapshot.names[:count])
+            users = self._encode(snapshot.users[:count])
+
+        self.seq += 1
+        buffer["ints"][SEQ] = 2 * self.seq - 1
+        if ctrl[CTRL_HELD] == previous and previous:
+            buffer["ints"][SEQ] = previous
+            self.skipped += 1
+            return False
+        buffer["pids"][:count] = snapshot.pids[:count]
+        buffer["cpu"][:count] = snapshot.cpu[:count]
+        buffer["mem"][:count] = snapshot.mem[:count]
+        buffer["statuses"][:count] = snapshot.statuses[:count]
+        buffer["names"][:count] = names
+        buffer["users"][:count] = users
+        buffer["ints"][COUNT] = count
+        buffer["ints"][MEM_USED] = snapshot.mem_used
+        buffer["ints"][MEM_TOTAL] = snapshot.mem_total
+        buffer["ints"][EPOCH] = ctrl[CTRL_EPOCH]
+        buffer["floats"][:] = (snapshot.timestamp, snapshot.cpu_percent, snapshot.cpu_freq,
+                               snapshot.mem_percent)
+        buffer["ints"][SEQ] = 2 * self.seq
+        ctrl[CTRL_LATEST] = target
+        return True
+
+
+def run_collector(name, interval, workers, stop):
+    # Body of the collector process
+    segment = SharedSnapshots(name)
+    writer = SharedSnapshotWriter(segment)
+    if workers > 1:
+        from parallel import ShardedSampler
+        sampler = ShardedSampler(workers)
+    else:
+        sampler = LocalSampler()
+    try:
+        deadline = time.monotonic()
+        while not stop.is_set():
+            writer.write(sampler.poll())
+            deadline += interval
+            stop.wait(max(deadline - time.monotonic(), 0))
+    finally:
+        sampler.close()
+        segment.close()
+
+
+class SharedMemorySource:
+    # Local snapshot source fed by a collector process. poll() returns a
+    # Snapshot whose numeric columns are read-only views into shared memory;
+    # only the name and user columns are gathered from the decoded string
+    # table. The snapshot is marked borrowed: it stays valid until the next
+    # poll() returns a new one, after which the collector may overwrite it.
+    remote = False
+
+    def __init__(self, interval=1.0, capacity=CAPACITY, workers=0):
+        self.segment = SharedSnapshots(capacity=capacity, create=True)
+        context = multiprocessing.get_context("fork" if psutil.LINUX else "spawn")
+        self.stop_event = context.Event()
+        self.process = context.Process(target=run_collector, name="collector", daemon=True,
+                                       args=(self.segment.name, interval, workers, self.stop_event))
+        self.process.start()
+        self.last_seq = 0
+        self.strings = []
+        self.string_table = np.empty(0, dtype=object)
+        self.epoch = 0
+
+    def _sync_strings(self):
+        ctrl = self.segment.ctrl
+        epoch = int(ctrl[CTRL_EPOCH])
+        if epoch != self.epoch:
+            self.epoch = epoch
+            self.strings = []
+        count = int(ctrl[CTRL_STRINGS])
+        if count == len(self.strings):
+            return
+        offsets = self.segment.string_offsets
+        blob = self.segment.string_blob
+        for i in range(len(self.strings), count):
+            self.strings.append(bytes(blob[offsets[i]:offsets[i + 1]]).decode("utf-8", "replace"))
+        self.string_table = np.empty(len(self.strings), dtype=object)
+        self.string_table[:] = self.strings
+
+    def poll(self):
+        ctrl = self.segment.ctrl
+        latest = int(ctrl[CTRL_LATEST])
+        if latest < 0:
+            return None
+        buffer = self.segment.buffers[latest]
+        seq = int(buffer["ints"][SEQ])
+        if seq == self.last_seq or seq % 2:
+            return None
+        # Claim the buffer, then make sure it was not rewritten meanwhile
+        ctrl[CTRL_HELD] = seq
+        if int(buffer["ints"][SEQ]) != seq:
+            return None
+        self.last_seq = seq
+        self._sync_strings()
+
+        if int(buffer["ints"][EPOCH]) != self.epoch:
+            # Codes from before a string table reset; the next frame uses the
+            # new table
+            return None
+
+        count = int(buffer["ints"][COUNT])
+        columns = {}
+        for column in ("pids", "cpu", "mem", "statuses"):
+            view = buffer[column][:count]
+            view.flags.writeable = False
+            columns[column] = view
+        timestamp, cpu_percent, cpu_freq, mem_percent = buffer["floats"].tolist()
+        try:
+            names = self.string_table[buffer["names"][:count]]
+            users = self.string_table[buffer["users"][:count]]
+        except IndexError:
+            names = users = None
+        if names is None or int(buffer["ints"][SEQ]) != seq or int(ctrl[CTRL_EPOCH]) != self.epoch:
+            # Rewritten or the string table reset while decoding: drop the
+            # frame. A changed epoch also makes the next poll resync strings.
+            return None
+        snapshot = Snapshot(timestamp, cpu_percent, cpu_freq, int(buffer["ints"][MEM_USED]),
+                            int(buffer["ints"][MEM_TOTAL]), mem_percent, columns["pids"],
+                            columns["cpu"], columns["mem"], columns["statuses"], names, users)
+        snapshot.borrowed = True
+        return snapshot
+
+    def system_info(self):
+        return cached_system_info()
+
+    def close(self):
+        self.stop_event.set()
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.segment.close(unlink=True)
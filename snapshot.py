@@ -0,0 +1,332 @@
+import json
+import os
+import platform
+import time
+
+import numpy as np
+import psutil
+
+# Attributes requested from psutil for every process on each sample
+PROC_ATTRS = ['pid', 'name', 'username', 'cpu_percent', 'memory_percent', 'status']
+
+# Per-process fields that are only collected while a view asks for them:
+# key -> (header, psutil attributes, dtype, extractor). Several of these cost
+# an extra /proc read per process (cmdline, io, fd and context switch counts),
+# so the attribute list for a sample is derived from the columns in use.
+OPTIONAL_COLUMNS = {
+    key: column for key, column in {
+        "threads": ("Threads", ["num_threads"], np.int32,
+                    lambda info: info.get("num_threads") or 0),
+        "fds": ("FDs", ["num_fds"], np.int32, lambda info: info.get("num_fds") or 0),
+        "cmdline": ("Command Line", ["cmdline"], object,
+                    lambda info: " ".join(info.get("cmdline") or ())),
+        "started": ("Started", ["create_time"], np.float64,
+                    lambda info: info.get("create_time") or 0.0),
+        "io_read": ("Disk Read", ["io_counters"], np.int64,
+                    lambda info: getattr(info.get("io_counters"), "read_bytes", 0)),
+        "io_write": ("Disk Write", ["io_counters"], np.int64,
+                     lambda info: getattr(info.get("io_counters"), "write_bytes", 0)),
+        "ctx_switches": ("Ctx Switches", ["num_ctx_switches"], np.int64,
+                         lambda info: sum(info.get("num_ctx_switches") or ())),
+    }.items()
+    # Not every platform has every counter (no fds on Windows, no I/O on macOS)
+    if all(hasattr(psutil.Process, attr) for attr in column[1])
+}
+
+
+def process_attrs(columns=(), users=True):
+    # psutil attributes needed for the base columns plus the given optional
+    # ones. Usernames can be left out: they cost a lookup per process and an
+    # empty string is stored instead.
+    attrs = [attr for attr in PROC_ATTRS if users or attr != "username"]
+    for key in columns:
+        attrs += [attr for attr in OPTIONAL_COLUMNS[key][1] if attr not in attrs]
+    return attrs
+
+# Process states are shipped as small integer codes instead of strings.
+# These are the values of psutil's STATUS_* constants across all platforms.
+STATUSES = [
+    "running", "sleeping", "disk-sleep", "stopped", "tracing-stop", "zombie",
+    "dead", "wake-kill", "waking", "idle", "locked", "waiting", "suspended",
+    "parked", "?"
+]
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+UNKNOWN_STATUS = len(STATUSES) - 1
+
+
+class Snapshot:
+    # One sample of the whole system, stored column-wise and sorted by PID
+    # so that diffs and merges are plain NumPy set operations. `extra` holds
+    # whichever OPTIONAL_COLUMNS were collected for this sample.
+    #
+    # A `borrowed` snapshot's columns are views into a buffer its source
+    # reuses (SharedMemorySource): it is only valid until the source's next
+    # poll(). Anything that holds a snapshot longer must hold keep() instead.
+    def __init__(self, timestamp, cpu_percent, cpu_freq, mem_used, mem_total, mem_percent,
+                 pids, cpu, mem, statuses, names, users, extra=None):
+        self.timestamp = timestamp
+        self.cpu_percent = cpu_percent
+        self.cpu_freq = cpu_freq
+        self.mem_used = mem_used
+        self.mem_total = mem_total
+        self.mem_percent = mem_percent
+        self.pids = pids
+        self.cpu = cpu
+        self.mem = mem
+        self.statuses = statuses
+        self.names = names
+        self.users = users
+        self.extra = extra or {}
+        self.borrowed = False
+
+    def __len__(self):
+        return len(self.pids)
+
+    def keep(self):
+        # This snapshot, with its columns copied out if they are borrowed
+        if not self.borrowed:
+            return self
+        return Snapshot(self.timestamp, self.cpu_percent, self.cpu_freq, self.mem_used,
+                        self.mem_total, self.mem_percent, self.pids.copy(), self.cpu.copy(),
+                        self.mem.copy(), self.statuses.copy(), self.names, self.users,
+                        {key: column.copy() for key, column in self.extra.items()})
+
+    def take(self, idx):
+        # Row subset sharing the system totals of this snapshot
+        return Snapshot(self.timestamp, self.cpu_percent, self.cpu_freq, self.mem_used,
+                        self.mem_total, self.mem_percent, self.pids[idx], self.cpu[idx],
+                        self.mem[idx], self.statuses[idx], self.names[idx], self.users[idx],
+                        {key: column[idx] for key, column in self.extra.items()})
+
+    def top(self, n):
+        # Indices of the n busiest processes, busiest first
+        if len(self.pids) > n:
+            idx = np.argpartition(-self.cpu, n - 1)[:n]
+        else:
+            idx = np.arange(len(self.pids))
+        return idx[np.argsort(-self.cpu[idx], kind='stable')]
+
+    def status(self, i):
+        return STATUSES[self.statuses[i]]
+
+
+def empty_columns():
+    return (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32),
+            np.empty(0, dtype=np.float32), np.empty(0, dtype=np.uint8),
+            np.empty(0, dtype=object), np.empty(0, dtype=object))
+
+
+def build_snapshot(timestamp, cpu_percent, cpu_freq, mem_used, mem_total, mem_percent, rows,
+                   columns=()):
+    # rows: iterable of proc.info dictionaries as returned by process_iter,
+    # including the attributes of the optional `columns`
+    rows = list(rows)
+    pids, cpu, mem, statuses, names, users = [], [], [], [], [], []
+    for info in rows:
+        pids.append(info['pid'])
+        cpu.append(info.get('cpu_percent') or 0.0)
+        mem.append(info.get('memory_percent') or 0.0)
+        statuses.append(STATUS_CODES.get(info.get('status'), UNKNOWN_STATUS))
+        names.append(info.get('name') or "")
+        users.append(info.get('username') or "")
+
+    pids = np.array(pids, dtype=np.int64)
+    names_col = np.empty(len(names), dtype=object)
+    names_col[:] = names
+    users_col = np.empty(len(users), dtype=object)
+    users_col[:] = users
+    extra = {}
+    for key in columns:
+        _, _, dtype, extract = OPTIONAL_COLUMNS[key]
+        values = [extract(info) for info in rows]
+        if dtype is object:
+            extra[key] = np.empty(len(values), dtype=object)
+            extra[key][:] = values
+        else:
+            extra[key] = np.array(values, dtype=dtype)
+    snapshot = Snapshot(
+        timestamp, float(cpu_percent), float(cpu_freq), int(mem_used), int(mem_total),
+        float(mem_percent), pids, np.array(cpu, dtype=np.float32),
+        # Memory share is rounded so that noise below display precision never
+        # shows up as a change between samples
+        np.round(np.array(mem, dtype=np.float32), 2), np.array(statuses, dtype=np.uint8),
+        names_col, users_col, extra
+    )
+    if len(pids) > 1 and np.any(pids[1:] < pids[:-1]):
+        snapshot = snapshot.take(np.argsort(pids, kind='stable'))
+    return snapshot
+
+
+def collect_snapshot(attrs=PROC_ATTRS, columns=(), users=True):
+    if columns or not users:
+        attrs = process_attrs(columns, users)
+    cpu_percent = psutil.cpu_percent(interval=None)
+    cpu_freq = psutil.cpu_freq()
+    memory = psutil.virtual_memory()
+
+    rows = []
+    for proc in psutil.process_iter(attrs):
+        try:
+            rows.append(proc.info)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+
+    return build_snapshot(time.time(), cpu_percent, cpu_freq.current if cpu_freq else 0.0,
+                          memory.used, memory.total, memory.percent, rows, columns)
+
+
+# Keys of the static host details shown in the dashboard's side panel
+SYSTEM_INFO_KEYS = ["OS", "Processor", "Cores", "Memory"]
+
+
+def get_system_info():
+    info = {
+        "OS": f"{platform.system()} {platform.version()}",
+        "Processor": platform.processor(),
+        "Cores": f"{psutil.cpu_count()} | Threads: {psutil.cpu_count(logical=True)}",
+        "Memory": f"{round(psutil.virtual_memory().total / (1024**3), 2)} GB"
+    }
+    return info
+
+
+def system_info_cache_path():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "process-monitor", "system-info.json")
+
+
+def cached_system_info(path=None):
+    # get_system_info() can be slow (platform.processor() may spawn uname), so
+    # the result is kept on disk between runs. The cache is keyed by host name
+    # and boot time, so a reboot (new kernel, changed hardware) refreshes it.
+    path = path or system_info_cache_path()
+    key = [platform.node(), round(psutil.boot_time())]
+    try:
+        with open(path, encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached["key"] == key:
+            return cached["info"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    info = get_system_info()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"key": key, "info": info}, f)
+        os.replace(temp_path, path)
+    except OSError:
+        pass
+    return info
+
+
+class SyntheticSampler:
+    # Deterministic fake host for simulations and soak runs: a fixed-size
+    # process population whose CPU and memory follow a random walk, with a
+    # few processes exiting and being replaced on every sample
+    remote = True
+    NAMES = ["python", "gunicorn", "postgres", "nginx", "java", "node", "chrome",
+             "redis-server", "make", "cc1plus", "bash", "sshd", "systemd", "dockerd"]
+    USERS = ["root", "www-data", "postgres", "build", "ci"]
+
+    def __init__(self, processes=300, seed=0, churn=0.01, hostname="synthetic"):
+        self.rng = np.random.default_rng(seed)
+        self.churn = churn
+        self.hostname = hostname
+        self.next_pid = 1000
+        self.pids = self._new_pids(processes)
+        # Each process wanders around its own baseline
+        self.base_cpu = self.rng.gamma(0.5, 0.8, processes)
+        self.base_mem = self.rng.gamma(1.0, 0.1, processes)
+        self.cpu = self.base_cpu.copy()
+        self.mem = self.base_mem.copy()
+        self.names = np.array(self.rng.choice(self.NAMES, processes), dtype=object)
+        self.users = np.array(self.rng.choice(self.USERS, processes), dtype=object)
+        self.mem_total = 64 * 1024**3
+
+    def _new_pids(self, count):
+        pids = np.arange(self.next_pid, self.next_pid + count, dtype=np.int64)
+        self.next_pid += count
+        return pids
+
+    def poll(self):
+        n = len(self.pids)
+        noise = self.rng.normal(0, 1, n)
+        self.cpu = np.clip(0.8 * self.cpu + 0.2 * self.base_cpu + noise * (0.3 * self.base_cpu + 0.05), 0, 100)
+        self.mem = np.clip(0.95 * self.mem + 0.05 * self.base_mem + self.rng.normal(0, 0.002, n), 0, 100)
+
+        # Replace a few processes with new PIDs
+        replaced = np.flatnonzero(self.rng.random(n) < self.churn)
+        if len(replaced):
+            self.pids[replaced] = self._new_pids(len(replaced))
+            self.cpu[replaced] = 0.0
+            self.names[replaced] = self.rng.choice(self.NAMES, len(replaced))
+        order = np.argsort(self.pids, kind='stable')
+        self.pids, self.cpu, self.mem = self.pids[order], self.cpu[order], self.mem[order]
+        self.base_cpu, self.base_mem = self.base_cpu[order], self.base_mem[order]
+        self.names, self.users = self.names[order], self.users[order]
+
+        cpu_percent = float(min(self.cpu.sum() / 8, 100.0))
+        mem_percent = float(min(self.mem.sum(), 100.0))
+        return Snapshot(
+            time.time(), round(cpu_percent, 1), 2400.0,
+            int(self.mem_total * mem_percent / 100), self.mem_total, round(mem_percent, 1),
+            self.pids.copy(), np.round(self.cpu, 1).astype(np.float32),
+            np.round(self.mem, 2).astype(np.float32),
+            np.full(n, STATUS_CODES["sleeping"], dtype=np.uint8),
+            self.names.copy(), self.users.copy()
+        )
+
+    def system_info(self):
+        return {
+            "OS": f"Synthetic ({self.hostname})",
+            "Processor": "simulated",
+            "Cores": "8 | Threads: 8",
+            "Memory": f"{round(self.mem_total / (1024**3), 2)} GB"
+        }
+
+    def close(self):
+        pass
+
+
+class LocalSampler:
+    # Snapshot source that samples the local host directly
+    remote = False
+
+    def __init__(self, columns=(), users=True):
+        self.columns = list(columns)
+        self.users = users
+
+    def set_columns(self, columns):
+        # Optional columns to collect from the next sample on; usernames are
+        # only collected while "user" is among them
+        self.columns = [key for key in columns if key in OPTIONAL_COLUMNS]
+        self.users = "user" in columns
+
+    def poll(self):
+        return collect_snapshot(columns=self.columns, users=self.users)
+
+    def system_info(self):
+        return cached_system_info()
+
+    def close(self):
+        pass
+
+
+def iter_snapshots(source, interval=1.0, samples=0):
+    # Yields snapshots from a source every `interval` seconds, forever or
+    # until `samples` have been produced. Raises ConnectionError when a
+    # remote source loses its connection.
+    count = 0
+    deadline = time.monotonic()
+    while not samples or count < samples:
+        snapshot = source.poll()
+        if snapshot is None:
+            if not getattr(source, "connected", True):
+                raise ConnectionError("source disconnected")
+            time.sleep(0.05)
+            continue
+        yield snapshot
+        count += 1
+        deadline += interval
+        time.sleep(max(deadline - time.monotonic(), 0))
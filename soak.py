@@ -0,0 +1,68 @@
+import gc
+import os
+import time
+
+import numpy as np
+import psutil
+
+from snapshot import SyntheticSampler
+
+
+def growth(ticks, values):
+    # Least-squares trend over the run, so one-off spikes (allocator arenas,
+    # caches filling up) do not count as a leak the way first-vs-last would
+    if len(ticks) < 2:
+        return 0.0
+    slope = np.polyfit(np.asarray(ticks, dtype=np.float64), np.asarray(values, dtype=np.float64), 1)[0]
+    return float(slope * (ticks[-1] - ticks[0]))
+
+
+def run_soak(ticks=20000, processes=300, churn=0.05, sample_every=500, warmup=0.1,
+             max_rss_growth=32.0, max_object_growth=20000, max_widget_growth=200):
+    # Drives the dashboard as fast as it will refresh from a synthetic source
+    # on an offscreen Qt platform and samples RSS, live Python objects and Qt
+    # widgets. Growth is measured after the warm-up fraction of the run.
+    # Returns True if every metric stays within its threshold.
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication
+    from process_monitor import ModernProcessMonitor
+
+    app = QApplication.instance() or QApplication([])
+    window = ModernProcessMonitor(SyntheticSampler(processes=processes, churn=churn))
+    window.show()
+    while window.first_snapshot_pending:
+        app.processEvents()
+        time.sleep(0.01)
+    window.timer.stop()
+    window.update_interval = 0
+    process = psutil.Process()
+
+    samples = []
+    start = time.monotonic()
+    print(f"{'tick':>8} {'rss MB':>9} {'objects':>9} {'widgets':>8} {'ticks/s':>8}")
+    for tick in range(1, ticks + 1):
+        window.update_data()
+        app.processEvents()
+        if tick % sample_every and tick != ticks:
+            continue
+        gc.collect()
+        sample = (tick, process.memory_info().rss / (1024**2), len(gc.get_objects()),
+                  len(app.allWidgets()))
+        samples.append(sample)
+        rate = tick / max(time.monotonic() - start, 1e-9)
+        print(f"{sample[0]:>8} {sample[1]:>9.1f} {sample[2]:>9} {sample[3]:>8} {rate:>8.1f}")
+
+    window.close()
+    steady = [sample for sample in samples if sample[0] > ticks * warmup]
+    tick_column = [sample[0] for sample in steady]
+    results = [
+        ("RSS (MB)", growth(tick_column, [sample[1] for sample in steady]), max_rss_growth),
+        ("Python objects", growth(tick_column, [sample[2] for sample in steady]), max_object_growth),
+        ("Qt widgets", growth(tick_column, [sample[3] for sample in steady]), max_widget_growth),
+    ]
+    passed = True
+    for label, value, limit in results:
+        ok = value <= limit
+        passed = passed and ok
+        print(f"{label:<15} growth {value:+.1f} (limit {limit}) {'ok' if ok else 'FAIL'}")
+    return passed
@@ -0,0 +1,66 @@
+import os
+import time
+
+import numpy as np
+import psutil
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def read_thread_times(pid):
+    # Returns (tids, names, states, cpu seconds) for every thread of `pid`,
+    # sorted by TID. On Linux this reads /proc/<pid>/task/*/stat directly,
+    # which is far cheaper than building a psutil object per thread.
+    if psutil.LINUX:
+        tids, names, states, ticks = [], [], [], []
+        try:
+            entries = os.listdir(f"/proc/{pid}/task")
+        except FileNotFoundError:
+            raise psutil.NoSuchProcess(pid)
+        except PermissionError:
+            raise psutil.AccessDenied(pid)
+        for entry in entries:
+            try:
+                with open(f"/proc/{pid}/task/{entry}/stat", "rb") as f:
+                    stat = f.read().decode("utf-8", "replace")
+            except OSError:
+                # Thread exited between listdir and open
+                continue
+            start, end = stat.find("("), stat.rfind(")")
+            fields = stat[end + 2:].split()
+            tids.append(int(entry))
+            names.append(stat[start + 1:end])
+            states.append(fields[0])
+            ticks.append(int(fields[11]) + int(fields[12]))
+        order = np.argsort(np.array(tids, dtype=np.int64), kind='stable')
+        return (np.array(tids, dtype=np.int64)[order], np.array(names, dtype=object)[order],
+                np.array(states, dtype=object)[order],
+                np.array(ticks, dtype=np.float64)[order] / CLOCK_TICKS)
+
+    # Elsewhere psutil exposes per-thread times but no names or states
+    threads = sorted(psutil.Process(pid).threads())
+    tids = np.array([thread.id for thread in threads], dtype=np.int64)
+    cpu = np.array([thread.user_time + thread.system_time for thread in threads], dtype=np.float64)
+    return tids, np.full(len(tids), "", dtype=object), np.full(len(tids), "", dtype=object), cpu
+
+
+class ThreadSampler:
+    # Per-thread CPU rates for one process, as deltas between two reads
+    def __init__(self, pid):
+        self.pid = pid
+        self.tids = np.empty(0, dtype=np.int64)
+        self.cpu_seconds = np.empty(0, dtype=np.float64)
+        self.last = None
+
+    def sample(self):
+        # Returns (tids, names, states, cpu %, cpu seconds); threads seen for
+        # the first time report 0% until the next sample
+        now = time.monotonic()
+        tids, names, states, cpu_seconds = read_thread_times(self.pid)
+        cpu = np.zeros(len(tids), dtype=np.float64)
+        if self.last is not None and len(self.tids) and len(tids) and now > self.last:
+            pos = np.minimum(np.searchsorted(self.tids, tids), len(self.tids) - 1)
+            known = self.tids[pos] == tids
+            cpu[known] = (cpu_seconds[known] - self.cpu_seconds[pos[known]]) / (now - self.last) * 100
+        self.tids, self.cpu_seconds, self.last = tids, cpu_seconds, now
+        return tids, names, states, np.maximum(cpu, 0.0), cpu_seconds
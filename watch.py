@@ -0,0 +1,126 @@
+import threading
+import time
+
+import numpy as np
+import psutil
+
+# Pinned processes are sampled on their own thread at WATCH_INTERVAL, well
+# above the table's refresh rate. The cost is bounded two ways: at most
+# MAX_WATCHED PIDs, and the interval stretches whenever a sampling pass would
+# take more than CPU_BUDGET of one core.
+WATCH_INTERVAL = 0.1
+WATCH_CAPACITY = 600
+MAX_WATCHED = 16
+CPU_BUDGET = 0.02
+
+
+class WatchRing:
+    # Fixed-size ring of (timestamp, cpu %, rss bytes) samples for one PID
+    def __init__(self, name, capacity=WATCH_CAPACITY):
+        self.name = name
+        self.data = np.zeros((capacity, 3), dtype=np.float64)
+        self.head = 0
+        self.count = 0
+        self.last = None  # (timestamp, cpu seconds) of the previous sample
+        self.exited = False
+
+    def append(self, timestamp, cpu, rss):
+        self.data[self.head] = (timestamp, cpu, rss)
+        self.head = (self.head + 1) % len(self.data)
+        self.count = min(self.count + 1, len(self.data))
+
+    def ordered(self):
+        if self.count < len(self.data):
+            return self.data[:self.count].copy()
+        return np.roll(self.data, -self.head, axis=0)
+
+
+class WatchSampler:
+    def __init__(self, interval=WATCH_INTERVAL, capacity=WATCH_CAPACITY,
+                 max_watched=MAX_WATCHED, budget=CPU_BUDGET):
+        self.interval = interval
+        self.capacity = capacity
+        self.max_watched = max_watched
+        self.budget = budget
+        self.effective_interval = interval
+        self.rings = {}
+        self.processes = {}
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.thread = None
+        self.running = False
+
+    def watch(self, pid):
+        # Returns False when the PID is gone or the watch list is full
+        with self.lock:
+            if pid in self.rings:
+                return True
+            if len(self.rings) >= self.max_watched:
+                return False
+            try:
+                process = psutil.Process(pid)
+                name = process.name()
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                return False
+            self.processes[pid] = process
+            self.rings[pid] = WatchRing(name, self.capacity)
+        if self.thread is None:
+            self.running = True
+            self.thread = threading.Thread(target=self.run, name="watch", daemon=True)
+            self.thread.start()
+        return True
+
+    def unwatch(self, pid):
+        with self.lock:
+            self.rings.pop(pid, None)
+            self.processes.pop(pid, None)
+
+    def pids(self):
+        with self.lock:
+            return list(self.rings)
+
+    def series(self):
+        # {pid: (name, exited, samples)} with samples ordered oldest first
+        with self.lock:
+            return {pid: (ring.name, ring.exited, ring.ordered()) for pid, ring in self.rings.items()}
+
+    def sample(self):
+        with self.lock:
+            watched = list(self.processes.items())
+        for pid, process in watched:
+            try:
+                with process.oneshot():
+                    times = process.cpu_times()
+                    rss = process.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                with self.lock:
+                    if pid in self.rings:
+                        self.rings[pid].exited = True
+                        self.processes.pop(pid, None)
+                continue
+            now = time.monotonic()
+            cpu_seconds = times.user + times.system
+            with self.lock:
+                ring = self.rings.get(pid)
+                if ring is None:
+                    continue
+                if ring.last is not None and now > ring.last[0]:
+                    cpu = (cpu_seconds - ring.last[1]) / (now - ring.last[0]) * 100
+                    ring.append(time.time(), cpu, rss)
+                ring.last = (now, cpu_seconds)
+
+    def run(self):
+        while self.running:
+            started = time.perf_counter()
+            self.sample()
+            elapsed = time.perf_counter() - started
+            # Stretch the interval rather than exceed the CPU budget
+            self.effective_interval = max(self.interval, elapsed / self.budget)
+            self.wakeup.wait(max(self.effective_interval - elapsed, 0))
+
+    def stop(self):
+        self.running = False
+        self.wakeup.set()
+        if self.thread is not None:
+            self.thread.join(timeout=2)
+            self.thread = None